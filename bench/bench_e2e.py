@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark step1_orchestrator.main() proti lokálnemu fake GitHubu (bench/fakegh.py).
+
+Pre každú veľkosť (default 50 / 500 / 5000 PR) spustí dva behy nad čistým adresárom:
+  cold – prázdna state DB, HTTP cache aj clone root (všetko sa sťahuje a klonuje),
+  warm – hneď znova (nič sa nezmenilo: 304 z cache, detaily zo state DB, žiadne klony).
+Meria wall time a PR/s celého behu, wall/busy čas každej stage (search, eval-scan,
+PR detail, checkout) a počty requestov podľa endpointu zo strany servera.
+
+Použitie:
+    python3 bench/bench_e2e.py                               # 50/500/5000 PR, s klonovaním
+    python3 bench/bench_e2e.py --sizes 200 --latency 0.05 --graphql
+    python3 bench/bench_e2e.py --dry-run --save base.json    # bez klonovania, ulož výsledky
+    python3 bench/bench_e2e.py --dry-run --baseline base.json  # porovnaj, >20 % pomalšie = ⚠️
+    python3 bench/bench_e2e.py --sizes 500 --p429 0.02 --psecondary 0.01 --real-limits
+
+Remoty sa vytvárajú raz do --remotes (default /tmp/pv247-bench-remotes) a PR ich zdieľajú
+round-robin (--remote-count), každý PR sa však klonuje do vlastného adresára.
+"""
+from __future__ import annotations
+
+import io, os, sys, json, time, shutil, argparse, tempfile, threading, contextlib
+from pathlib import Path
+from typing import Any, Dict, List
+
+BENCH = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH.parent))
+sys.path.insert(0, str(BENCH))
+import step1_orchestrator as orch  # noqa: E402
+from fakegh import FakeGitHub, make_prs, make_remotes  # noqa: E402
+
+STAGES = ("search", "eval-scan", "PR detail", "checkout")
+
+# ------------------ Meranie stage ------------------
+
+class StageTimer:
+    """Wall (prvý štart → posledný koniec) a busy (súčet časov volaní) pre každú stage."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.t: Dict[str, Dict[str, float]] = {}
+
+    def add(self, stage: str, start: float, end: float) -> None:
+        with self.lock:
+            s = self.t.setdefault(stage, {"first": start, "last": end, "busy": 0.0, "calls": 0})
+            s["first"], s["last"] = min(s["first"], start), max(s["last"], end)
+            s["busy"] += end - start
+            s["calls"] += 1
+
+    def wrap(self, stage: str, fn):
+        def timed(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, t, time.perf_counter())
+        return timed
+
+    def wrap_iter(self, stage: str, fn):
+        """Generátor stránok: meria sa čas strávený v každom next() (čakanie na search)."""
+        def timed(*args, **kwargs):
+            it = iter(fn(*args, **kwargs))
+            while True:
+                t = time.perf_counter()
+                try:
+                    page = next(it)
+                except StopIteration:
+                    self.add(stage, t, time.perf_counter())
+                    return
+                self.add(stage, t, time.perf_counter())
+                yield page
+        return timed
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {k: {"wall": round(v["last"] - v["first"], 3), "busy": round(v["busy"], 3), "calls": v["calls"]}
+                for k, v in self.t.items()}
+
+TIMER = StageTimer()
+
+def instrument() -> None:
+    orch.stage_eval = TIMER.wrap("eval-scan", orch.stage_eval)
+    orch.stage_detail = TIMER.wrap("PR detail", orch.stage_detail)
+    orch.stage_checkout = TIMER.wrap("checkout", orch.stage_checkout)
+    orch.iter_search_pages = TIMER.wrap_iter("search", orch.iter_search_pages)
+    orch.iter_search_pages_graphql = TIMER.wrap_iter("search", orch.iter_search_pages_graphql)
+
+# ------------------ Beh ------------------
+
+def run_main(args: List[str], verbose: bool) -> float:
+    sys.argv = ["step1_orchestrator.py", *args]
+    out = sys.stdout if verbose else io.StringIO()
+    t = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        orch.main()
+    return time.perf_counter() - t
+
+def bench_size(ns: argparse.Namespace, n: int, remotes) -> List[Dict[str, Any]]:
+    budgets = None if ns.real_limits else {"core": 10**9, "search": 10**9, "graphql": 10**9}
+    gh = FakeGitHub(make_prs(n, remotes, comments=ns.comments), latency=ns.latency, budgets=budgets,
+                    p429=ns.p429, psecondary=ns.psecondary).start()
+    work = Path(tempfile.mkdtemp(prefix=f"pv247-bench-{n}-"))
+    os.environ.update(GITHUB_TOKEN="bench", PV247_GITHUB_API=gh.url)
+    args = ["--state-db", str(work / "state.sqlite3"), "--http-cache-dir", str(work / "http"),
+            "--clone-root", str(work / "clones"), "--workers", str(ns.workers),
+            "--clone-workers", str(ns.clone_workers), "--skip-if-evaluated", *ns.extra]
+    if ns.dry_run:
+        args.append("--dry-run")
+    if ns.graphql:
+        args.append("--graphql")
+    results = []
+    try:
+        for phase in ("cold", "warm"):
+            TIMER.reset()
+            gh.reset_counts()
+            wall = run_main(args, ns.verbose)
+            requests_ = gh.summary()
+            results.append({"prs": n, "phase": phase, "wall": round(wall, 3),
+                            "prs_per_s": round(n / wall, 1) if wall else None,
+                            "requests": requests_, "stages": TIMER.report()})
+    finally:
+        gh.stop()
+        if not ns.keep:
+            shutil.rmtree(work, ignore_errors=True)
+    return results
+
+def print_table(results: List[Dict[str, Any]], baseline: Dict[str, Any] | None, threshold: float) -> int:
+    print(f"\n{'PR':>6} {'beh':>5} {'wall s':>8} {'PR/s':>8}  " + "  ".join(f"{s:>16}" for s in STAGES)
+          + f"  {'requesty':<40}")
+    print(f"{'':>6} {'':>5} {'':>8} {'':>8}  " + "  ".join(f"{'wall/busy s':>16}" for _ in STAGES))
+    regressions = 0
+    for r in results:
+        stages = "  ".join(
+            f"{r['stages'][s]['wall']:>7.2f}/{r['stages'][s]['busy']:<8.2f}" if s in r["stages"] else f"{'–':>16}"
+            for s in STAGES)
+        reqs = ", ".join(f"{k} {v}" for k, v in sorted(r["requests"].items()))
+        flag = ""
+        base = (baseline or {}).get(f"{r['prs']}/{r['phase']}")
+        if base and r["wall"] > base["wall"] * (1 + threshold):
+            flag = f"  ⚠️  +{(r['wall'] / base['wall'] - 1) * 100:.0f} % oproti baseline"
+            regressions += 1
+        elif base:
+            flag = f"  ({(r['wall'] / base['wall'] - 1) * 100:+.0f} %)"
+        print(f"{r['prs']:>6} {r['phase']:>5} {r['wall']:>8.2f} {r['prs_per_s']:>8.1f}  {stages}  {reqs}{flag}")
+    return regressions
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="E2E benchmark step1_orchestrator proti lokálnemu fake GitHubu.",
+                                epilog="Argumenty za `--` idú priamo do step1_orchestrator (napr. -- --fetch-sha).")
+    p.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    p.add_argument("--latency", type=float, default=0.02, help="Umelá latencia každého API requestu (s).")
+    p.add_argument("--comments", type=int, default=3, help="Počet komentárov na PR.")
+    p.add_argument("--p429", type=float, default=0.0, help="Pravdepodobnosť 429 na request.")
+    p.add_argument("--psecondary", type=float, default=0.0, help="Pravdepodobnosť secondary-limit 403.")
+    p.add_argument("--real-limits", action="store_true",
+                   help="GitHub rozpočty (core 5000, search 30, graphql 5000 za 60 s okno) namiesto neobmedzených.")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--clone-workers", type=int, default=4)
+    p.add_argument("--graphql", action="store_true")
+    p.add_argument("-d", "--dry-run", action="store_true", help="Bez klonovania (meria len API časť).")
+    p.add_argument("--remotes", type=Path, default=Path(tempfile.gettempdir()) / "pv247-bench-remotes")
+    p.add_argument("--remote-count", type=int, default=200, help="Počet lokálnych bare remotov (zdieľané PR).")
+    p.add_argument("--save", type=Path, help="Ulož výsledky do JSON (baseline pre --baseline).")
+    p.add_argument("--baseline", type=Path, help="Porovnaj wall time s uloženými výsledkami.")
+    p.add_argument("--threshold", type=float, default=0.2, help="Relatívne spomalenie, ktoré je regresia.")
+    p.add_argument("--keep", action="store_true", help="Nemaž pracovné adresáre (state DB, klony).")
+    p.add_argument("-v", "--verbose", action="store_true", help="Ukáž výstup orchestrátora.")
+    p.add_argument("extra", nargs="*", help=argparse.SUPPRESS)
+    ns = p.parse_args()
+
+    remotes = []
+    if not ns.dry_run:
+        t = time.perf_counter()
+        remotes = make_remotes(ns.remotes, min(ns.remote_count, max(ns.sizes)))
+        print(f"🧪 {len(remotes)} lokálnych remotov v {ns.remotes} ({time.perf_counter() - t:.1f} s)")
+    instrument()
+
+    results = []
+    for n in ns.sizes:
+        print(f"⏱️  {n} PR …", flush=True)
+        results += bench_size(ns, n, remotes)
+
+    baseline = None
+    if ns.baseline:
+        baseline = {f"{r['prs']}/{r['phase']}": r for r in json.loads(ns.baseline.read_text())["results"]}
+    regressions = print_table(results, baseline, ns.threshold)
+    if ns.save:
+        ns.save.write_text(json.dumps({"args": sys.argv[1:], "results": results}, indent=2))
+        print(f"\n💾 Výsledky uložené do {ns.save}")
+    if regressions:
+        print(f"\n⚠️  {regressions} meraní pomalších o viac ako {ns.threshold * 100:.0f} % oproti baseline.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark filtrov PR: pôvodné filter_students + filter_contains_regex vs. RepoFilter.
+
+Generuje syntetické search itemy (repo 't-07-nextjs-basic-<login>', autor = login) a pre
+rôzne počty študentov meria oba prístupy nad rovnakými dátami; výsledky musia sedieť.
+
+Použitie:
+    python3 bench/bench_filters.py                       # 100k PR, 10/1000/5000 študentov
+    python3 bench/bench_filters.py --items 20000 --students 100 2000
+"""
+from __future__ import annotations
+
+import re, sys, time, random, argparse
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from step1_orchestrator import RepoFilter, repo_full_name  # noqa: E402
+
+# ------------------ Pôvodná implementácia (referencia) ------------------
+
+def legacy_filter_students(items, cfg):
+    if not cfg.students:
+        return items
+
+    def repo_name(it):
+        return repo_full_name(it["repository_url"]).split("/")[1]
+
+    def ends_with_login(name):
+        lower = name.lower()
+        suffix = lower.rsplit("-", 1)[-1]
+        if suffix in cfg.students:
+            return True
+        return any(lower.endswith("-" + u) for u in cfg.students)
+
+    kept = []
+    for it in items:
+        author = ((it.get("user") or {}).get("login") or "").lower()
+        by_author = author in cfg.students
+        by_repo = ends_with_login(repo_name(it))
+        if (cfg.student_match == "author" and by_author) or \
+           (cfg.student_match == "repo" and by_repo) or \
+           (cfg.student_match == "either" and (by_author or by_repo)):
+            kept.append(it)
+    return kept
+
+def legacy_filter_contains_regex(items, cfg):
+    def repo_name(it):
+        return repo_full_name(it["repository_url"]).split("/")[1]
+
+    if cfg.contains:
+        lowers = [s.lower() for s in cfg.contains]
+        items = [it for it in items if any(s in repo_name(it).lower() for s in lowers)]
+    if cfg.regex:
+        rx = re.compile(cfg.regex, re.I)
+        items = [it for it in items if rx.search(repo_name(it))]
+    if cfg.exclude:
+        ex = re.compile(cfg.exclude, re.I)
+        items = [it for it in items if not ex.search(repo_name(it))]
+    return items
+
+# ------------------ Dáta ------------------
+
+def make_items(n: int, logins: list[str], rng: random.Random):
+    tasks = ["t-07-nextjs-basic", "t-08-react-query", "t-09-auth"]
+    items = []
+    for i in range(n):
+        login = rng.choice(logins)
+        # časť PR od „cudzích“ autorov a s pomlčkou v logine (suffix nie je posledný segment)
+        if i % 7 == 0:
+            login = f"guest-{i}"
+        repo = f"{rng.choice(tasks)}-{login}"
+        items.append({"repository_url": f"https://api.github.com/repos/FI-PV247/{repo}",
+                      "user": {"login": login if i % 3 else f"bot{i}"}, "number": 1})
+    return items
+
+def timed(fn, reps: int) -> float:
+    best = float("inf")
+    for _ in range(reps):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark PR filtrov (pôvodné vs. RepoFilter).")
+    p.add_argument("--items", type=int, default=100_000)
+    p.add_argument("--students", type=int, nargs="+", default=[10, 1000, 5000])
+    p.add_argument("--reps", type=int, default=3)
+    p.add_argument("--legacy-max-students", type=int, default=1000,
+                   help="Nad tento počet študentov pôvodnú implementáciu nemeraj (je O(items × študenti)).")
+    ns = p.parse_args()
+
+    rng = random.Random(247)
+    print(f"{'students':>9} {'match':>7} {'legacy s':>10} {'fused s':>9} {'speedup':>8} {'kept':>7}")
+    for n_students in ns.students:
+        logins = [f"xlogin{i}" if i % 5 else f"dash-login{i}" for i in range(n_students)]
+        items = make_items(ns.items, logins, rng)
+        for match in ("either", "repo"):
+            cfg = SimpleNamespace(students=set(logins[::2]), student_match=match, contains=["nextjs", "query"],
+                                  regex=r"^t-0[78]-", exclude=r"-guest-", homeworks=[])
+            fused = RepoFilter.from_config(cfg)
+            kept = fused(items)
+            t_new = timed(lambda: RepoFilter.from_config(cfg)(items), ns.reps)
+            if n_students <= ns.legacy_max_students:
+                ref = legacy_filter_contains_regex(legacy_filter_students(items, cfg), cfg)
+                assert [id(x) for x in ref] == [id(x) for x in kept], "výsledky filtrov sa líšia"
+                t_old = timed(lambda: legacy_filter_contains_regex(legacy_filter_students(items, cfg), cfg), ns.reps)
+                old, speed = f"{t_old:10.3f}", f"{t_old / t_new:7.1f}×"
+            else:
+                old, speed = f"{'–':>10}", f"{'–':>8}"
+            print(f"{n_students:>9} {match:>7} {old} {t_new:9.3f} {speed} {len(kept):>7}")
+        print(f"{'':>9} drops: {fused.summary()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Lokálna náhrada GitHub API (REST + GraphQL) a lokálne git remoty pre benchmarky.
+
+FakeGitHub servuje presne to, čo volá step1_orchestrator.py:
+  - GET  /search/issues                      (sort=updated desc, strany, cap 1000, okná updated:a..b)
+  - POST /graphql                            (search(query, first, after) s PR uzlami)
+  - GET  /repos/{o}/{r}/pulls/{n}            (detail s head SHA a file:// remotom)
+  - GET  /repos/{o}/{r}/issues/{n}/comments  (strany, since)
+  - GET  /repos/{o}/{r}/pulls/{n}/reviews
+s ETag/304, X-RateLimit-* hlavičkami per resource, umelou latenciou a voliteľne
+náhodnými 429 / secondary-limit 403. Počíta requesty podľa endpointu a statusu.
+
+make_remotes() vytvorí bare repá (šablóna + jeden commit študenta), ktoré sa klonujú
+cez file://. Repá sú cachované – pri rovnakom počte sa znova nevytvárajú.
+
+Samostatne (na ručné skúšanie):
+    python3 bench/fakegh.py --prs 500 --latency 0.05 --remotes /tmp/pv247-remotes
+    PV247_GITHUB_API=http://127.0.0.1:8765 python3 step1_orchestrator.py -d
+"""
+from __future__ import annotations
+
+import re, sys, json, time, random, hashlib, threading, subprocess, argparse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse, parse_qs
+
+ORG = "FI-PV247"
+TASK = "t-07-nextjs-basic"
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+ISO = "%Y-%m-%dT%H:%M:%SZ"
+
+# ------------------ Lokálne git remoty ------------------
+
+def _git(*args: str, cwd: Path | None = None, stdin: str | None = None) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, input=stdin, text=True, check=True,
+                          capture_output=True).stdout.strip()
+
+def make_remotes(root: Path, count: int, files: int = 40, file_kb: int = 8) -> List[Tuple[str, str]]:
+    """`count` bare repozitárov pod `root` → [(file:// URL, head SHA)].
+
+    Šablóna (package.json + `files` súborov po `file_kb` KB) je jedno bare repo; študentské
+    repá naň ukazujú cez objects/info/alternates a pridávajú jeden commit (git fast-import),
+    takže aj stovky remotov vzniknú za pár sekúnd. upload-pack cez file:// alternates
+    rešpektuje, klon teda dostane celú históriu.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = root / "remotes.json"
+    spec = {"count": count, "files": files, "file_kb": file_kb}
+    if manifest.exists():
+        saved = json.loads(manifest.read_text())
+        if saved.get("spec") == spec:
+            return [tuple(r) for r in saved["remotes"]]
+
+    tmpl = root / "template.git"
+    if not tmpl.exists():
+        _git("init", "--quiet", "--bare", "-b", "main", str(tmpl))
+        rng = random.Random(247)
+        stream = ["commit refs/heads/main", "committer Bench <bench@example.com> 1735689600 +0000",
+                  "data 8", "template"]
+        blobs = {"package.json": json.dumps({"name": TASK, "scripts": {"build": "next build"}}, indent=2)}
+        for i in range(files):
+            blobs[f"src/components/c{i}.tsx"] = "".join(
+                rng.choice("abcdefghijklmnopqrstuvwxyz \n") for _ in range(file_kb * 1024))
+        for path, body in blobs.items():
+            data = body.encode()
+            stream += [f"M 644 inline {path}", f"data {len(data)}", body]
+        _git("fast-import", "--quiet", cwd=tmpl, stdin="\n".join(stream) + "\n")
+    base = _git("rev-parse", "refs/heads/main", cwd=tmpl)
+
+    remotes = []
+    for i in range(count):
+        repo = root / f"{TASK}-stud{i}.git"
+        if not repo.exists():
+            _git("init", "--quiet", "--bare", "-b", "main", str(repo))
+            (repo / "objects" / "info" / "alternates").write_text(str(tmpl / "objects") + "\n")
+            body = f"export const student = {i};\n"
+            _git("fast-import", "--quiet", cwd=repo, stdin="\n".join([
+                "commit refs/heads/main", f"committer Stud{i} <s{i}@example.com> {1735700000 + i} +0000",
+                "data 8", "homework", f"from {base}",
+                "M 644 inline src/student.ts", f"data {len(body)}", body]) + "\n")
+        remotes.append((f"file://{repo}", _git("rev-parse", "refs/heads/main", cwd=repo)))
+    manifest.write_text(json.dumps({"spec": spec, "remotes": remotes}))
+    return remotes
+
+# ------------------ Syntetické PR ------------------
+
+def make_prs(n: int, remotes: List[Tuple[str, str]], comments: int = 3, evaluated: float = 0.3,
+             spacing: timedelta = timedelta(minutes=37)) -> List[Dict[str, Any]]:
+    """`n` PR; PR i klonuje z remotu i % len(remotes). Časť (`evaluated`) má hodnotiaci komentár."""
+    rng = random.Random(n)
+    prs = []
+    for i in range(n):
+        url, sha = remotes[i % len(remotes)] if remotes else (f"file:///nonexistent/{i}.git", "0" * 40)
+        bodies = [f"komentár {j}" for j in range(comments)]
+        if rng.random() < evaluated:
+            bodies[-1:] = ["Hodnotenie: 10/10"]
+        prs.append({
+            "repo": f"{ORG}/{TASK}-stud{i}", "login": f"stud{i}", "number": 1,
+            "updated": EPOCH + spacing * i, "sha": sha, "clone": url,
+            "comments": [{"id": j, "body": b, "updated_at": (EPOCH + spacing * i).strftime(ISO)}
+                         for j, b in enumerate(bodies)],
+        })
+    return prs
+
+# ------------------ Server ------------------
+
+class FakeGitHub:
+    """HTTP server v pozadí (vlákno); `url` je náhrada za https://api.github.com."""
+
+    RESOURCES = {"core": 5000, "search": 30, "graphql": 5000}
+
+    def __init__(self, prs: List[Dict[str, Any]], latency: float = 0.0, search_cap: int = 1000,
+                 budgets: Dict[str, int] | None = None, window: float = 60.0,
+                 p429: float = 0.0, psecondary: float = 0.0, retry_after: float = 1.0,
+                 port: int = 0, seed: int = 247):
+        self.prs = sorted(prs, key=lambda p: p["updated"], reverse=True)
+        self.by_repo = {p["repo"]: p for p in prs}
+        self.latency = latency
+        self.search_cap = search_cap
+        self.budgets = {**self.RESOURCES, **(budgets or {})}
+        self.window = window
+        self.p429, self.psecondary, self.retry_after = p429, psecondary, retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self.used: Dict[str, Tuple[float, int]] = {}  # resource -> (reset, použité)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def start(self) -> FakeGitHub:
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_counts(self) -> None:
+        with self.lock:
+            self.counts.clear()
+
+    # --- logika ---
+
+    def _rate(self, resource: str) -> Tuple[Dict[str, str], str | None]:
+        """Spotrebuj 1 z rozpočtu; vráti hlavičky a prípadnú chybu ('exhausted'/'429'/'secondary')."""
+        now = time.time()
+        with self.lock:
+            reset, used = self.used.get(resource, (now + self.window, 0))
+            if now >= reset:
+                reset, used = now + self.window, 0
+            limit = self.budgets[resource]
+            error = None
+            if used >= limit:
+                error = "exhausted"
+            elif self.rng.random() < self.p429:
+                error = "429"
+            elif self.rng.random() < self.psecondary:
+                error = "secondary"
+            else:
+                used += 1
+            self.used[resource] = (reset, used)
+        headers = {"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(limit - used),
+                   "X-RateLimit-Reset": str(int(reset) + 1), "X-RateLimit-Resource": resource}
+        return headers, error
+
+    def _window(self, q: str) -> Tuple[datetime, datetime]:
+        m = re.search(r"updated:(\S+)\.\.(\S+)", q)
+        if m:
+            return datetime.fromisoformat(m.group(1)), datetime.fromisoformat(m.group(2))
+        m = re.search(r"updated:>=(\S+)", q)
+        lo = datetime.fromisoformat(m.group(1).replace("Z", "+00:00")) if m else EPOCH - timedelta(days=1)
+        lo = lo if lo.tzinfo else lo.replace(tzinfo=timezone.utc)
+        return lo, datetime.max.replace(tzinfo=timezone.utc)
+
+    def search(self, q: str) -> List[Dict[str, Any]]:
+        lo, hi = self._window(q)
+        return [p for p in self.prs if lo <= p["updated"] <= hi]
+
+    def search_item(self, api: str, p: Dict[str, Any]) -> Dict[str, Any]:
+        return {"repository_url": f"{api}/repos/{p['repo']}", "number": p["number"],
+                "html_url": f"https://github.com/{p['repo']}/pull/{p['number']}",
+                "title": "Feedback", "user": {"login": p["login"]},
+                "updated_at": p["updated"].strftime(ISO), "comments": len(p["comments"])}
+
+    def pr_detail(self, p: Dict[str, Any]) -> Dict[str, Any]:
+        return {"number": p["number"], "head": {"sha": p["sha"], "ref": "main",
+                                                "repo": {"ssh_url": p["clone"], "clone_url": p["clone"]}},
+                "base": {"repo": {"default_branch": "main"}}}
+
+    def graphql_node(self, p: Dict[str, Any]) -> Dict[str, Any]:
+        return {"number": p["number"], "url": f"https://github.com/{p['repo']}/pull/{p['number']}",
+                "updatedAt": p["updated"].strftime(ISO), "author": {"login": p["login"]},
+                "repository": {"nameWithOwner": p["repo"]}, "headRefName": "main", "headRefOid": p["sha"],
+                "headRepository": {"sshUrl": p["clone"], "url": p["clone"].removesuffix(".git")},
+                "baseRepository": {"defaultBranchRef": {"name": "main"}},
+                "comments": {"totalCount": len(p["comments"]),
+                             "nodes": [{"body": c["body"]} for c in p["comments"][-100:]]},
+                "reviews": {"totalCount": 0, "nodes": []}}
+
+    def _handler(self):
+        gh = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code: int, obj: Any, headers: Dict[str, str], kind: str) -> None:
+                body = json.dumps(obj).encode()
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if code == 200 and self.headers.get("If-None-Match") == etag:
+                    code, body = 304, b""
+                with gh.lock:
+                    gh.counts[(kind, code)] += 1
+                self.send_response(code)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                if code in (200, 304):
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _limited(self, resource: str, kind: str) -> Dict[str, str] | None:
+                """Rate-limit hlavičky, alebo None, ak už bola poslaná chybová odpoveď."""
+                if gh.latency:
+                    time.sleep(gh.latency)
+                headers, error = gh._rate(resource)
+                if error == "exhausted":
+                    self._send(403, {"message": "API rate limit exceeded"}, headers, kind)
+                elif error == "429":
+                    self._send(429, {"message": "Too Many Requests"},
+                               {**headers, "Retry-After": str(gh.retry_after)}, kind)
+                elif error == "secondary":
+                    self._send(403, {"message": "You have exceeded a secondary rate limit."},
+                               {**headers, "Retry-After": str(gh.retry_after)}, kind)
+                else:
+                    return headers
+                return None
+
+            def do_GET(self):
+                u = urlparse(self.path)
+                q = {k: v[0] for k, v in parse_qs(u.query).items()}
+                api = f"http://{self.headers.get('Host')}"
+                page, per_page = int(q.get("page", 1)), min(int(q.get("per_page", 30)), 100)
+
+                if u.path == "/search/issues":
+                    headers = self._limited("search", "search")
+                    if headers is None:
+                        return
+                    found = gh.search(q.get("q", ""))
+                    start = (page - 1) * per_page
+                    if start >= gh.search_cap:
+                        return self._send(422, {"message": "Only the first 1000 search results are available"},
+                                          headers, "search")
+                    chunk = found[start:min(start + per_page, gh.search_cap)]
+                    return self._send(200, {"total_count": len(found), "incomplete_results": False,
+                                            "items": [gh.search_item(api, p) for p in chunk]}, headers, "search")
+
+                m = re.fullmatch(r"/repos/([^/]+/[^/]+)/(pulls|issues)/(\d+)(/comments|/reviews)?", u.path)
+                p = gh.by_repo.get(m.group(1)) if m else None
+                if not p:
+                    return self._send(404, {"message": "Not Found"}, {}, "other")
+                kind = {"/comments": "comments", "/reviews": "reviews"}.get(m.group(4), "detail")
+                headers = self._limited("core", kind)
+                if headers is None:
+                    return
+                if kind == "detail":
+                    return self._send(200, gh.pr_detail(p), headers, kind)
+                if kind == "reviews":
+                    return self._send(200, [], headers, kind)
+                comments = [c for c in p["comments"] if c["updated_at"] >= q["since"]] if "since" in q \
+                    else p["comments"]
+                self._send(200, comments[(page - 1) * per_page:page * per_page], headers, kind)
+
+            def do_POST(self):
+                if urlparse(self.path).path != "/graphql":
+                    return self._send(404, {"message": "Not Found"}, {}, "other")
+                req = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                headers = self._limited("graphql", "graphql")
+                if headers is None:
+                    return
+                v = req.get("variables") or {}
+                found = gh.search(v.get("q", ""))
+                start = int(v.get("after") or 0)
+                end = min(start + int(v.get("first") or 50), len(found), gh.search_cap)
+                self._send(200, {"data": {"search": {
+                    "issueCount": len(found),
+                    "pageInfo": {"hasNextPage": end < min(len(found), gh.search_cap), "endCursor": str(end)},
+                    "nodes": [gh.graphql_node(p) for p in found[start:end]],
+                }}}, headers, "graphql")
+
+        return Handler
+
+    def summary(self) -> Dict[str, int]:
+        """{'search': 12, 'detail': 500, ..., 'status_403': 3} – počty requestov."""
+        out: Counter = Counter()
+        with self.lock:
+            for (kind, code), n in self.counts.items():
+                out[kind] += n
+                if code >= 400:
+                    out[f"status_{code}"] += n
+                if code == 304:
+                    out["not_modified"] += n
+        return dict(out)
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Lokálny fake GitHub (REST + GraphQL) pre benchmarky.")
+    p.add_argument("--prs", type=int, default=50)
+    p.add_argument("--remotes", type=Path, help="Adresár s bare remotmi (vytvorí sa); bez neho bez klonovania.")
+    p.add_argument("--remote-count", type=int, default=0, help="Počet remotov (0 = min(prs, 200)).")
+    p.add_argument("--latency", type=float, default=0.0)
+    p.add_argument("--p429", type=float, default=0.0)
+    p.add_argument("--psecondary", type=float, default=0.0)
+    p.add_argument("--port", type=int, default=8765)
+    ns = p.parse_args()
+    remotes = make_remotes(ns.remotes, ns.remote_count or min(ns.prs, 200)) if ns.remotes else []
+    gh = FakeGitHub(make_prs(ns.prs, remotes), latency=ns.latency, p429=ns.p429, psecondary=ns.psecondary,
+                    port=ns.port).start()
+    print(f"🧪 Fake GitHub na {gh.url} ({ns.prs} PR, {len(remotes)} remotov). Ctrl-C ukončí.")
+    try:
+        while True:
+            time.sleep(5)
+    except KeyboardInterrupt:
+        gh.stop()
+        print(json.dumps(gh.summary(), indent=2))
+
+if __name__ == "__main__":
+    sys.exit(main())
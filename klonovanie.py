@@ -1,15 +1,17 @@
 import os
+import re
+import sys
+import json
 import time
-import git
 import shutil
 import argparse
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+# selenium, git and requests are imported where they are used: --help, argument errors
+# and a resumed --api run never load them
+from step1_orchestrator import RateLimiter, gh_request
 
 # ------------------------------------------------------
 # 1) Print Usage Information
@@ -26,6 +28,16 @@ Arguments:
     --homework-url      Full URL to the PV247 homework (e.g., "https://pv247-app.vercel.app/homework1")
     --homework-folder   Path where the homework repositories should be cloned and processed.
 
+Optional:
+    --api               Check the Feedback PRs through the GitHub API in parallel (needs GITHUB_TOKEN)
+                        instead of opening every repo in Chrome.
+    --resume            Continue an interrupted run.
+    --browsers N        Check N repos at once in separate Chrome tabs (or headless Chromes with --headless DIR).
+    --password-store B  With --headless on Linux: the keyring of the copied profile's Chrome (basic, gnome-libsecret, ...).
+    --clone-workers N   Clone up to N repos in the background while checking continues.
+    --shared-store      Share one git object store between all cloned repos.
+    --prebuild          Build all cloned repos in the background (review_farm.py) right after cloning.
+
 After execution, a script named 'run_repos.sh' will be created inside the 'cloned_repos' directory.
 To use it, navigate to the cloned folder and run:
 
@@ -33,6 +45,11 @@ To use it, navigate to the cloned folder and run:
     ./run_repos.sh build   # To install dependencies and build the projects
     ./run_repos.sh dev     # To install dependencies and run projects in dev mode
 
+For dev mode, start the dev-server pool in a second terminal first, so the next
+repos' servers are already up when you get to them:
+
+    python3 review_farm.py dev /path/to/homework/cloned_repos
+
 """
 
 # If no arguments are provided, print usage and exit
@@ -47,6 +64,15 @@ if len(os.sys.argv) < 2:
 parser = argparse.ArgumentParser(description="PV247 GitHub Repository Cloner")
 parser.add_argument("--homework-url", required=True, help="Full PV247 homework URL (e.g., 'https://pv247-app.vercel.app/homework1')")
 parser.add_argument("--homework-folder", required=True, help="Folder where this homework data (cloned repos + reviewed list) should be stored")
+parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from journal.jsonl: finished repos are not scraped again, half-done clones are redone")
+parser.add_argument("--api", action="store_true", help="Check the Feedback PRs through the GitHub REST API (needs GITHUB_TOKEN) in parallel instead of opening each repo in Chrome; Chrome is still used for the homework page")
+parser.add_argument("--api-workers", type=int, default=8, help="Parallel GitHub API checks with --api (default: 8)")
+parser.add_argument("--browsers", type=int, default=1, help="Check this many repos at once, each in its own Chrome tab (default: 1)")
+parser.add_argument("--headless", metavar="CHROME_USER_DATA_DIR", help="With --browsers: use headless Chrome instances logged in with the cookies copied from this Chrome user data dir (e.g. ~/.config/google-chrome) instead of tabs in the debug Chrome")
+parser.add_argument("--password-store", metavar="BACKEND", help="With --headless on Linux: --password-store of the Chrome whose profile is copied (basic, gnome-libsecret, kwallet5, ...); default: the one the debug Chrome was started with, else Chrome's own detection")
+parser.add_argument("--clone-workers", type=int, default=4, help="Clones run in the background while scraping continues; this many at once (default: 4)")
+parser.add_argument("--prebuild", action="store_true", help="After cloning, start review_farm.py in the background to build all repos in parallel; './run_repos.sh build' then only shows the results")
+parser.add_argument("--shared-store", action="store_true", help="Keep one bare object store per homework and check out each repo as a git worktree (template history is downloaded and stored only once)")
 args = parser.parse_args()
 
 HOMEWORK_URL = args.homework_url.strip()  # Ensure no extra spaces
@@ -61,6 +87,12 @@ if not HOMEWORK_URL.startswith("http"):
 # Define paths inside the homework folder
 CLONE_FOLDER = os.path.join(HOMEWORK_FOLDER, "cloned_repos")
 REVIEWED_REPOS_FILE = os.path.join(HOMEWORK_FOLDER, "reviewed_repos.txt")
+# Append-only progress log of the current run (one JSON object per line)
+JOURNAL_FILE = os.path.join(HOMEWORK_FOLDER, "journal.jsonl")
+GITHUB_API = os.getenv("PV247_GITHUB_API", "https://api.github.com").rstrip("/")
+GITHUB_TIMEOUT = 20
+# Leading dot so that run_repos.sh (`for repo in */`) does not pick it up as a repo
+SHARED_STORE = os.path.join(CLONE_FOLDER, ".shared-objects.git")
 
 # Ensure the folders exist
 os.makedirs(CLONE_FOLDER, exist_ok=True)
@@ -69,37 +101,375 @@ os.makedirs(CLONE_FOLDER, exist_ok=True)
 if not os.path.exists(REVIEWED_REPOS_FILE):
     open(REVIEWED_REPOS_FILE, "w").close()  # Create an empty file if it doesn't exist
 
+def clone_into_shared_store(ssh_url, repo_name, clone_path):
+    """Fetch the repo into the shared bare store (as remote `repo_name`) and add a worktree.
+
+    All student repos are forks of the same template, so after the first one only the
+    student's own commits are downloaded and stored. Background clones go through
+    here one at a time (remotes, refs and worktrees of the store are shared).
+    """
+    with shared_store_lock:
+        _clone_into_shared_store(ssh_url, repo_name, clone_path)
+
+shared_store_lock = threading.Lock()
+
+def _clone_into_shared_store(ssh_url, repo_name, clone_path):
+    import git
+    store = git.Repo.init(SHARED_STORE, bare=True, mkdir=True)
+    if repo_name not in [r.name for r in store.remotes]:
+        store.create_remote(repo_name, ssh_url)
+    store.git.fetch("--no-tags", repo_name,
+                    f"+HEAD:refs/remotes/{repo_name}/HEAD",
+                    f"+refs/heads/*:refs/remotes/{repo_name}/*")
+    store.git.worktree("prune")
+    store.git.worktree("add", "--force", "-B", repo_name, os.path.abspath(clone_path),
+                       f"refs/remotes/{repo_name}/HEAD")
+
+def load_journal():
+    """Replay journal.jsonl into {"links": [...] | None, "repos": {name: last status}, "done": bool}.
+
+    A torn last line (crash in the middle of a write) is ignored.
+    """
+    state = {"links": None, "repos": {}, "done": False}
+    if not os.path.exists(JOURNAL_FILE):
+        return state
+    with open(JOURNAL_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if "links" in entry:
+                state["links"] = entry["links"]
+            elif entry.get("status") == "done":
+                state["done"] = True
+            else:
+                state["repos"][entry["repo"]] = entry["status"]
+    return state
+
+journal_lock = threading.Lock()
+
+def journal(**entry):
+    """Append one entry and fsync it, so a crash or Ctrl-C never loses a finished repo."""
+    with journal_lock, open(JOURNAL_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+# Statuses after which a repo needs no more work in this run; "cloning" means the
+# clone was started but not confirmed, so the folder may be incomplete.
+FINISHED_STATUSES = {"reviewed", "no-feedback", "cloned", "already-cloned"}
+
+progress = load_journal() if args.resume else {"links": None, "repos": {}, "done": False}
+if args.resume and (progress["done"] or progress["links"] is None):
+    print("ℹ️ Nothing to resume (last run finished or never got past the homework page); starting fresh.")
+    progress = {"links": None, "repos": {}, "done": False}
+if progress["links"] is None and os.path.exists(JOURNAL_FILE):
+    os.remove(JOURNAL_FILE)
+
+# ------------------------------------------------------
+# 3) Setup Selenium (Attach to Running Chrome) - only when a page has to be loaded
+# ------------------------------------------------------
+
+driver = None
+
+def attach_to_chrome():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    chrome_options = Options()
+    chrome_options.add_argument("--log-level=3")
+    chrome_options.debugger_address = "localhost:9222"  # Attach to already running Chrome
+    return webdriver.Chrome(options=chrome_options)
+
+def get_driver():
+    global driver
+    if driver is None:
+        driver = attach_to_chrome()
+    return driver
+
+# Explicit waits: how long to wait for the PR list / PR timeline before checking anyway
+PAGE_WAIT = 15
+# (By.XPATH, ...) locators, spelled out so that selenium is not needed to define them
+PR_LIST_LOADED = ("xpath", "//div[contains(@class,'js-navigation-container')] | //div[contains(@class,'blankslate')]")
+PR_TIMELINE_LOADED = ("xpath", "//div[contains(@class,'js-discussion')]")
+
+def open_and_wait(browser, url, loaded):
+    """Load `url` and wait until the `loaded` element is there (instead of a fixed sleep)."""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    browser.get(url)
+    try:
+        WebDriverWait(browser, PAGE_WAIT).until(EC.presence_of_element_located(loaded))
+    except TimeoutException:
+        print(f"   ⏳ {url} did not finish loading in {PAGE_WAIT}s; checking what is there.")
+
+# --- pool of browsers for --browsers N ---
+
+browser_local = threading.local()
+pool_browsers = []  # (driver, temp profile dir or None) to clean up at the end
+pool_lock = threading.Lock()
+
+def copy_login_profile(user_data_dir):
+    """Temp Chrome user data dir with only the login cookies of `user_data_dir`/Default.
+
+    A running Chrome locks its profile, and the full profile is large, so only the
+    files that keep the GitHub session are copied. The cookies are encrypted: on Windows
+    the key is in Local State, on macOS in the Keychain and on Linux in the keyring chosen
+    by --password-store (gnome-libsecret / kwallet, or a fixed key with basic) – the
+    headless Chrome has to use the same store, see login_password_store().
+    """
+    tmp = tempfile.mkdtemp(prefix="pv247-chrome-")
+    src = os.path.expanduser(user_data_dir)
+    for rel in ("Local State", "Default/Cookies", "Default/Network/Cookies", "Default/Preferences"):
+        if os.path.exists(os.path.join(src, rel)):
+            os.makedirs(os.path.dirname(os.path.join(tmp, rel)), exist_ok=True)
+            shutil.copy2(os.path.join(src, rel), os.path.join(tmp, rel))
+    return tmp
+
+def login_password_store():
+    """--password-store for headless Chromes: --password-store, else the debug Chrome's own."""
+    if args.password_store or not sys.platform.startswith("linux"):
+        return args.password_store
+    try:
+        running = subprocess.run(["pgrep", "-af", "remote-debugging-port=9222"],
+                                 capture_output=True, text=True).stdout
+    except OSError:
+        return None
+    match = re.search(r"--password-store=(\S+)", running)
+    return match.group(1) if match else None
+
+def pool_browser():
+    """This thread's browser: a headless Chrome (--headless) or a new tab in the debug Chrome."""
+    browser = getattr(browser_local, "driver", None)
+    if browser is not None:
+        return browser
+    profile = None
+    if args.headless:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        profile = copy_login_profile(args.headless)
+        chrome_options = Options()
+        for flag in ("--headless=new", "--log-level=3", "--disable-gpu", f"--user-data-dir={profile}",
+                     "--profile-directory=Default"):
+            chrome_options.add_argument(flag)
+        password_store = login_password_store()
+        if password_store:
+            chrome_options.add_argument(f"--password-store={password_store}")
+        # ~0.2 s to import, and only headless Chromes need a managed chromedriver
+        from webdriver_manager.chrome import ChromeDriverManager
+        browser = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+    else:
+        # Each worker gets its own WebDriver session attached to the debug Chrome, in its own tab
+        browser = attach_to_chrome()
+        browser.switch_to.new_window("tab")
+    browser_local.driver = browser
+    with pool_lock:
+        pool_browsers.append((browser, profile))
+    return browser
+
+def close_pool_browsers():
+    for browser, profile in pool_browsers:
+        if not profile:
+            try:
+                browser.close()  # only this worker's tab
+            except Exception:
+                pass
+        try:
+            # headless: ends Chrome too; attached: only stops this session's chromedriver,
+            # the debug Chrome keeps running
+            browser.quit()
+        except Exception:
+            pass
+        if profile:
+            shutil.rmtree(profile, ignore_errors=True)
+
+# ------------------------------------------------------
+# 4) Per-repo check: browser (default) or GitHub API (--api)
+# ------------------------------------------------------
+
+# Each check returns "reviewed" | "clone" | "no-feedback"
+EVALUATION_RE = re.compile(r"hodnotenie|hodnoceni|evaluation", re.I)
+
+def check_repo_in_browser(repo_url, browser=None):
+    """Open the repo's PR list and the Feedback PR in Chrome and look for an evaluation."""
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+    # 1) Open the pull requests page
+    browser = browser or get_driver()
+    open_and_wait(browser, f"{repo_url}/pulls", PR_LIST_LOADED)
+
+    # 2) Check for "Feedback" PR with "Submitted" label
+    feedback_selector = (
+        "//div[contains(@class,'flex-auto') and "
+        ".//a[contains(text(),'Feedback')] and "
+        ".//a[contains(@class, 'IssueLabel') and normalize-space()='Submitted']]"
+    )
+    feedback_prs = browser.find_elements(By.XPATH, feedback_selector)
+    if not feedback_prs:
+        return "no-feedback"
+    print(f"✅ {repo_url.split('/')[-1]}: found PR with 'Feedback' + label 'Submitted'. Checking for review text...")
+
+    # Extract the link to the "Feedback" PR and go to that PR page
+    feedback_link = feedback_prs[0].find_element(By.XPATH, ".//a[contains(text(),'Feedback')]").get_attribute("href")
+    open_and_wait(browser, feedback_link, PR_TIMELINE_LOADED)
+
+    # 3) Check if the review contains "hodnotenie", "hodnoceni", or "evaluation"
+    review_xpaths = (
+        "//*["
+        "contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'hodnotenie') "
+        "or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'evaluation') "
+        "or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'hodnoceni')"
+        "]"
+    )
+    try:
+        browser.find_element(By.XPATH, review_xpaths)
+        return "reviewed"
+    except NoSuchElementException:
+        return "clone"
+
+def api_pages(session, url):
+    """All items of a paginated GitHub list endpoint."""
+    params = {"per_page": 100}
+    while url:
+        # through step1_orchestrator's rate limiter: adaptive concurrency, Retry-After,
+        # secondary limits and reset waits, with the throttled request retried
+        r = gh_request(session, "GET", url, params=params, timeout=GITHUB_TIMEOUT)
+        r.raise_for_status()
+        yield from r.json()
+        url, params = r.links.get("next", {}).get("url"), None
+
+def check_repo_via_api(session, repo_url):
+    """Same check as check_repo_in_browser, but with a few REST calls and no page rendering.
+
+    Looks at the open PRs for one titled 'Feedback' with the 'Submitted' label; its body,
+    comments, reviews and review comments are searched for the evaluation keywords
+    (the browser path searches the whole rendered PR page for the same words).
+    """
+    full_name = repo_url.rstrip("/").split("github.com/")[-1]
+    api = f"{GITHUB_API}/repos/{full_name}"
+    feedback = next((pr for pr in api_pages(session, f"{api}/pulls?state=open")
+                     if "Feedback" in (pr.get("title") or "")
+                     and any(label.get("name") == "Submitted" for label in pr.get("labels", []))), None)
+    if feedback is None:
+        return "no-feedback"
+    number = feedback["number"]
+    texts = [feedback.get("body") or ""]
+    for endpoint in (f"issues/{number}/comments", f"pulls/{number}/reviews", f"pulls/{number}/comments"):
+        texts += [item.get("body") or "" for item in api_pages(session, f"{api}/{endpoint}")]
+        if any(EVALUATION_RE.search(t) for t in texts):
+            return "reviewed"
+    return "clone"
+
+def check_repos_via_api(repo_urls):
+    """Run check_repo_via_api for all repos concurrently -> {repo_url: verdict}."""
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        print("❌ --api needs a GitHub token (export GITHUB_TOKEN=...)")
+        exit(1)
+    import requests
+    from urllib3.util.retry import Retry
+    session = requests.Session()
+    session.headers.update({"Authorization": f"token {token}", "Accept": "application/vnd.github+json"})
+    # 429/403 limits are handled by the RateLimiter, urllib3 only retries 5xx
+    retry = Retry(total=5, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                  allowed_methods=frozenset(["GET"]))
+    session.mount("https://", requests.adapters.HTTPAdapter(max_retries=retry, pool_maxsize=args.api_workers))
+    session.limiter = RateLimiter(args.api_workers)
+
+    def check(repo_url):
+        try:
+            return check_repo_via_api(session, repo_url)
+        except Exception as e:
+            return f"error: {e}"
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=args.api_workers) as pool:
+        verdicts = dict(zip(repo_urls, pool.map(check, repo_urls)))
+    print(f"⚡ Checked {len(repo_urls)} repos via the GitHub API in {time.time() - started:.1f}s "
+          f"(rate limit: {session.limiter.summary()}).")
+    return verdicts
+
+def check_in_pool_browser(repo_url):
+    try:
+        return check_repo_in_browser(repo_url, pool_browser())
+    except Exception as e:
+        return f"error: {e}"
+
 # ------------------------------------------------------
-# 3) Setup Selenium (Attach to Running Chrome)
+# Cloning (background pool, so checking continues meanwhile)
 # ------------------------------------------------------
 
-chrome_options = Options()
-chrome_options.add_argument("--log-level=3") 
-chrome_options.debugger_address = "localhost:9222"  # Attach to already running Chrome
-driver = webdriver.Chrome(options=chrome_options)
+def clone_repo(repo_name, ssh_url, clone_path, partial):
+    if partial and os.path.exists(clone_path):
+        # Interrupted mid-clone: the folder exists but may be incomplete
+        print(f"   ♻️ {repo_name}: removing the partial clone from the interrupted run...")
+        shutil.rmtree(clone_path)
+
+    if os.path.exists(clone_path):
+        journal(repo=repo_name, status="already-cloned")
+        print(f"   🔹 {repo_name}: already cloned; skipping.")
+        return
+    print(f"   Cloning into '{clone_path}'...")
+    journal(repo=repo_name, status="cloning")
+    if args.shared_store:
+        clone_into_shared_store(ssh_url, repo_name, clone_path)
+    else:
+        import git
+        git.Repo.clone_from(ssh_url, clone_path)
+    journal(repo=repo_name, status="cloned")
+    print(f"   ✅ {repo_name}: clone complete.")
 
 # ------------------------------------------------------
-# 4) Load the list of already-reviewed repos (if any)
+# 5) Load the list of already-reviewed repos (if any)
 # ------------------------------------------------------
 
 with open(REVIEWED_REPOS_FILE, "r", encoding="utf-8") as f:
     reviewed_repos = set(line.strip() for line in f if line.strip())
 
+check_pool = None
 try:
     # --------------------------------------------------
     # A) Open the Homework URL and wait for GitHub links
     # --------------------------------------------------
 
-    print(f"🌍 Navigating to: {HOMEWORK_URL}")
-    driver.get(HOMEWORK_URL)
-    
-    WebDriverWait(driver, 20).until(
-        EC.presence_of_element_located((By.XPATH, "//a[contains(@href, 'github.com')]"))
-    )
+    if progress["links"] is not None:
+        repo_urls = progress["links"]
+        print(f"↩️ Resuming: {len(repo_urls)} repos from the journal, "
+              f"{sum(s in FINISHED_STATUSES for s in progress['repos'].values())} already finished.")
+    else:
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        print(f"🌍 Navigating to: {HOMEWORK_URL}")
+        get_driver().get(HOMEWORK_URL)
+
+        WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located((By.XPATH, "//a[contains(@href, 'github.com')]"))
+        )
 
-    links = driver.find_elements(By.XPATH, "//a[contains(@href, 'github.com')]")
-    repo_urls = [link.get_attribute("href") for link in links]
-    print(f"✅ Found {len(repo_urls)} potential GitHub repos.")
+        links = driver.find_elements(By.XPATH, "//a[contains(@href, 'github.com')]")
+        repo_urls = [link.get_attribute("href") for link in links]
+        print(f"✅ Found {len(repo_urls)} potential GitHub repos.")
+        journal(links=repo_urls)
+
+    # With --api all pending repos are checked up front; with --browsers N they are
+    # checked N at a time in the background and the loop below takes results in order
+    pending = [url for url in dict.fromkeys(repo_urls)
+               if url.split("/")[-1] not in reviewed_repos
+               and progress["repos"].get(url.split("/")[-1]) not in FINISHED_STATUSES]
+    verdicts = {}
+    if args.api:
+        verdicts = check_repos_via_api(pending)
+    elif args.browsers > 1:
+        print(f"🧭 Checking {len(pending)} repos in {args.browsers} "
+              f"{'headless browsers' if args.headless else 'Chrome tabs'}...")
+        check_pool = ThreadPoolExecutor(max_workers=args.browsers)
+        verdicts = {url: check_pool.submit(check_in_pool_browser, url) for url in pending}
+    clone_pool = ThreadPoolExecutor(max_workers=max(1, args.clone_workers))
+    clones = {}
+    unchecked = []
 
     # --------------------------------------------------
     # B) Process each repository
@@ -109,70 +479,69 @@ try:
         repo_name = repo_url.split("/")[-1]
         print(f"\n--- Checking repo '{repo_name}' ---")
 
+        # 0) Skip if this run already finished it (--resume)
+        if progress["repos"].get(repo_name) in FINISHED_STATUSES:
+            print(f"   ↩️ '{repo_name}' was finished before the interruption ({progress['repos'][repo_name]}). Skipping.")
+            continue
+
         # 1) Skip if already reviewed
         if repo_name in reviewed_repos:
             print(f"   🔸 '{repo_name}' is already marked as reviewed. Skipping.")
             continue
 
-        # 2) Open the pull requests page
-        pr_url = f"{repo_url}/pulls"
-        driver.get(pr_url)
-        time.sleep(2)
-
-        # 3) Check for "Feedback" PR with "Submitted" label
-        feedback_selector = (
-            "//div[contains(@class,'flex-auto') and "
-            ".//a[contains(text(),'Feedback')] and "
-            ".//a[contains(@class, 'IssueLabel') and normalize-space()='Submitted']]"
-        )
-        feedback_prs = driver.find_elements(By.XPATH, feedback_selector)
-        if feedback_prs:
-            print("✅ Found PR with 'Feedback' + label 'Submitted'. Checking for review text...")
-
-            # Extract the link to the "Feedback" PR
-            feedback_link = feedback_prs[0].find_element(By.XPATH, ".//a[contains(text(),'Feedback')]").get_attribute("href")
-
-            # Go to that PR page
-            driver.get(feedback_link)
-            time.sleep(2)
-
-            # 4) Check if the review contains "hodnotenie", "hodnoceni", or "evaluation"
-            review_xpaths = (
-                "//*["
-                "contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'hodnotenie') "
-                "or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'evaluation') "
-                "or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'hodnoceni')"
-                "]"
-            )
-            try:
-                driver.find_element(By.XPATH, review_xpaths)
-                print("   Found review ('hodnotenie'/'evaluation'/'hodnoceni') -> already reviewed. Skipping.")
-                reviewed_repos.add(repo_name)
-                with open(REVIEWED_REPOS_FILE, "a", encoding="utf-8") as f:
-                    f.write(repo_name + "\n")
-                continue
-
-            except NoSuchElementException:
-                # No review found → Clone the repo
-                print("   No existing evaluation found. Cloning this repo...")
-                ssh_url = repo_url.replace("https://github.com/", "git@github.com:") + ".git"
-                clone_path = os.path.join(CLONE_FOLDER, repo_name)
-
-                if not os.path.exists(clone_path):
-                    print(f"   Cloning into '{clone_path}'...")
-                    git.Repo.clone_from(ssh_url, clone_path)
-                    print("   ✅ Clone complete.")
-                else:
-                    print("   🔹 Already cloned; skipping.")
-
+        # 2) Feedback PR with 'Submitted' label + evaluation check
+        if repo_url in verdicts:
+            verdict = verdicts[repo_url]
+            verdict = verdict if isinstance(verdict, str) else verdict.result()
         else:
+            verdict = check_repo_in_browser(repo_url)
+
+        if verdict == "reviewed":
+            print("   Found review ('hodnotenie'/'evaluation'/'hodnoceni') -> already reviewed. Skipping.")
+            reviewed_repos.add(repo_name)
+            with open(REVIEWED_REPOS_FILE, "a", encoding="utf-8") as f:
+                f.write(repo_name + "\n")
+            journal(repo=repo_name, status="reviewed")
+
+        elif verdict == "clone":
+            # No review found → Clone the repo (in the background)
+            print("   No existing evaluation found. Cloning this repo...")
+            ssh_url = repo_url.replace("https://github.com/", "git@github.com:") + ".git"
+            clone_path = os.path.join(CLONE_FOLDER, repo_name)
+            partial = progress["repos"].get(repo_name) == "cloning"
+            if repo_name not in clones:
+                clones[repo_name] = clone_pool.submit(clone_repo, repo_name, ssh_url, clone_path, partial)
+
+        elif verdict == "no-feedback":
+            journal(repo=repo_name, status="no-feedback")
             print("   ❌ No 'Feedback' PR with label 'Submitted' found; skipping clone.")
 
+        else:
+            # Check failed: not journaled, so --resume checks the repo again
+            print(f"   ⚠️ Could not check '{repo_name}' ({verdict}); skipping for now.")
+            unchecked.append(repo_name)
+
+    # Wait for the background clones; a failed one stays "cloning" in the journal for --resume
+    if clones:
+        print(f"\n⏳ Waiting for {sum(not f.done() for f in clones.values())} clone(s) to finish...")
+    clone_pool.shutdown(wait=True)
+    failed = {name: f.exception() for name, f in clones.items() if f.exception()}
+    for name, error in failed.items():
+        print(f"   ❌ Cloning '{name}' failed: {error}")
+    if failed or unchecked:
+        print("   Run again with --resume to retry the repos that failed.")
+    else:
+        journal(status="done")
+
 finally:
-    driver.quit()
+    if check_pool is not None:
+        check_pool.shutdown(wait=True, cancel_futures=True)
+    close_pool_browsers()
+    if driver is not None:
+        driver.quit()
 
 # ------------------------------------------------------
-# 5) Create run_repos.sh in the cloned_repos folder
+# 6) Create run_repos.sh in the cloned_repos folder
 # ------------------------------------------------------
 run_script_content = """#!/bin/bash
 
@@ -192,6 +561,22 @@ BASE_DIR=$(pwd)
 # This file will keep track of repos we've already processed.
 PROCESSED_FILE="$BASE_DIR/processed_repos.txt"
 
+# Walk the repos in byte order, the same order review_farm.py uses for its "next N
+# repos" window (locale collation sorts mixed-case logins and punctuation differently)
+unset LC_ALL
+LC_COLLATE=C
+
+# PID from a review_farm.py PID file, only while that process is alive and really is the
+# farm (a file left behind by a crash may hold a PID that now belongs to something else)
+farm_pid() {
+    local pid
+    pid=$(cat "$1" 2>/dev/null)
+    [ -n "$pid" ] && ps -p "$pid" -o args= 2>/dev/null | grep -q "review_farm.py" && echo "$pid"
+}
+
+# How long to wait for a dev server started by review_farm.py before starting one here
+DEV_WAIT_TIMEOUT=${DEV_WAIT_TIMEOUT:-300}
+
 # Create the file if it doesn't exist
 if [ ! -f "$PROCESSED_FILE" ]; then
     touch "$PROCESSED_FILE"
@@ -220,10 +605,12 @@ for repo in */; do
     # Skip if it's not a directory
     [ ! -d "$repo" ] && continue
 
-    # If this repository is already in processed_repos, skip it
-    if grep -Fxq "$repo" "$PROCESSED_FILE"; then
+    # Skip repos already processed at their current commit ("repo sha" lines;
+    # old name-only lines still skip the repo). A new push gets reviewed again.
+    HEAD_SHA=$(git -C "$repo" rev-parse HEAD 2>/dev/null)
+    if grep -Fxq "$repo $HEAD_SHA" "$PROCESSED_FILE" || grep -Fxq "$repo" "$PROCESSED_FILE"; then
         echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-        echo "Repository '$repo' has already been processed. Skipping..."
+        echo "Repository '$repo' has already been processed at ${HEAD_SHA:0:7}. Skipping..."
         echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
         continue
     fi
@@ -231,6 +618,8 @@ for repo in */; do
     echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
     echo "REPOSITORY: $repo"
     echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+    # Tell review_farm.py which repo is on screen, so it is first in line for builds/dev servers
+    [ -d "$BASE_DIR/.prebuild" ] && echo "$repo" > "$BASE_DIR/.prebuild/current"
 
     # Construct the GitHub PR files URL dynamically
     GITHUB_PR_FILES_URL="https://github.com/FI-PV247/$repo/pull/1/files"
@@ -248,8 +637,11 @@ for repo in */; do
     # 1) Open VS Code (new window) for this repo (suppress errors)
     echo "➡️ Opening Visual Studio Code..."
     code -n . 2>/dev/null &
-    # Give VS Code time to open
-    sleep 10
+    # Wait until its window shows up (at most 10 s) instead of always sleeping 10 s
+    for _ in $(seq 1 40); do
+        wmctrl -l 2>/dev/null | grep -q "Visual Studio Code" && break
+        sleep 0.25
+    done
 
     # 2) Focus the VS Code window
     echo "➡️ Focusing the VS Code window..."
@@ -262,7 +654,29 @@ for repo in */; do
     sleep 5  # Let terminal appear
 
     # 4) Type the commands
-    if [ "$MODE" == "build" ]; then
+    PREBUILD_STATUS="$BASE_DIR/.prebuild/$repo.json"
+    if [ "$MODE" == "build" ] && [ -f "$PREBUILD_STATUS" ]; then
+        # Pre-built by review_farm.py: wait for it instead of building again
+        # (stop waiting if the farm is no longer running)
+        FARM_PID=$(farm_pid "$BASE_DIR/.prebuild/farm.pid")
+        if [ -n "$FARM_PID" ] && grep -Eq '"status": "(queued|running)"' "$PREBUILD_STATUS"; then
+            echo "⏳ Waiting for the background pre-build of '$repo'..."
+            while grep -Eq '"status": "(queued|running)"' "$PREBUILD_STATUS" && kill -0 "$FARM_PID" 2>/dev/null; do
+                sleep 1
+            done
+        fi
+        echo "🏗️ Pre-build: $(grep -Eo '"(status|duration)": [^,]*' "$PREBUILD_STATUS" | tr '\\n' ' ')"
+        xdotool type --delay 20 "tail -n 60 $BASE_DIR/.prebuild/$repo.log"
+        xdotool key Return
+
+        echo
+        echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+        echo " Review the code in VS Code. The pre-build log is in the terminal."
+        echo " When you're DONE reviewing, press ENTER here to go to the next repository."
+        echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+        read -r
+
+    elif [ "$MODE" == "build" ]; then
         echo "➡️ Typing 'npm install && npm run build'..."
         xdotool type --delay 50 "npm install && npm run build"
         xdotool key Return
@@ -276,22 +690,64 @@ for repo in */; do
         read -r
 
     elif [ "$MODE" == "dev" ]; then
-        echo "➡️ Typing 'npm install && npm run dev'..."
-        xdotool type --delay 50 "npm install && npm run dev"
-        xdotool key Return
-
-        echo "⏳ Waiting for Next.js to pick an open port (3000..3010)..."
-        
-        # Wait a few seconds for Next.js to initialize
-        sleep 5 
-
-        # Open localhost:3000 in Chrome (suppress errors)
-        echo "🌍 Opening localhost:3000"
-        google-chrome "http://localhost:3000" 2>/dev/null &
-
-        echo " WHEN FINISHED:"
-        echo "   1. Close the integrated terminal in VS Code (this kills 'npm run dev')."
-        echo "   2. Press ENTER here to move on to the next repository."
+        DEV_STATUS="$BASE_DIR/.prebuild/$repo.dev.json"
+        DEV_PID=$(farm_pid "$BASE_DIR/.prebuild/dev.pid")
+        FARM_DEV=""
+        if [ -n "$DEV_PID" ]; then
+            # Started ahead of time by 'review_farm.py dev' on its own port
+            echo "⏳ Waiting for the dev server of '$repo' (at most ${DEV_WAIT_TIMEOUT}s)..."
+            DEADLINE=$((SECONDS + DEV_WAIT_TIMEOUT))
+            while ! grep -Eq '"status": "(ready|failed)"' "$DEV_STATUS" 2>/dev/null && kill -0 "$DEV_PID" 2>/dev/null \\
+                    && [ "$SECONDS" -lt "$DEADLINE" ]; do
+                sleep 0.5
+            done
+            if grep -Eq '"status": "(ready|failed)"' "$DEV_STATUS" 2>/dev/null; then
+                FARM_DEV=1
+            else
+                echo "⌛ review_farm.py did not start '$repo' – starting the dev server here."
+            fi
+        fi
+        if [ -n "$FARM_DEV" ]; then
+            DEV_URL=$(grep -Eo '"url": "[^"]*"' "$DEV_STATUS" | cut -d'"' -f4)
+            xdotool type --delay 20 "tail -n 40 -f $BASE_DIR/.prebuild/$repo.dev.log"
+            xdotool key Return
+            if grep -q '"status": "ready"' "$DEV_STATUS"; then
+                echo "🌍 Opening $DEV_URL"
+                google-chrome "$DEV_URL" 2>/dev/null &
+            else
+                echo "❌ The dev server did not come up – its log is in the VS Code terminal."
+            fi
+
+            echo " WHEN FINISHED: press ENTER here. review_farm.py stops this server;"
+            echo " the next repos' servers are already starting."
+        else
+            echo "➡️ Typing 'npm install && npm run dev'..."
+            xdotool type --delay 50 "npm install && npm run dev"
+            xdotool key Return
+
+            # Poll instead of a fixed sleep: open the first port in 3000..3010 that answers
+            echo "⏳ Waiting for Next.js to answer on a port in 3000..3010..."
+            DEV_URL=""
+            for _ in $(seq 1 600); do
+                for port in $(seq 3000 3010); do
+                    if curl -s -o /dev/null --max-time 1 "http://localhost:$port"; then
+                        DEV_URL="http://localhost:$port"
+                        break 2
+                    fi
+                done
+                sleep 0.5
+            done
+            if [ -n "$DEV_URL" ]; then
+                echo "🌍 Opening $DEV_URL"
+                google-chrome "$DEV_URL" 2>/dev/null &
+            else
+                echo "❌ No dev server answered – check the VS Code terminal."
+            fi
+
+            echo " WHEN FINISHED:"
+            echo "   1. Close the integrated terminal in VS Code (this kills 'npm run dev')."
+            echo "   2. Press ENTER here to move on to the next repository."
+        fi
         echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
         read -r
 
@@ -304,12 +760,13 @@ for repo in */; do
     # 5) After pressing enter, close all VS Code windows and remove cache again
     close_and_clear_vscode
 
-    # Mark this repo as processed
-    echo "$repo" >> "$PROCESSED_FILE"
+    # Mark this repo as processed at this commit
+    echo "$repo $HEAD_SHA" >> "$PROCESSED_FILE"
 
     # Return to the base directory
     cd "$BASE_DIR" || exit
 done
+rm -f "$BASE_DIR/.prebuild/current"
 
 echo
 echo "✅ All repositories processed!"
@@ -322,8 +779,21 @@ with open(run_script_path, "w", encoding="utf-8") as f:
 # Make it executable
 os.chmod(run_script_path, 0o755)
 
+# ------------------------------------------------------
+# 7) Optionally start the background pre-build farm
+# ------------------------------------------------------
+if args.prebuild:
+    farm = os.path.join(os.path.dirname(os.path.abspath(__file__)), "review_farm.py")
+    os.makedirs(os.path.join(CLONE_FOLDER, ".prebuild"), exist_ok=True)
+    farm_log = open(os.path.join(CLONE_FOLDER, ".prebuild", "farm.log"), "w", encoding="utf-8")
+    subprocess.Popen([sys.executable, farm, "build", CLONE_FOLDER], stdout=farm_log, stderr=subprocess.STDOUT,
+                     stdin=subprocess.DEVNULL, start_new_session=True)
+    print(f"\n🏗️ Pre-building all repos in the background (progress: {CLONE_FOLDER}/.prebuild/farm.log).")
+
 print("\n✅ All repositories processed! A script named 'run_repos.sh' was created in the 'cloned_repos' folder.")
 print("To run it, use:")
 print(f"    cd {CLONE_FOLDER}")
 print("    ./run_repos.sh build   # To install dependencies and build projects")
 print("    ./run_repos.sh dev     # To install dependencies and run projects in dev mode")
+print(f"    python3 {os.path.join(os.path.dirname(os.path.abspath(__file__)), 'review_farm.py')} dev {CLONE_FOLDER}"
+      "   # (second terminal) dev servers of the next repos ready ahead of time")
@@ -0,0 +1,1154 @@
+#!/usr/bin/env python3
+"""
+Review farm: background jobs over all repos in a cloned_repos folder
+(created by klonovanie.py or step1_orchestrator.py).
+
+    python3 review_farm.py build <cloned_repos>     # pre-build every repo in parallel
+    python3 review_farm.py deps <cloned_repos>      # only link shared node_modules into every repo
+    python3 review_farm.py dev <cloned_repos>       # keep dev servers of the next repos running
+    python3 review_farm.py check <cloned_repos>     # tsc / eslint / build / test everywhere, ranked report
+
+Builds run headless (no VS Code / xdotool). The number of parallel builds is bounded by
+CPU cores and available memory, and a new build only starts while there is enough free
+memory for it. Repos are built in the same order run_repos.sh visits them, so the first
+ones are ready first. Repos listed in processed_repos.txt are skipped.
+
+Everything goes to <cloned_repos>/.prebuild/ (the leading dot keeps it out of
+run_repos.sh's `for repo in */` loop):
+    <repo>.log    combined stdout/stderr of the build
+    <repo>.json   {"status": queued|running|ok|failed|timeout|interrupted, "exit_code", "duration", ...}
+    report.json   all repos of the last run
+
+`./run_repos.sh build` picks these up: it waits for the repo's pre-build instead of
+starting its own, and shows the log.
+
+Dev servers: `dev` keeps `npm run dev` running for the next N repos that run_repos.sh will
+show. Each one gets its own port (from 3100 up), and a repo counts as ready once its
+URL answers HTTP. A server is stopped as soon as run_repos.sh writes its repo to
+processed_repos.txt, and the next repo in line is started. Status goes to
+.prebuild/<repo>.dev.json ({"status": starting|ready|failed|stopped, "url", ...}) and
+output to .prebuild/<repo>.dev.log. `./run_repos.sh dev` then just opens the URL.
+
+Checks: `check` runs tsc --noEmit, eslint, npm run build and npm test (or --check
+NAME=COMMAND) in every repo, one repo per job. Each check has a timeout and a memory cap:
+node's heap is limited via NODE_OPTIONS, and a watchdog kills a check whose process
+group grows past the cap in RSS. Checks a repo cannot run (no tsconfig.json, no eslint
+config, no such npm script) are skipped. Results come from the build cache whenever the
+(HEAD, lockfile, command) key matches. Logs go to .prebuild/checks/<repo>/<check>.log.
+.prebuild/checks/report.json and report.csv rank the repos by failed checks, then by
+error count, so the ones that need a human come first.
+
+Build cache: every finished build (ok or failed) is stored in <cloned_repos>/.build_cache/<key>/
+(result.json, build.log, and .next without .next/cache), with the key taken from
+(HEAD sha, lockfile key, build command). An unchanged submission gets its cached result
+and .next back instantly. Only repos with a new HEAD, lockfile or command are rebuilt.
+Repos with uncommitted changes are never cached. With --state-db, results are also
+recorded into step1_orchestrator's state DB next to tested_sha (see `--query unbuilt`).
+
+Shared node_modules: most submissions keep the template's package-lock.json, so `deps`
+(and `build`, before building) installs each distinct lockfile only once into
+<cloned_repos>/.node_modules_store/<key>/ and links that tree into every repo with the
+same key. Linking prefers reflinks (copy-on-write), then hardlinks, then a symlink;
+`npm install` in a linked repo then finds node_modules up to date. The key covers
+package-lock.json, the dependency fields of package.json and the node version, so only
+repos with a diverging lockfile get an install of their own. Repos without a
+package-lock.json are left alone. With --link symlink every repo shares one tree, and
+an `npm install` that changes anything changes it for all of them.
+"""
+
+import os
+import sys
+import re
+import csv
+import json
+import time
+import shutil
+import contextlib
+import socket
+import signal
+import sqlite3
+import hashlib
+import platform
+import argparse
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BUILD_COMMAND = "npm install && npm run build"
+DEFAULT_DEV_COMMAND = "npm install && npm run dev -- --port {port}"
+REPORT_DIR = ".prebuild"
+DEPS_STORE = ".node_modules_store"
+BUILD_CACHE = ".build_cache"
+BUILD_MARKER = ".pv247-build"            # cache key of the build a .next folder comes from
+DEPS_MARKER = ".pv247-deps"              # key of the store tree, inside every linked node_modules
+DEPS_FIELDS = ("dependencies", "devDependencies", "optionalDependencies", "peerDependencies", "overrides")
+DEFAULT_INSTALL_COMMAND = "npm ci"
+LINK_MODES = ("auto", "reflink", "hardlink", "symlink")
+CHECKS_DIR = os.path.join(REPORT_DIR, "checks")
+ESLINT_CONFIGS = ("eslint.config.js", "eslint.config.mjs", "eslint.config.cjs", "eslint.config.ts",
+                  ".eslintrc", ".eslintrc.js", ".eslintrc.cjs", ".eslintrc.json", ".eslintrc.yml", ".eslintrc.yaml")
+# name -> command, when it applies (a file that must exist / an npm script) and how to count errors in its log
+CHECKS = {
+    "tsc": {"command": "npx --no-install tsc --noEmit", "needs": ("tsconfig.json",), "errors": r"error TS\d+"},
+    "eslint": {"command": "npx --no-install eslint .", "needs": ESLINT_CONFIGS, "errors": r"(?m)^\s+\d+:\d+\s+error\b"},
+    "build": {"command": "npm run build", "script": "build"},
+    "test": {"command": "npm test", "script": "test"},
+}
+
+# ------------------------------------------------------
+# Repos and reports
+# ------------------------------------------------------
+
+def read_processed(root):
+    """processed_repos.txt as {repo: set of processed HEAD shas}; None = old name-only line (any HEAD)."""
+    processed = {}
+    try:
+        with open(os.path.join(root, "processed_repos.txt"), "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if parts:
+                    processed.setdefault(parts[0], set()).add(parts[1] if len(parts) > 1 else None)
+    except OSError:
+        pass
+    return processed
+
+def discover_repos(root):
+    """Repo folders in `root` in run_repos.sh order, without the ones already processed at their HEAD.
+
+    Names sort by code point, which is the byte order of run_repos.sh's `*/` glob (the script
+    runs with LC_COLLATE=C). The repo run_repos.sh is showing right now (.prebuild/current)
+    always comes first, so it is never left out of a "next N repos" window.
+    """
+    processed = read_processed(root)
+    repos = []
+    for name in sorted(os.listdir(root)):
+        if name.startswith(".") or not os.path.isdir(os.path.join(root, name)):
+            continue
+        shas = processed.get(name, set())
+        if None in shas or (shas and head_sha(os.path.join(root, name)) in shas):
+            continue
+        repos.append(name)
+    current = read_current(root)
+    if current in repos:
+        repos.remove(current)
+        repos.insert(0, current)
+    return repos
+
+def read_current(root):
+    try:
+        with open(os.path.join(root, REPORT_DIR, "current"), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def head_sha(repo_path):
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo_path, text=True,
+                              capture_output=True, check=True).stdout.strip()
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+def status_path(root, repo):
+    return os.path.join(root, REPORT_DIR, f"{repo}.json")
+
+def read_status(root, repo):
+    try:
+        with open(status_path(root, repo), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_status(root, repo, status):
+    """Atomic write, so run_repos.sh never reads a half-written file."""
+    path = status_path(root, repo)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp, path)
+
+# ------------------------------------------------------
+# Resource limits
+# ------------------------------------------------------
+
+def available_memory_mb():
+    """MemAvailable from /proc/meminfo (Linux); None where it is not available."""
+    try:
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+def default_jobs(mem_per_job_mb):
+    cpus = os.cpu_count() or 2
+    # next build / tsc use more than one core each
+    jobs = max(1, cpus // 2)
+    free = available_memory_mb()
+    if free is not None:
+        jobs = min(jobs, max(1, free // mem_per_job_mb))
+    return jobs
+
+class MemoryGate:
+    """Lets a job start only while at least `mem_per_job_mb` is free (one job may always run)."""
+
+    def __init__(self, mem_per_job_mb):
+        self.mem_per_job_mb = mem_per_job_mb
+        self.lock = threading.Lock()
+        self.running = 0
+
+    def enter(self):
+        while True:
+            with self.lock:
+                free = available_memory_mb()
+                if self.running == 0 or free is None or free >= self.mem_per_job_mb:
+                    self.running += 1
+                    return
+            time.sleep(1)
+
+    def leave(self):
+        with self.lock:
+            self.running -= 1
+
+# ------------------------------------------------------
+# Jobs
+# ------------------------------------------------------
+
+running_jobs = {}  # repo -> Popen, so Ctrl-C can stop whole process groups
+running_lock = threading.Lock()
+
+def build_env():
+    env = dict(os.environ)
+    env.setdefault("CI", "1")                        # no interactive prompts / spinners
+    env.setdefault("NEXT_TELEMETRY_DISABLED", "1")
+    env.setdefault("npm_config_fund", "false")
+    env.setdefault("npm_config_audit", "false")
+    return env
+
+def run_logged(name, command, cwd, log, timeout, env=None):
+    """Run `command` in its own process group, output to `log`. Exit code, None after a timeout."""
+    log.write(f"$ {command}\n")
+    log.flush()
+    proc = subprocess.Popen(command, shell=True, cwd=cwd, stdout=log, stderr=subprocess.STDOUT,
+                            stdin=subprocess.DEVNULL, env=env or build_env(), start_new_session=True)
+    with running_lock:
+        running_jobs[name] = proc
+    try:
+        return proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_group(proc)
+        proc.wait()
+        log.write(f"\n⏱️ Killed after {timeout}s\n")
+        return None
+    finally:
+        with running_lock:
+            running_jobs.pop(name, None)
+
+def run_job(root, repo, command, timeout, gate):
+    """Run `command` in the repo; log + status file under .prebuild/. Returns the final status."""
+    repo_path = os.path.join(root, repo)
+    log_path = os.path.join(root, REPORT_DIR, f"{repo}.log")
+    status = {"repo": repo, "command": command, "head_sha": head_sha(repo_path),
+              "log": os.path.abspath(log_path), "status": "running", "started": time.time()}
+    gate.enter()
+    try:
+        status["started"] = time.time()
+        write_status(root, repo, status)
+        with open(log_path, "w", encoding="utf-8") as log:
+            exit_code = run_logged(repo, command, repo_path, log, timeout)
+        status["exit_code"] = exit_code
+        status["status"] = "timeout" if exit_code is None else "ok" if exit_code == 0 else "failed"
+    finally:
+        gate.leave()
+    status["finished"] = time.time()
+    status["duration"] = round(status["finished"] - status["started"], 1)
+    write_status(root, repo, status)
+    return status
+
+def kill_group(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def stop_all(root, repos):
+    """Kill running jobs; running and queued repos are marked interrupted."""
+    with running_lock:
+        jobs = dict(running_jobs)
+    for proc in jobs.values():
+        kill_group(proc)
+    for repo in repos:
+        status = read_status(root, repo) or {"repo": repo}
+        if status.get("status") in ("queued", "running"):
+            status.update(status="interrupted", finished=time.time())
+            write_status(root, repo, status)
+
+def parallel_map(fn, items, workers):
+    """pool.map that does not wait for running jobs on Ctrl-C (the caller kills them with stop_all)."""
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        results = list(pool.map(fn, items))
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown(wait=True)
+    return results
+
+# ------------------------------------------------------
+# Shared dependencies (node_modules store)
+# ------------------------------------------------------
+
+_node_version = None
+
+def node_version():
+    global _node_version
+    if _node_version is None:
+        try:
+            _node_version = subprocess.run(["node", "--version"], text=True, capture_output=True).stdout.strip()
+        except OSError:
+            _node_version = "no-node"
+    return _node_version
+
+def lockfile_key(repo_path):
+    """Store key of the repo's dependency tree; None without package-lock.json / package.json.
+
+    Besides the lockfile it covers the dependency fields of package.json (`npm ci` refuses a
+    lockfile out of sync with them) and node version + platform (native addons)."""
+    try:
+        with open(os.path.join(repo_path, "package-lock.json"), "rb") as f:
+            lock = f.read()
+        with open(os.path.join(repo_path, "package.json"), "r", encoding="utf-8") as f:
+            package = json.load(f)
+    except (OSError, ValueError):
+        return None
+    digest = hashlib.sha256(lock)
+    digest.update(json.dumps({k: package.get(k) for k in DEPS_FIELDS}, sort_keys=True).encode())
+    digest.update(f"{node_version()} {sys.platform} {platform.machine()}".encode())
+    return digest.hexdigest()[:20]
+
+def read_marker(folder, name=DEPS_MARKER):
+    try:
+        with open(os.path.join(folder, name), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def write_marker(folder, name, value):
+    with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+        f.write(value)
+
+def tree_size(path):
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+def read_store_info(store, key):
+    try:
+        with open(os.path.join(store, key, "deps.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def install_into_store(store, key, repo_path, command, timeout, gate):
+    """Install the repo's lockfile once into <store>/<key>/node_modules. Returns installed|reused|failed."""
+    final = os.path.join(store, key)
+    if read_marker(os.path.join(final, "node_modules")) == key:
+        return "reused"
+    staging = f"{final}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    with open(os.path.join(repo_path, "package.json"), "r", encoding="utf-8") as f:
+        package = json.load(f)
+    # The repo's own lifecycle scripts (prepare: husky install, ...) run with its own npm install
+    package.pop("scripts", None)
+    with open(os.path.join(staging, "package.json"), "w", encoding="utf-8") as f:
+        json.dump(package, f, indent=2)
+    for name in ("package-lock.json", ".npmrc"):
+        if os.path.exists(os.path.join(repo_path, name)):
+            shutil.copy2(os.path.join(repo_path, name), staging)
+
+    gate.enter()
+    try:
+        with open(os.path.join(store, f"{key}.log"), "w", encoding="utf-8") as log:
+            log.write(f"# lockfile of {repo_path}\n")
+            exit_code = run_logged(f"deps:{key}", command, staging, log, timeout)
+    finally:
+        gate.leave()
+    if exit_code != 0:
+        shutil.rmtree(staging, ignore_errors=True)
+        return "failed"
+
+    node_modules = os.path.join(staging, "node_modules")
+    os.makedirs(node_modules, exist_ok=True)
+    write_marker(node_modules, DEPS_MARKER, key)
+    with open(os.path.join(staging, "deps.json"), "w", encoding="utf-8") as f:
+        json.dump({"key": key, "source": repo_path, "command": command, "node": node_version(),
+                   "size": tree_size(node_modules), "installed": time.time()}, f, indent=2)
+    try:
+        os.rename(staging, final)
+    except OSError:
+        # Another farm run finished the same key first
+        shutil.rmtree(staging, ignore_errors=True)
+    return "installed"
+
+def link_tree(src, dst, mode):
+    if mode == "symlink":
+        os.symlink(src, dst)
+        return
+    flags = {"reflink": ["-a", "--reflink=always"], "hardlink": ["-al"]}[mode]
+    result = subprocess.run(["cp", *flags, src, dst], text=True, capture_output=True)
+    if result.returncode != 0:
+        shutil.rmtree(dst, ignore_errors=True)
+        raise OSError(result.stderr.strip() or f"cp {' '.join(flags)} failed")
+
+class Linker:
+    """Links store trees into repos; in auto mode the first mode that works (reflink, hardlink, symlink) sticks."""
+
+    def __init__(self, mode):
+        self.lock = threading.Lock()
+        self.resolved = None if mode == "auto" else mode
+
+    def link(self, src, dst):
+        with self.lock:
+            modes = [self.resolved] if self.resolved else ["reflink", "hardlink", "symlink"]
+        error = None
+        for mode in modes:
+            try:
+                link_tree(src, dst, mode)
+            except OSError as e:
+                error = e
+                continue
+            with self.lock:
+                self.resolved = self.resolved or mode
+            return mode
+        raise error
+
+def link_deps(repo_path, src, key, linker):
+    """Replace the repo's node_modules with the store tree `src` (kept when it already is that tree)."""
+    dst = os.path.join(repo_path, "node_modules")
+    if read_marker(dst) == key:
+        return "present"
+    if os.path.islink(dst):
+        os.unlink(dst)
+    elif os.path.exists(dst):
+        shutil.rmtree(dst)
+    return linker.link(src, dst)
+
+def materialize_deps(root, repos, args, gate, jobs):
+    """Install every distinct lockfile once into the store and link it into the repos.
+    Writes .prebuild/deps.json and returns {repo: {"key", "deps"}}."""
+    store = os.path.abspath(args.store or os.path.join(root, DEPS_STORE))
+    os.makedirs(store, exist_ok=True)
+    keys = dict(zip(repos, parallel_map(lambda repo: lockfile_key(os.path.join(root, repo)), repos, 8)))
+    by_key = {}
+    for repo, key in keys.items():
+        if key:
+            by_key.setdefault(key, []).append(repo)
+    print(f"📦 {len(by_key)} distinct lockfile(s) across {len(repos)} repo(s) "
+          f"({len(repos) - sum(map(len, by_key.values()))} without package-lock.json); store: {store}")
+
+    def install(key):
+        outcome = install_into_store(store, key, os.path.join(root, by_key[key][0]),
+                                     args.install_command, args.timeout, gate)
+        if outcome != "reused":
+            icon = "✅" if outcome == "installed" else "❌"
+            print(f"   {icon} {key} ({len(by_key[key])} repo(s), e.g. {by_key[key][0]}): {outcome}")
+        return outcome
+
+    installs = dict(zip(by_key, parallel_map(install, list(by_key), jobs)))
+    linker = Linker(args.link)
+
+    def link(repo):
+        key = keys[repo]
+        if key is None:
+            return {"key": None, "deps": "no-lockfile"}
+        if installs[key] == "failed":
+            return {"key": key, "deps": "install-failed", "log": os.path.join(store, f"{key}.log")}
+        try:
+            mode = link_deps(os.path.join(root, repo), os.path.join(store, key, "node_modules"), key, linker)
+        except OSError as e:
+            return {"key": key, "deps": "link-failed", "error": str(e)}
+        return {"key": key, "deps": mode}
+
+    results = dict(zip(repos, parallel_map(link, repos, 4)))
+    with open(os.path.join(root, REPORT_DIR, "deps.json"), "w", encoding="utf-8") as f:
+        json.dump({"store": store, "installs": installs, "repos": results}, f, indent=2)
+
+    counts = {}
+    for r in results.values():
+        counts[r["deps"]] = counts.get(r["deps"], 0) + 1
+    saved = sum((len(group) - 1) * ((read_store_info(store, key) or {}).get("size") or 0)
+                for key, group in by_key.items() if installs[key] != "failed")
+    print(f"   {sum(v == 'installed' for v in installs.values())} install(s), "
+          f"{sum(v == 'reused' for v in installs.values())} reused from the store; repos: "
+          + ", ".join(f"{k} {v}" for k, v in sorted(counts.items()))
+          + f"; ≈{saved / 2**20:.0f} MB of duplicate node_modules avoided.")
+    for repo, r in results.items():
+        if r["deps"] in ("install-failed", "link-failed"):
+            print(f"   ⚠️ {repo}: {r['deps']} {r.get('log') or r.get('error')} (its own npm install will run)")
+    return results
+
+def prune_store(root, store):
+    """Remove store trees (and leftovers of interrupted installs) no repo in `root` uses."""
+    used = {lockfile_key(os.path.join(root, name)) for name in os.listdir(root)
+            if not name.startswith(".") and os.path.isdir(os.path.join(root, name))}
+    removed = 0
+    for name in os.listdir(store):
+        key = name.split(".", 1)[0]
+        if key not in used or ".tmp-" in name:
+            path = os.path.join(store, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+            removed += 1
+    print(f"🧹 Removed {removed} unused entr{'y' if removed == 1 else 'ies'} from {store}.")
+
+# ------------------------------------------------------
+# Build cache
+# ------------------------------------------------------
+
+def is_dirty(repo_path):
+    """Uncommitted changes to tracked files (package-lock.json rewritten by npm install does not count)."""
+    try:
+        out = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_path,
+                             text=True, capture_output=True, check=True).stdout
+    except (subprocess.CalledProcessError, OSError):
+        return True
+    return any(line[3:] != "package-lock.json" for line in out.splitlines())
+
+def build_key(repo_path, command):
+    """Cache key of a build: (HEAD sha, lockfile key, command). None = not cacheable (no git / dirty tree)."""
+    sha = head_sha(repo_path)
+    if not sha or is_dirty(repo_path):
+        return None
+    material = f"{sha}\0{lockfile_key(repo_path) or '-'}\0{command}"
+    return hashlib.sha256(material.encode()).hexdigest()[:24]
+
+def cache_get(cache, key):
+    try:
+        with open(os.path.join(cache, key, "result.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def copy_next(src, dst):
+    """Copy a .next folder without .next/cache (webpack cache, only useful for rebuilds)."""
+    shutil.copytree(src, dst, symlinks=True, ignore=lambda folder, names: ["cache"] if folder == src else [])
+
+def cache_put(cache, key, repo_path, status, with_next=True):
+    """Store a finished build: result.json, build.log and (for OK builds) .next."""
+    final = os.path.join(cache, key)
+    staging = f"{final}.tmp-{os.getpid()}-{threading.get_ident()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    shutil.copy2(status["log"], os.path.join(staging, "build.log"))
+    next_dir = os.path.join(repo_path, ".next")
+    if with_next and status["status"] == "ok" and os.path.isdir(next_dir):
+        write_marker(next_dir, BUILD_MARKER, key)
+        copy_next(next_dir, os.path.join(staging, "next"))
+    result = {name: status.get(name) for name in ("status", "exit_code", "duration", "command", "head_sha", "finished")}
+    with open(os.path.join(staging, "result.json"), "w", encoding="utf-8") as f:
+        json.dump({**result, "key": key}, f, indent=2)
+    shutil.rmtree(final, ignore_errors=True)
+    try:
+        os.rename(staging, final)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+
+def cache_restore(cache, key, root, repo, result):
+    """Cached build → log + status under .prebuild/, and its .next into the repo unless already there."""
+    log_path = os.path.join(root, REPORT_DIR, f"{repo}.log")
+    shutil.copy2(os.path.join(cache, key, "build.log"), log_path)
+    cached_next = os.path.join(cache, key, "next")
+    next_dir = os.path.join(root, repo, ".next")
+    if os.path.isdir(cached_next) and read_marker(next_dir, BUILD_MARKER) != key:
+        shutil.rmtree(next_dir, ignore_errors=True)
+        copy_next(cached_next, next_dir)
+    status = {**result, "repo": repo, "log": os.path.abspath(log_path), "cached": True}
+    write_status(root, repo, status)
+    return status
+
+def build_and_cache(root, repo, key, args, gate, cache):
+    status = run_job(root, repo, args.command, args.timeout, gate)
+    status["key"] = key
+    # Timeouts / interrupts say nothing about the submission – those are retried next time
+    if key and status["status"] in ("ok", "failed"):
+        cache_put(cache, key, os.path.join(root, repo), status)
+    return status
+
+def record_builds(db_path, root, results):
+    """Build results → step1_orchestrator's state DB, next to tested_sha of the same checkout.
+
+    Rows are matched on the absolute clone_path step1_orchestrator recorded, so repos of the same
+    name in other homeworks / orgs are left alone.
+    """
+    db = sqlite3.connect(db_path)
+    try:
+        have = {row[1] for row in db.execute("PRAGMA table_info(prs)")}
+        if not have:
+            print(f"⚠️ {db_path} has no prs table – not a step1_orchestrator state DB.")
+            return
+        with db:
+            for column, kind in (("built_sha", "TEXT"), ("build_status", "TEXT"), ("build_key", "TEXT"),
+                                 ("built_at", "REAL")):
+                if column not in have:
+                    db.execute(f"ALTER TABLE prs ADD COLUMN {column} {kind}")
+            db.execute("CREATE INDEX IF NOT EXISTS prs_clone_path ON prs(clone_path)")
+            updated = 0
+            for r in results:
+                if r["status"] not in ("ok", "failed") or not r.get("head_sha"):
+                    continue
+                updated += db.execute(
+                    "UPDATE prs SET built_sha = ?, build_status = ?, build_key = ?, built_at = ? "
+                    "WHERE clone_path = ?",
+                    (r["head_sha"], r["status"], r.get("key"), r.get("finished") or time.time(),
+                     os.path.realpath(os.path.join(root, r["repo"])))).rowcount
+        print(f"🗃️  Recorded {updated} build result(s) in {db_path}.")
+    finally:
+        db.close()
+
+# ------------------------------------------------------
+# Dev servers
+# ------------------------------------------------------
+
+def port_free(port):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        # like node's own listen(): a port still in TIME_WAIT counts as free
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("127.0.0.1", port))
+        except OSError:
+            return False
+    return True
+
+def http_up(url):
+    """Any HTTP answer counts – a 404/500 page is what the reviewer should see, too."""
+    try:
+        with urllib.request.urlopen(url, timeout=2):
+            return True
+    except urllib.error.HTTPError:
+        return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+def dev_status_path(root, repo):
+    return os.path.join(root, REPORT_DIR, f"{repo}.dev.json")
+
+def write_dev_status(root, repo, status):
+    path = dev_status_path(root, repo)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+class DevPool:
+    """Dev servers of the repos in the review window, one port each.
+
+    sync() is called with the next N unprocessed repos: servers of repos that left the
+    window are stopped, missing ones are started (while memory allows). A thread per
+    server polls its URL and flips the status file to ready (or failed if it exits)."""
+
+    def __init__(self, root, args):
+        self.root = root
+        self.args = args
+        self.lock = threading.Lock()
+        self.servers = {}  # repo -> {"proc", "port", "status"}
+
+    def next_port(self):
+        used = {s["port"] for s in self.servers.values()}
+        port = self.args.base_port
+        while port in used or not port_free(port):
+            port += 1
+        return port
+
+    def start(self, repo):
+        port = self.next_port()
+        url = f"http://localhost:{port}"
+        command = self.args.command.format(port=port)
+        log_path = os.path.join(self.root, REPORT_DIR, f"{repo}.dev.log")
+        status = {"repo": repo, "status": "starting", "port": port, "url": url, "command": command,
+                  "log": os.path.abspath(log_path), "started": time.time()}
+        with open(log_path, "w", encoding="utf-8") as log:
+            log.write(f"$ {command}\n")
+            log.flush()
+            env = build_env()
+            env["PORT"] = str(port)
+            proc = subprocess.Popen(command, shell=True, cwd=os.path.join(self.root, repo), stdout=log,
+                                    stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, env=env,
+                                    start_new_session=True)
+        status["pid"] = proc.pid
+        write_dev_status(self.root, repo, status)
+        self.servers[repo] = {"proc": proc, "port": port, "status": status}
+        print(f"   🚀 {repo}: starting on {url}")
+        threading.Thread(target=self.probe, args=(repo, proc, status), daemon=True).start()
+
+    def probe(self, repo, proc, status):
+        deadline = time.time() + self.args.ready_timeout
+        while time.time() < deadline:
+            if proc.poll() is not None:
+                result = {"status": "failed", "exit_code": proc.returncode}
+                break
+            if http_up(status["url"]):
+                result = {"status": "ready"}
+                break
+            time.sleep(0.5)
+        else:
+            result = {"status": "failed", "exit_code": None, "error": f"no HTTP answer in {self.args.ready_timeout}s"}
+        with self.lock:
+            if self.servers.get(repo, {}).get("proc") is not proc:
+                return  # stopped meanwhile
+            status.update(result, ready_after=round(time.time() - status["started"], 1))
+            write_dev_status(self.root, repo, status)
+        icon = "🟢" if status["status"] == "ready" else "❌"
+        print(f"   {icon} {repo}: {status['status']} after {status['ready_after']}s ({status['url']})")
+
+    def stop(self, repo):
+        server = self.servers.pop(repo)
+        kill_group(server["proc"])
+        server["proc"].wait()
+        server["status"].update(status="stopped", finished=time.time())
+        write_dev_status(self.root, repo, server["status"])
+        print(f"   ⏹️  {repo}: stopped (port {server['port']} free)")
+
+    def sync(self, window):
+        with self.lock:
+            for repo in [r for r in self.servers if r not in window]:
+                self.stop(repo)
+            for repo in window:
+                if repo in self.servers:
+                    continue
+                free = available_memory_mb()
+                if self.servers and free is not None and free < self.args.mem_per_job:
+                    break  # start it once an earlier repo is done
+                self.start(repo)
+
+    def stop_all(self):
+        with self.lock:
+            for repo in list(self.servers):
+                self.stop(repo)
+
+# ------------------------------------------------------
+# Checks
+# ------------------------------------------------------
+
+def rss_by_group():
+    """Resident memory (MB) per process group, from /proc (Linux); {} elsewhere."""
+    page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    totals = {}
+    try:
+        pids = [pid for pid in os.listdir("/proc") if pid.isdigit()]
+    except OSError:
+        return totals
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        # fields[0] is stat field 3 (state): pgrp = field 5, rss (pages) = field 24
+        group = int(fields[2])
+        totals[group] = totals.get(group, 0) + int(fields[21]) * page
+    return {group: rss // 2**20 for group, rss in totals.items()}
+
+class MemoryWatchdog:
+    """Kills a running job's process group once its total RSS exceeds `cap_mb`."""
+
+    def __init__(self, cap_mb):
+        self.cap_mb = cap_mb
+        self.killed = set()  # job names
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.watch, daemon=True)
+        self.thread.start()
+
+    def watch(self):
+        while not self.stopped.wait(1):
+            with running_lock:
+                jobs = dict(running_jobs)
+            if not jobs:
+                continue
+            rss = rss_by_group()
+            for name, proc in jobs.items():
+                if rss.get(proc.pid, 0) > self.cap_mb:
+                    self.killed.add(name)
+                    kill_group(proc)
+
+    def stop(self):
+        self.stopped.set()
+
+def check_env(mem_cap_mb):
+    env = build_env()
+    # node dies with a heap OOM before the watchdog has to kill the whole group
+    heap = f"--max-old-space-size={mem_cap_mb * 3 // 4}"
+    env["NODE_OPTIONS"] = f"{env.get('NODE_OPTIONS', '')} {heap}".strip()
+    return env
+
+def check_applies(repo_path, spec, scripts):
+    if "needs" in spec and not any(os.path.exists(os.path.join(repo_path, name)) for name in spec["needs"]):
+        return f"no {spec['needs'][0]}"
+    if "script" in spec and spec["script"] not in scripts:
+        return f"no '{spec['script']}' script"
+    return None
+
+def count_errors(log_path, pattern):
+    if not pattern:
+        return None
+    try:
+        with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+            return len(re.findall(pattern, f.read()))
+    except OSError:
+        return None
+
+def check_repo(root, repo, checks, args, gate, watchdog, cache):
+    """All checks of one repo, one after another (they share node_modules and .next)."""
+    repo_path = os.path.join(root, repo)
+    log_dir = os.path.join(root, CHECKS_DIR, repo)
+    os.makedirs(log_dir, exist_ok=True)
+    try:
+        with open(os.path.join(repo_path, "package.json"), "r", encoding="utf-8") as f:
+            scripts = json.load(f).get("scripts") or {}
+    except (OSError, ValueError):
+        scripts = {}
+    row = {"repo": repo, "head_sha": head_sha(repo_path), "checks": {}}
+    env = check_env(args.mem_cap)
+    gate.enter()
+    try:
+        # Keys first: a real npm install may still rewrite package-lock.json
+        keys = {name: build_key(repo_path, spec["command"]) for name, spec in checks.items()}
+        if not os.path.isdir(os.path.join(repo_path, "node_modules")) and os.path.exists(
+                os.path.join(repo_path, "package.json")):
+            with open(os.path.join(log_dir, "install.log"), "w", encoding="utf-8") as log:
+                exit_code = run_logged(f"{repo}:install", "npm install", repo_path, log, args.timeout, env)
+            if exit_code != 0:
+                row["install"] = "failed"
+        for name, spec in checks.items():
+            log_path = os.path.join(log_dir, f"{name}.log")
+            skipped = check_applies(repo_path, spec, scripts)
+            if row.get("install") == "failed":
+                skipped = "npm install failed"
+            cached = cache_get(cache, keys[name]) if keys[name] and not args.force else None
+            if skipped:
+                result = {"status": "skipped", "reason": skipped}
+            elif cached:
+                shutil.copy2(os.path.join(cache, keys[name], "build.log"), log_path)
+                result = {"status": cached["status"], "exit_code": cached["exit_code"],
+                          "duration": cached["duration"], "cached": True}
+            else:
+                started = time.time()
+                with open(log_path, "w", encoding="utf-8") as log:
+                    exit_code = run_logged(f"{repo}:{name}", spec["command"], repo_path, log, args.timeout, env)
+                    if f"{repo}:{name}" in watchdog.killed:
+                        log.write(f"\n🧠 Killed above {args.mem_cap} MB RSS\n")
+                status = ("memory" if f"{repo}:{name}" in watchdog.killed else "timeout" if exit_code is None
+                          else "ok" if exit_code == 0 else "failed")
+                result = {"status": status, "exit_code": exit_code, "duration": round(time.time() - started, 1)}
+                if keys[name] and status in ("ok", "failed"):
+                    cache_put(cache, keys[name], repo_path,
+                              {**result, "log": log_path, "command": spec["command"], "head_sha": row["head_sha"],
+                               "finished": time.time()}, with_next=name == "build")
+            if result["status"] != "skipped":
+                result["errors"] = count_errors(log_path, spec.get("errors"))
+                result["log"] = os.path.abspath(log_path)
+            row["checks"][name] = result
+    finally:
+        gate.leave()
+    bad = [n for n, r in row["checks"].items() if r["status"] not in ("ok", "skipped")]
+    row["failures"] = len(bad) + (row.get("install") == "failed")
+    row["errors"] = sum(r.get("errors") or 0 for r in row["checks"].values())
+    row["failed"] = bad
+    return row
+
+def write_check_report(root, checks, rows, wall):
+    """Rank repos by failed checks, then error count; JSON + CSV under .prebuild/checks/."""
+    rows.sort(key=lambda r: (-r["failures"], -r["errors"], r["repo"]))
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    folder = os.path.join(root, CHECKS_DIR)
+    with open(os.path.join(folder, "report.json"), "w", encoding="utf-8") as f:
+        json.dump({"checks": {n: spec["command"] for n, spec in checks.items()}, "wall": round(wall, 1),
+                   "repos": rows}, f, indent=2)
+    with open(os.path.join(folder, "report.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "repo", "failures", "errors", "head_sha"]
+                        + [col for n in checks for col in (n, f"{n}_errors", f"{n}_s")])
+        for row in rows:
+            cells = []
+            for name in checks:
+                r = row["checks"].get(name, {})
+                cells += [r.get("status"), r.get("errors"), r.get("duration")]
+            writer.writerow([row["rank"], row["repo"], row["failures"], row["errors"], row["head_sha"]] + cells)
+    return folder
+
+# ------------------------------------------------------
+# Commands
+# ------------------------------------------------------
+
+def print_report(results, wall):
+    order = {"failed": 0, "timeout": 1, "interrupted": 2, "ok": 3}
+    print(f"\n{'repo':<45} {'status':<16} {'exit':>5} {'time s':>8}")
+    for r in sorted(results, key=lambda r: (order.get(r["status"], 9), r.get("cached", False), r["repo"])):
+        exit_code = "" if r.get("exit_code") is None else r["exit_code"]
+        status = r["status"] + (" (cached)" if r.get("cached") else "")
+        print(f"{r['repo']:<45} {status:<16} {exit_code:>5} {r.get('duration') or 0:>8.1f}")
+    ok = sum(r["status"] == "ok" for r in results)
+    cached = sum(bool(r.get("cached")) for r in results)
+    busy = sum(r.get("duration") or 0 for r in results if not r.get("cached"))
+    print(f"\n✅ {ok}/{len(results)} OK in {wall:.1f}s wall ({busy:.1f}s of builds, {cached} from the build cache).")
+
+def cmd_build(args):
+    root = os.path.abspath(args.cloned_repos)
+    os.makedirs(os.path.join(root, REPORT_DIR), exist_ok=True)
+    repos = discover_repos(root)
+    if args.only:
+        repos = [r for r in repos if r in set(args.only)]
+
+    # Builds of the same (HEAD, lockfile, command) come from the cache, ok or failed
+    cache = os.path.abspath(args.cache or os.path.join(root, BUILD_CACHE))
+    os.makedirs(cache, exist_ok=True)
+    todo, keys, results = [], {}, []
+    for repo in repos:
+        key = build_key(os.path.join(root, repo), args.command)
+        cached = cache_get(cache, key) if key and not args.force else None
+        if cached:
+            results.append(cache_restore(cache, key, root, repo, cached))
+        else:
+            todo.append(repo)
+            keys[repo] = key
+            write_status(root, repo, {"repo": repo, "command": args.command, "status": "queued"})
+
+    jobs = args.jobs or default_jobs(args.mem_per_job)
+    print(f"🏗️  Pre-building {len(todo)} repo(s) in {root} with {jobs} parallel job(s) "
+          f"({len(results)} unchanged, served from the build cache).")
+    print(f"   Command: {args.command}")
+
+    # run_repos.sh stops waiting for queued builds once this process is gone
+    pid_file = os.path.join(root, REPORT_DIR, "farm.pid")
+    with open(pid_file, "w", encoding="utf-8") as f:
+        f.write(str(os.getpid()))
+    signal.signal(signal.SIGTERM, raise_interrupt)
+    gate = MemoryGate(args.mem_per_job)
+    started = time.time()
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        if args.shared_deps and todo:
+            materialize_deps(root, todo, args, gate, jobs)
+        futures = [pool.submit(build_and_cache, root, repo, keys[repo], args, gate, cache) for repo in todo]
+        for future in futures:
+            status = future.result()
+            results.append(status)
+            icon = "✅" if status["status"] == "ok" else "❌"
+            print(f"   {icon} {status['repo']}: {status['status']} in {status['duration']:.1f}s")
+    except KeyboardInterrupt:
+        print("\n⛔ Interrupted – stopping running builds...")
+        pool.shutdown(wait=False, cancel_futures=True)
+        stop_all(root, todo)
+        raise SystemExit(130)
+    finally:
+        # a stale PID (possibly reused by another process) would look like a running farm
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(pid_file)
+    pool.shutdown(wait=True)
+
+    wall = time.time() - started
+    with open(os.path.join(root, REPORT_DIR, "report.json"), "w", encoding="utf-8") as f:
+        json.dump({"command": args.command, "wall": round(wall, 1), "repos": results}, f, indent=2)
+    print_report(results, wall)
+    if args.state_db:
+        record_builds(args.state_db, root, results)
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+def cmd_deps(args):
+    root = os.path.abspath(args.cloned_repos)
+    os.makedirs(os.path.join(root, REPORT_DIR), exist_ok=True)
+    if args.prune:
+        store = os.path.abspath(args.store or os.path.join(root, DEPS_STORE))
+        if os.path.isdir(store):
+            prune_store(root, store)
+        return 0
+    repos = discover_repos(root)
+    if args.only:
+        repos = [r for r in repos if r in set(args.only)]
+    jobs = args.jobs or default_jobs(args.mem_per_job)
+    started = time.time()
+    try:
+        results = materialize_deps(root, repos, args, MemoryGate(args.mem_per_job), jobs)
+    except KeyboardInterrupt:
+        print("\n⛔ Interrupted – stopping running installs...")
+        stop_all(root, [])
+        raise SystemExit(130)
+    print(f"⏱️ Done in {time.time() - started:.1f}s.")
+    return 0 if all(r["deps"] not in ("install-failed", "link-failed") for r in results.values()) else 1
+
+def cmd_check(args):
+    root = os.path.abspath(args.cloned_repos)
+    os.makedirs(os.path.join(root, CHECKS_DIR), exist_ok=True)
+    checks = {name: CHECKS[name] for name in args.checks}
+    for extra in args.check or []:
+        name, _, command = extra.partition("=")
+        if not command:
+            print(f"❌ --check needs NAME=COMMAND, got {extra!r}")
+            return 2
+        checks[name] = {"command": command}
+    repos = discover_repos(root)
+    if args.only:
+        repos = [r for r in repos if r in set(args.only)]
+    cache = os.path.abspath(args.cache or os.path.join(root, BUILD_CACHE))
+    os.makedirs(cache, exist_ok=True)
+    jobs = args.jobs or default_jobs(args.mem_cap)
+    print(f"🔎 Checking {len(repos)} repo(s) in {root} with {jobs} parallel job(s): {', '.join(checks)} "
+          f"(timeout {args.timeout}s, memory cap {args.mem_cap} MB per check).")
+
+    gate = MemoryGate(args.mem_cap)
+    watchdog = MemoryWatchdog(args.mem_cap)
+    started = time.time()
+    try:
+        if args.shared_deps and repos:
+            materialize_deps(root, repos, args, gate, jobs)
+
+        def one(repo):
+            row = check_repo(root, repo, checks, args, gate, watchdog, cache)
+            icon = "✅" if not row["failures"] else "❌"
+            print(f"   {icon} {repo}: " + ", ".join(f"{n} {r['status']}" for n, r in row["checks"].items()))
+            return row
+
+        rows = parallel_map(one, repos, jobs)
+    except KeyboardInterrupt:
+        print("\n⛔ Interrupted – stopping running checks...")
+        stop_all(root, [])
+        raise SystemExit(130)
+    finally:
+        watchdog.stop()
+
+    wall = time.time() - started
+    folder = write_check_report(root, checks, rows, wall)
+    print(f"\n{'#':>4} {'repo':<45} {'fail':>4} {'errors':>6}  " + " ".join(f"{n:<9}" for n in checks))
+    for row in rows[:args.top]:
+        cells = " ".join(f"{row['checks'][n]['status'] + ('*' if row['checks'][n].get('cached') else ''):<9}"
+                         for n in checks)
+        print(f"{row['rank']:>4} {row['repo']:<45} {row['failures']:>4} {row['errors']:>6}  {cells}")
+    if len(rows) > args.top:
+        print(f"   ... {len(rows) - args.top} more in the report (* = from the build cache)")
+    clean = sum(not r["failures"] for r in rows)
+    print(f"\n✅ {clean}/{len(rows)} repo(s) pass every check ({wall:.1f}s wall). "
+          f"Report: {folder}/report.json, report.csv")
+    return 0 if clean == len(rows) else 1
+
+def raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def cmd_dev(args):
+    root = os.path.abspath(args.cloned_repos)
+    os.makedirs(os.path.join(root, REPORT_DIR), exist_ok=True)
+    pid_file = os.path.join(root, REPORT_DIR, "dev.pid")
+    with open(pid_file, "w", encoding="utf-8") as f:
+        f.write(str(os.getpid()))
+    # `kill $(cat .prebuild/dev.pid)` stops the servers the same way as Ctrl-C
+    signal.signal(signal.SIGTERM, raise_interrupt)
+    print(f"🧑‍💻 Keeping dev servers of the next {args.ahead} repo(s) in {root} running "
+          f"(ports from {args.base_port}). Ctrl-C to stop.")
+    pool = DevPool(root, args)
+    try:
+        while True:
+            pending = discover_repos(root)
+            if args.only:
+                pending = [r for r in pending if r in set(args.only)]
+            if not pending:
+                print("✅ All repos reviewed.")
+                break
+            pool.sync(pending[:args.ahead])
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n⛔ Stopping dev servers...")
+    finally:
+        # a second Ctrl-C / kill must not leave servers behind
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        pool.stop_all()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(pid_file)
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Background jobs over the repos in cloned_repos.",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=__doc__.split("\n\n", 1)[1])
+    sub = parser.add_subparsers(dest="command_name", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("cloned_repos", help="Folder with the cloned repos (e.g. homework/cloned_repos).")
+    common.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Parallel jobs (default: half the CPU cores, limited by free memory).")
+    common.add_argument("--mem-per-job", type=int, default=1500, metavar="MB",
+                        help="Free memory a job needs before it may start (default: 1500 MB).")
+    common.add_argument("--timeout", type=int, default=900, help="Kill a job after this many seconds (default: 900).")
+    common.add_argument("--only", nargs="+", metavar="REPO", help="Only these repos.")
+    common.add_argument("--store", default=os.getenv("PV247_DEPS_STORE"),
+                        help=f"Shared node_modules store (default: <cloned_repos>/{DEPS_STORE}; env PV247_DEPS_STORE). "
+                             "Hardlinks and reflinks need it on the same filesystem as the repos.")
+    common.add_argument("--link", choices=LINK_MODES, default="auto",
+                        help="How store trees get into the repos (default: auto = reflink, else hardlink, else symlink).")
+    common.add_argument("--install-command", default=DEFAULT_INSTALL_COMMAND,
+                        help=f"Install command run once per lockfile in the store (default: {DEFAULT_INSTALL_COMMAND!r}).")
+
+    build = sub.add_parser("build", parents=[common],
+                           help="Pre-build every repo in parallel (npm install && npm run build).")
+    build.add_argument("--command", default=os.getenv("PV247_BUILD_COMMAND", DEFAULT_BUILD_COMMAND),
+                       help=f"Build command run in each repo (default: {DEFAULT_BUILD_COMMAND!r}).")
+    build.add_argument("--force", action="store_true", help="Rebuild even repos with a cached build (the cache is refreshed).")
+    build.add_argument("--cache", default=os.getenv("PV247_BUILD_CACHE"),
+                       help=f"Build cache folder (default: <cloned_repos>/{BUILD_CACHE}; env PV247_BUILD_CACHE).")
+    build.add_argument("--state-db", default=os.getenv("PV247_STATE_DB"),
+                       help="step1_orchestrator state DB to record build results in (env PV247_STATE_DB).")
+    build.add_argument("--no-shared-deps", dest="shared_deps", action="store_false",
+                       help="Do not link node_modules from the shared store before building.")
+    build.set_defaults(func=cmd_build)
+
+    deps = sub.add_parser("deps", parents=[common],
+                          help="Install each distinct package-lock.json once and link node_modules into every repo.")
+    deps.add_argument("--prune", action="store_true", help="Only remove store trees no repo uses any more.")
+    deps.set_defaults(func=cmd_deps)
+
+    check = sub.add_parser("check", parents=[common],
+                           help="Run tsc / eslint / build / test in every repo and rank them in a report.")
+    check.add_argument("--checks", nargs="+", choices=list(CHECKS), default=list(CHECKS),
+                       help="Built-in checks to run (default: all): "
+                            + "; ".join(f"{n} = {spec['command']}" for n, spec in CHECKS.items()) + ".")
+    check.add_argument("--check", action="append", metavar="NAME=COMMAND",
+                       help="Additional (or replacing) check, e.g. --check lint='npm run lint'. Repeatable.")
+    check.add_argument("--mem-cap", type=int, default=2048, metavar="MB",
+                       help="Memory cap per check: node heap limit + kill above this RSS (default: 2048 MB).")
+    check.add_argument("--cache", default=os.getenv("PV247_BUILD_CACHE"),
+                       help=f"Build cache folder (default: <cloned_repos>/{BUILD_CACHE}; env PV247_BUILD_CACHE).")
+    check.add_argument("--force", action="store_true", help="Run every check even if the build cache has its result.")
+    check.add_argument("--no-shared-deps", dest="shared_deps", action="store_false",
+                       help="Do not link node_modules from the shared store first.")
+    check.add_argument("--top", type=int, default=30, help="Rows of the ranking to print (default: 30).")
+    check.set_defaults(func=cmd_check)
+
+    dev = sub.add_parser("dev", help="Keep dev servers of the next repos in the review order running on own ports.")
+    dev.add_argument("cloned_repos", help="Folder with the cloned repos (e.g. homework/cloned_repos).")
+    dev.add_argument("-n", "--ahead", type=int, default=3,
+                     help="Dev servers kept running: the repo under review + the next ones (default: 3).")
+    dev.add_argument("--base-port", type=int, default=3100, help="First port to hand out (default: 3100).")
+    dev.add_argument("--command", default=os.getenv("PV247_DEV_COMMAND", DEFAULT_DEV_COMMAND),
+                     help=f"Dev server command, {{port}} is replaced (default: {DEFAULT_DEV_COMMAND!r}; "
+                          "PORT is set as well).")
+    dev.add_argument("--ready-timeout", type=int, default=300,
+                     help="Mark a server failed if its URL does not answer within this many seconds (default: 300).")
+    dev.add_argument("--mem-per-job", type=int, default=1000, metavar="MB",
+                     help="Free memory needed to start another server ahead of time (default: 1000 MB).")
+    dev.add_argument("--only", nargs="+", metavar="REPO", help="Only these repos.")
+    dev.set_defaults(func=cmd_dev)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+if __name__ == "__main__":
+    main()
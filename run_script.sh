@@ -7,6 +7,7 @@ if [ $# -ne 3 ]; then
     exit 1
 fi
 
+START_NS=$(date +%s%N)
 HOMEWORK_URL=$(echo "$1" | sed 's/\\//g')
 HOMEWORK_FOLDER=$2
 HOMEWORK_NUMBER=$3
@@ -58,20 +59,25 @@ SOLUTION_URL=${HOMEWORK_SOLUTION_URLS[$HOMEWORK_NUMBER]}
 EVALUATION_PAGE=${HOMEWORK_EVALUATION_PAGES[$HOMEWORK_NUMBER]}
 OVERVIEW_PAGE=${HOMEWORK_OVERVIEW_PAGES[$HOMEWORK_NUMBER]}
 
-# Kill all running Chrome instances
-echo "🔴 Killing existing Chrome instances..."
-pkill chrome
-
-# Start Chrome in debug mode (if not already running)
+# Start Chrome in debug mode (if not already running). A debug Chrome from the previous
+# run is reused; only a regular Chrome has to go, as it would hold the same profile.
 if ! pgrep -f "chrome.*remote-debugging-port=9222" > /dev/null; then
+    if pgrep chrome > /dev/null; then
+        echo "🔴 Killing existing Chrome instances..."
+        pkill chrome
+        while pgrep chrome > /dev/null; do sleep 0.1; done
+    fi
     echo "🚀 Starting Chrome in debug mode..."
     google-chrome --remote-debugging-port=9222 \
                   --user-data-dir="/home/samuel/.config/google-chrome/" \
                   --profile-directory="Default" \
                   --disable-gpu 2>/dev/null &
-    
-    # Give Chrome time to start
-    sleep 3
+
+    # Wait until the DevTools endpoint answers (at most 10 s)
+    for _ in $(seq 100); do
+        curl -s -o /dev/null http://127.0.0.1:9222/json/version && break
+        sleep 0.1
+    done
 fi
 
 # Open required URLs in new tabs
@@ -90,9 +96,17 @@ fi
 echo "✅ Activating virtual environment..."
 source venv/bin/activate
 
-# Install dependencies if not installed
-echo "📦 Installing required Python packages (only if missing)..."
-pip install --quiet --requirement requirements.txt --no-warn-script-location --disable-pip-version-check 2>&1 | grep -v 'Requirement already satisfied'
+# Install dependencies only when requirements.txt (or the venv's Python) changed since the last install
+REQUIREMENTS_STAMP="venv/.requirements.sha256"
+REQUIREMENTS_HASH=$( (cat requirements.txt; python3 --version) | sha256sum | cut -d' ' -f1)
+if [ "$(cat "$REQUIREMENTS_STAMP" 2>/dev/null)" != "$REQUIREMENTS_HASH" ]; then
+    echo "📦 Installing required Python packages..."
+    pip install --quiet --requirement requirements.txt --no-warn-script-location --disable-pip-version-check 2>&1 | grep -v 'Requirement already satisfied'
+    [ "${PIPESTATUS[0]}" -eq 0 ] && echo "$REQUIREMENTS_HASH" > "$REQUIREMENTS_STAMP"
+else
+    echo "📦 Python packages up to date (requirements.txt unchanged)"
+fi
+echo "⏱️  Launcher ready in $(( ($(date +%s%N) - START_NS) / 1000000 )) ms"
 
 
 # Run your Python script with dynamic arguments
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Similarity of the submissions in a cloned_repos folder (created by klonovanie.py or
+step1_orchestrator.py): near-duplicate clusters, near-empty submissions and closeness to
+the reference solution.
+
+    python3 similarity.py <cloned_repos>
+    python3 similarity.py <cloned_repos> --solution https://github.com/FI-PV247/task-04-state-solution/pull/1/files
+    python3 similarity.py <cloned_repos> --template ../task-04-template --threshold 0.5
+
+How it works:
+  1. Source files tracked by git (.ts, .tsx, .js, .css, ...; no lockfiles) are tokenized
+     without comments and cut into 5-token shingles, per file.
+  2. The template baseline is removed: shingles that also occur in the template do not
+     count, so what is left is the student's own work. The template is the root commit
+     the repos share (GitHub Classroom starts every repo with it) or --template.
+     Shallow clones (step1_orchestrator.py clones with --depth 1, also with --fetch-sha;
+     only --shared-store keeps the full history) do not have that commit – their "root"
+     is the student's HEAD – so for them --template is required (or deepen them:
+     git fetch --unshallow).
+  3. Each repo gets a 128-value MinHash signature (one-permutation hashing: one hash per
+     shingle instead of 128). Signatures are cut into 32 LSH bands, and only repos that
+     share a band are compared, exactly, on their shingle sets. There is no all-pairs
+     O(n²) loop.
+  4. Pairs with Jaccard >= --threshold are joined into clusters.
+
+The solution (a local folder or a GitHub repo / PR URL, cloned over SSH into
+<cloned_repos>/.prebuild/) gets the same treatment. Every repo is then compared with
+it: Jaccard, plus containment, i.e. how much of the student's own work also appears in
+the solution.
+
+Results are printed and saved to <cloned_repos>/.prebuild/similarity.json.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+REPORT_DIR = ".prebuild"  # same folder as review_farm.py
+SOURCE_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".css", ".scss", ".html", ".prisma", ".sql")
+SKIP_FILES = {"package-lock.json", "yarn.lock", "pnpm-lock.yaml", "next-env.d.ts"}
+MAX_FILE_BYTES = 200_000
+SHINGLE = 5
+NUM_PERM = 128
+BANDS = 32
+MASK64 = (1 << 64) - 1
+
+COMMENTS = re.compile(r"//[^\n]*|/\*.*?\*/|<!--.*?-->", re.S)
+TOKENS = re.compile(r"[A-Za-z_$][\w$]*|\d+(?:\.\d+)?|[^\s\w]")
+GITHUB_URL = re.compile(r"https?://github\.com/([^/]+)/([^/#?]+?)(?:\.git)?(?:/pull/(\d+))?(?:[/#?].*)?$")
+
+# ------------------------------------------------------
+# Reading sources
+# ------------------------------------------------------
+
+def git(repo_path, *args, stdin=None):
+    return subprocess.run(["git", *args], cwd=repo_path, input=stdin, capture_output=True, check=True).stdout
+
+def is_source(path):
+    return path.endswith(SOURCE_EXTENSIONS) and os.path.basename(path) not in SKIP_FILES
+
+def read_worktree(folder):
+    """{path: text} of the source files (tracked ones if `folder` is a git repo)."""
+    try:
+        paths = [p for p in git(folder, "ls-files", "-z").decode().split("\0") if p]
+    except (subprocess.CalledProcessError, OSError):
+        paths = []
+        for dirpath, dirs, names in os.walk(folder):
+            dirs[:] = [d for d in dirs if d != "node_modules" and not d.startswith(".")]
+            paths += [os.path.relpath(os.path.join(dirpath, name), folder) for name in names]
+    texts = {}
+    for path in paths:
+        if not is_source(path):
+            continue
+        full = os.path.join(folder, path)
+        try:
+            if os.path.getsize(full) > MAX_FILE_BYTES:
+                continue
+            with open(full, "r", encoding="utf-8", errors="replace") as f:
+                texts[path] = f.read()
+        except OSError:
+            pass
+    return texts
+
+def read_tree(repo_path, rev):
+    """{path: text} of the source files in commit/tree `rev`, in one `git cat-file --batch`."""
+    paths = [p for p in git(repo_path, "ls-tree", "-r", "-z", "--name-only", rev).decode().split("\0")
+             if p and is_source(p)]
+    if not paths:
+        return {}
+    out = git(repo_path, "cat-file", "--batch", stdin="".join(f"{rev}:{p}\n" for p in paths).encode())
+    texts, pos = {}, 0
+    for path in paths:
+        end = out.index(b"\n", pos)
+        header = out[pos:end].split()
+        pos = end + 1
+        if len(header) < 3 or header[1] != b"blob":
+            continue  # "missing" (e.g. a submodule)
+        size = int(header[2])
+        if size <= MAX_FILE_BYTES:
+            texts[path] = out[pos:pos + size].decode("utf-8", errors="replace")
+        pos += size + 1
+    return texts
+
+def is_shallow(repo_path):
+    try:
+        return git(repo_path, "rev-parse", "--is-shallow-repository").strip() == b"true"
+    except (subprocess.CalledProcessError, OSError):
+        return False
+
+def root_tree(repo_path):
+    """Tree of the repo's first commit – for GitHub Classroom repos, the template."""
+    try:
+        roots = git(repo_path, "rev-list", "--max-parents=0", "HEAD").split()
+        return git(repo_path, "rev-parse", f"{roots[-1].decode()}^{{tree}}").decode().strip() if roots else None
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+# ------------------------------------------------------
+# Shingles and MinHash
+# ------------------------------------------------------
+
+def shingles(texts):
+    """Hashes of all 5-token windows, per file (a shingle never spans two files)."""
+    result = set()
+    for text in texts.values():
+        tokens = TOKENS.findall(COMMENTS.sub(" ", text))
+        result.update(map(hash, zip(*(tokens[i:] for i in range(SHINGLE)))))
+    return result
+
+def signature(hashes):
+    """One-permutation MinHash: each hash lands in one of NUM_PERM bins, the bin keeps its minimum.
+
+    Empty bins borrow the value of the next non-empty bin (rotation densification), marked with
+    the distance, so signatures of small sets stay comparable."""
+    width = (MASK64 + 1) // NUM_PERM
+    sig = [None] * NUM_PERM
+    for h in hashes:
+        h &= MASK64
+        b, v = divmod(h, width)
+        if sig[b] is None or v < sig[b]:
+            sig[b] = v
+    filled = [i for i, v in enumerate(sig) if v is not None]
+    if not filled:
+        return None
+    for i in range(NUM_PERM):
+        if sig[i] is None:
+            j = next((k for k in filled if k > i), filled[0])
+            sig[i] = sig[j] + ((j - i) % NUM_PERM) * width
+    return sig
+
+def lsh_candidates(signatures):
+    """Pairs of repos that share at least one band of their signatures."""
+    rows = NUM_PERM // BANDS
+    buckets = defaultdict(list)
+    for repo, sig in signatures.items():
+        for band in range(BANDS):
+            buckets[(band, tuple(sig[band * rows:(band + 1) * rows]))].append(repo)
+    pairs = set()
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pairs.add((a, b) if a < b else (b, a))
+    return pairs
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def clusters_of(pairs):
+    """Connected components (union-find) of the similar pairs."""
+    parent = {}
+
+    def find(x):
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b, _ in pairs:
+        parent[find(a)] = find(b)
+    groups = defaultdict(list)
+    for x in parent:
+        groups[find(x)].append(x)
+    return sorted((sorted(g) for g in groups.values()), key=lambda g: (-len(g), g))
+
+# ------------------------------------------------------
+# Solution
+# ------------------------------------------------------
+
+def fetch_solution(root, spec):
+    """Local folder as is; a GitHub repo / PR URL is cloned (SSH, like klonovanie.py) under .prebuild/."""
+    if os.path.isdir(spec):
+        return spec
+    match = GITHUB_URL.match(spec)
+    if not match:
+        raise SystemExit(f"❌ --solution must be a folder or a GitHub repo/PR URL: {spec}")
+    org, repo, pull = match.groups()
+    dest = os.path.join(root, REPORT_DIR, f"solution-{repo}")
+    if not os.path.isdir(dest):
+        print(f"📥 Cloning the solution {org}/{repo}...")
+        subprocess.run(["git", "clone", "--quiet", "--filter=blob:none", f"git@github.com:{org}/{repo}.git", dest],
+                       check=True)
+    if pull:
+        subprocess.run(["git", "fetch", "--quiet", "origin", f"pull/{pull}/head"], cwd=dest, check=True)
+        subprocess.run(["git", "checkout", "--quiet", "--detach", "FETCH_HEAD"], cwd=dest, check=True)
+    return dest
+
+# ------------------------------------------------------
+# Main
+# ------------------------------------------------------
+
+def list_repos(root):
+    return [name for name in sorted(os.listdir(root))
+            if not name.startswith(".") and os.path.exists(os.path.join(root, name, ".git"))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate clusters, near-empty submissions and "
+                                                 "closeness to the solution (MinHash/LSH).",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=__doc__.split("\n\n", 1)[1])
+    parser.add_argument("cloned_repos", help="Folder with the cloned repos (e.g. homework/cloned_repos).")
+    parser.add_argument("--template", help="Template folder to strip (default: the root commit the repos share; required for shallow clones).")
+    parser.add_argument("--solution", help="Solution folder or GitHub repo/PR URL (e.g. from HOMEWORK_SOLUTION_URLS).")
+    parser.add_argument("--threshold", type=float, default=0.6,
+                        help="Jaccard of own work from which two repos count as near-duplicates (default: 0.6).")
+    parser.add_argument("--min-shingles", type=int, default=30,
+                        help="Less own work than this many shingles = near-empty submission (default: 30).")
+    parser.add_argument("--top", type=int, default=10, help="Repos closest to the solution to print (default: 10).")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.cloned_repos)
+    started = time.time()
+    repos = list_repos(root)
+    if not repos:
+        print(f"❌ No git repos in {root}")
+        return 1
+    pool = ThreadPoolExecutor(max_workers=8)
+
+    # Baselines: --template, or each repo's root tree if other repos share it, else the most common one
+    baselines = {}
+    if args.template:
+        baselines[None] = shingles(read_worktree(args.template))
+        base_of = {repo: None for repo in repos}
+        baseline_note = f"template {args.template}"
+    else:
+        shallow = [r for r, flag in zip(repos, pool.map(lambda r: is_shallow(os.path.join(root, r)), repos)) if flag]
+        if shallow:
+            print(f"❌ {len(shallow)} of {len(repos)} repo(s) are shallow clones (e.g. {shallow[0]}): their first "
+                  "commit is the student's HEAD, not the template, so the template baseline cannot be found.\n"
+                  "   Pass --template <folder>, or deepen the clones (git -C <repo> fetch --unshallow).")
+            return 1
+        trees = dict(zip(repos, pool.map(lambda r: root_tree(os.path.join(root, r)), repos)))
+        counts = Counter(t for t in trees.values() if t)
+        shared = {t for t, n in counts.items() if n >= 2}
+        common = counts.most_common(1)[0][0] if shared else None
+        base_of = {repo: tree if tree in shared else common for repo, tree in trees.items()}
+        for tree in {t for t in base_of.values() if t}:
+            owner = next(r for r, t in trees.items() if t == tree)
+            baselines[tree] = shingles(read_tree(os.path.join(root, owner), tree))
+        baseline_note = (f"root commit tree {common[:10]} shared by {counts[common]} repo(s)"
+                         if common else "none (no root commit shared by 2+ repos, use --template)")
+    empty = set()
+
+    def own_work(repo):
+        texts = read_worktree(os.path.join(root, repo))
+        return len(texts), shingles(texts) - baselines.get(base_of[repo], empty)
+
+    own = {}
+    files = {}
+    for repo, (n_files, s) in zip(repos, pool.map(own_work, repos)):
+        files[repo], own[repo] = n_files, s
+
+    near_empty = sorted((r for r in repos if len(own[r]) < args.min_shingles), key=lambda r: len(own[r]))
+    indexed = [r for r in repos if r not in near_empty]
+    signatures = {r: signature(own[r]) for r in indexed}
+    candidates = lsh_candidates(signatures)
+    pairs = []
+    for a, b in candidates:
+        similarity = jaccard(own[a], own[b])
+        if similarity >= args.threshold:
+            pairs.append((a, b, similarity))
+    pairs.sort(key=lambda p: -p[2])
+    clusters = clusters_of(pairs)
+
+    solution = {}
+    if args.solution:
+        folder = fetch_solution(root, args.solution)
+        base = baselines.get(None if args.template else (base_of.get(indexed[0]) if indexed else None), empty)
+        reference = shingles(read_worktree(folder)) - base
+        for repo in repos:
+            common_work = len(own[repo] & reference)
+            solution[repo] = {"jaccard": round(jaccard(own[repo], reference), 3),
+                              "containment": round(common_work / len(own[repo]), 3) if own[repo] else 0.0}
+    wall = time.time() - started
+
+    report = {
+        "baseline": baseline_note, "threshold": args.threshold, "seconds": round(wall, 2),
+        "candidates": len(candidates),
+        "repos": {r: {"files": files[r], "own_shingles": len(own[r]), **({"solution": solution[r]} if solution else {})}
+                  for r in repos},
+        "clusters": [{"repos": c, "pairs": [{"a": a, "b": b, "jaccard": round(s, 3)} for a, b, s in pairs
+                                            if a in c]} for c in clusters],
+        "near_empty": near_empty,
+    }
+    os.makedirs(os.path.join(root, REPORT_DIR), exist_ok=True)
+    out_path = os.path.join(root, REPORT_DIR, "similarity.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    pairs_total = len(indexed) * (len(indexed) - 1) // 2
+    print(f"🧬 {len(repos)} repo(s) in {wall:.1f}s; baseline: {baseline_note}.")
+    print(f"   LSH compared {len(candidates)} of {pairs_total} possible pair(s).")
+    print(f"\n👯 Near-duplicate clusters (Jaccard of own work >= {args.threshold}): {len(clusters)}")
+    for i, cluster in enumerate(clusters, 1):
+        best = max(s for a, b, s in pairs if a in cluster)
+        print(f"   {i}. {', '.join(cluster)}  (max {best:.2f})")
+    print(f"\n🫙 Near-empty submissions (< {args.min_shingles} shingles of own work): {len(near_empty)}")
+    for repo in near_empty:
+        print(f"   - {repo}: {len(own[repo])} shingle(s), {files[repo]} source file(s)")
+    if solution:
+        print(f"\n🎯 Closest to the solution (containment = share of own work also in the solution):")
+        ranked = sorted(repos, key=lambda r: (-solution[r]["containment"], -solution[r]["jaccard"]))
+        for repo in ranked[:args.top]:
+            print(f"   {solution[repo]['containment']:.2f}  jaccard {solution[repo]['jaccard']:.2f}  {repo}")
+    print(f"\n💾 Report: {out_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,23 +4,36 @@ PV247 PR fetcher/checkout (bez Selenium)
 
 - Vyhľadá v organizácii PR s labelom a kľúčovým slovom v názve.
 - Voliteľne filtruje len tvoju skupinu študentov.
-- Vie preskočiť PR, ktoré už majú hodnotiaci komentár/review (Hodnotenie/Hodnoceni/Evaluation).
-- Klonuje len PR, ktoré sa zmenili (podľa HEAD SHA) – cache v last_tested_sha.json.
+- Vie preskočiť PR, ktoré už majú hodnotiaci komentár/review (Hodnotenie/Hodnoceni/Evaluation);
+  nezmenené PR (updated_at + počet komentárov) sa znova neskenujú.
+- Klonuje len PR, ktoré sa zmenili (podľa HEAD SHA).
+- Stav PR (metadáta, SHA, verdikty, cesty klonov) drží v SQLite (pv247_state.sqlite3);
+  staré last_tested_sha.json / eval_cache.json sa pri prvom behu importujú.
+- --graphql: search, PR detaily aj hodnotiace komentáre jedným stránkovaným GraphQL dotazom.
+- --watch: beží ďalej a každých N sekúnd (alebo hneď po webhooku) naklonuje nové/zmenené PR.
+- --homeworks: manifest úloh (číslo → regex repa, riešenie, clone root); jeden search pre celý
+  semester, PR sa rozdelia do clone rootov jednotlivých úloh.
 
 Autor: ty + ChatGPT
 """
 
 from __future__ import annotations
 
-import os, sys, re, json, subprocess, argparse, textwrap
-from dataclasses import dataclass
+import time
+T_START = time.perf_counter()
+
+import io, os, sys, re, hmac, json, queue, sqlite3, hashlib, threading, subprocess, argparse, textwrap
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Dict, Any, Tuple
+from typing import TYPE_CHECKING, Iterable, List, Dict, Any, Tuple
 
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+# requests/urllib3 (~60 ms) a http.server (~20 ms) sa importujú až pri použití (build_session,
+# WebhookReceiver) – --help, --query a chybné argumenty tak skončia hneď
+if TYPE_CHECKING:
+    import requests
 
 # ------------------ CLI ------------------
 
@@ -45,6 +58,24 @@ def parse_args() -> argparse.Namespace:
           # Vylúčiť solution/template repá:
           python3 step1_orchestrator.py -s 2025-01-01 -c t-07-nextjs-basic- -x '(solution|template)'
 
+          # Checkout presne head SHA, bez blobov mimo src/ (rýchle pri veľkých assetoch):
+          python3 step1_orchestrator.py -s 2025-01-01 -c t-07-nextjs-basic- --blobless --sparse src
+
+          # Kto ešte nemá hodnotenie / čo sa zmenilo v poslednom behu (offline, zo state DB):
+          python3 step1_orchestrator.py --query unevaluated
+          python3 step1_orchestrator.py --query changed
+
+          # Build výsledky (review_farm.py build --state-db pv247_state.sqlite3 <clone-root>):
+          python3 step1_orchestrator.py --query unbuilt
+
+          # Celý týždeň hodnotenia: beží ďalej, poll každú minútu + okamžite po webhooku
+          # (napr. gh webhook forward --org=FI-PV247 --events=pull_request --url=http://localhost:8247/):
+          python3 step1_orchestrator.py -s 2025-01-01 -c t-07-nextjs-basic- --skip-if-evaluated --watch 60 --webhook 8247
+
+          # Všetky otvorené úlohy naraz: jeden search, session a rate limit, každá úloha do svojho clone rootu
+          # (manifest: {"7": {"regex": "^t-07-", "solution": "https://…", "clone_root": "nextjs-basic/cloned_repos"}, …}):
+          python3 step1_orchestrator.py -s 2025-01-01 --homeworks homeworks.json --skip-if-evaluated
+
           # Použiť created:>= namiesto updated:>=
           python3 step1_orchestrator.py -s 2025-01-01 --created -c t-07-nextjs-basic-
 
@@ -53,6 +84,9 @@ def parse_args() -> argparse.Namespace:
             --students-file students.txt --student-match either \\
             --skip-if-evaluated --dry-run
 
+          # To isté cez GraphQL (search + detaily + hodnotenia v jednom stránkovanom dotaze):
+          python3 step1_orchestrator.py -s 2025-01-01 -c t-07-nextjs-basic- --skip-if-evaluated --graphql
+
         Poznámky:
           • Token sa číta z env premennej: GITHUB_TOKEN (povinné).
           • Ak CLI parameter neudáš, skript skúsi ENV fallbacky:
@@ -62,11 +96,20 @@ def parse_args() -> argparse.Namespace:
               exclude: PV247_EXCLUDE_REGEX
               limit: PV247_LIMIT
               workers: PV247_WORKERS
+              clone-workers: PV247_CLONE_WORKERS
+              shared-store: PV247_SHARED_STORE=1
               timeout: PV247_TIMEOUT
               org: PV247_ORG (default: FI-PV247)
               label: PV247_LABEL (default: Submitted)
               title: PV247_TITLE_CONTAINS (default: Feedback)
               clone-root: PV247_CLONE_ROOT (default: ./cloned_repos)
+              homeworks: PV247_HOMEWORKS=<manifest.json>
+              state-db: PV247_STATE_DB (default: ./pv247_state.sqlite3)
+              http-cache-dir / http-cache-mb: PV247_HTTP_CACHE_DIR / PV247_HTTP_CACHE_MB
+              graphql: PV247_GRAPHQL=1
+              profile: PV247_PROFILE=<trace.json>
+              watch / webhook: PV247_WATCH=<sekundy> / PV247_WEBHOOK_PORT; PV247_WEBHOOK_SECRET = secret webhooku
+              GitHub API: PV247_GITHUB_API (default: https://api.github.com; napr. fake server z bench/)
     """)
     p = argparse.ArgumentParser(
         description="PV247 PR fetcher/checkout bez Selenium: vyberie PR podľa filtrov a naklonuje len zmenené.",
@@ -74,7 +117,8 @@ def parse_args() -> argparse.Namespace:
         epilog=epilog
     )
     # základné filtre
-    p.add_argument("-s", "--since", help="Filter na dátum (YYYY-MM-DD). Default z ENV PV247_SINCE/SINCE.")
+    p.add_argument("-s", "--since",
+                   help="Filter na dátum (YYYY-MM-DD alebo YYYY-MM-DDTHH:MM:SSZ). Default z ENV PV247_SINCE/SINCE.")
     p.add_argument("--created", action="store_true",
                    help="Použi created:>= namiesto updated:>= vo vyhľadávaní.")
     p.add_argument("-c", "--contains", action="append",
@@ -86,11 +130,15 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("-n", "--limit", type=int, default=int(os.getenv("PV247_LIMIT", "0") or "0"),
                    help="Max počet PR na spracovanie (0 = bez limitu).")
     p.add_argument("-w", "--workers", type=int, default=int(os.getenv("PV247_WORKERS", "8") or "8"),
-                   help="Počet paralelných workerov pre sťahovanie PR detailov.")
+                   help="Max počet súbežných GitHub requestov (skutočnú súbežnosť prispôsobuje rate limiter).")
+    p.add_argument("--clone-workers", type=int, default=int(os.getenv("PV247_CLONE_WORKERS", "4") or "4"),
+                   help="Počet paralelných git clone/fetch.")
     p.add_argument("-t", "--timeout", type=float, default=float(os.getenv("PV247_TIMEOUT", "20")),
                    help="HTTP timeout v sekundách.")
     p.add_argument("-d", "--dry-run", action="store_true", help="Len vypíš, neklonuj.")
     p.add_argument("--debug", action="store_true", help="Vypíš query, počty, progres a vzorku názvov repo.")
+    p.add_argument("--graphql", action="store_true",
+                   help="Jeden stránkovaný GraphQL dotaz namiesto search + PR detail + eval-scan cez REST.")
 
     # GitHub kontext
     p.add_argument("--org", default=os.getenv("PV247_ORG", "FI-PV247"), help="GitHub organizácia.")
@@ -99,6 +147,40 @@ def parse_args() -> argparse.Namespace:
                    help="Text, ktorý musí byť v názve PR.")
     p.add_argument("--clone-root", default=os.getenv("PV247_CLONE_ROOT", "./cloned_repos"),
                    help="Výstupný adresár pre klonovanie.")
+    p.add_argument("--homeworks", default=os.getenv("PV247_HOMEWORKS"), metavar="MANIFEST.json",
+                   help="Manifest úloh {číslo: {regex, solution, clone_root}}: jeden search pre všetky úlohy, "
+                        "PR idú do clone rootu úlohy, ktorej regex sedí (ostatné sa vyradia); "
+                        "relatívne clone_root sú voči adresáru manifestu.")
+    p.add_argument("--fetch-sha", action="store_true",
+                   help="Checkout jedným fetchom presne head SHA (žiadny clone + fetch vetvy, žiadny race s novým pushom).")
+    p.add_argument("--blobless", action="store_true",
+                   help="Fetch s --filter=blob:none (bloby len pre checkoutnuté súbory); zapína --fetch-sha.")
+    p.add_argument("--sparse", action="append",
+                   help="Sparse-checkout adresár (cone mode, súbory v koreni sa berú vždy); možno viackrát. "
+                        "Zapína --fetch-sha.")
+    p.add_argument("--shared-store", action="store_true",
+                   help=f"Jeden bare object store ({SHARED_STORE_DIR}) pre celú úlohu + git worktree na PR "
+                        "(spoločná história šablóny sa stiahne a uloží len raz).")
+    p.add_argument("--state-db", default=os.getenv("PV247_STATE_DB", "./pv247_state.sqlite3"),
+                   help="SQLite so stavom PR (metadáta, head SHA, eval verdikt, cesta klonu).")
+    p.add_argument("--profile", nargs="?", const="pv247_profile.json", default=os.getenv("PV247_PROFILE"),
+                   metavar="TRACE.json",
+                   help="Meraj HTTP/git/stage časy; na konci p50/p95 tabuľka a Chrome trace (default pv247_profile.json).")
+    p.add_argument("--resume", action="store_true",
+                   help="Pokračuj v prerušenom behu (Ctrl-C/pád): PR zo žurnálu, hotové kroky sa preskočia.")
+    p.add_argument("--watch", nargs="?", type=float, const=60.0, default=float(os.getenv("PV247_WATCH", "0") or "0"),
+                   metavar="SEKUNDY",
+                   help="Nekonči: session, spojenia a cache ostanú teplé a každých SEKUNDY (default 60) sa "
+                        "lacno pollne (updated:>= od posledného pollu, ETag) a naklonujú sa nové/zmenené PR.")
+    p.add_argument("--webhook", type=int, default=int(os.getenv("PV247_WEBHOOK_PORT", "0") or "0"), metavar="PORT",
+                   help="S --watch: lokálny príjemca GitHub webhookov na 127.0.0.1:PORT, udalosť = poll hneď "
+                        "(podpis X-Hub-Signature-256 sa overí, ak je nastavený PV247_WEBHOOK_SECRET).")
+    p.add_argument("--query", choices=sorted(STATE_QUERIES),
+                   help="Len vypíš dotaz nad state DB (offline, bez tokenu) a skonči.")
+    p.add_argument("--http-cache-dir", default=os.getenv("PV247_HTTP_CACHE_DIR", "./.gh_http_cache"),
+                   help="Adresár perzistentnej HTTP cache (ETag/Last-Modified, 304 sa nepočíta do limitu).")
+    p.add_argument("--http-cache-mb", type=int, default=int(os.getenv("PV247_HTTP_CACHE_MB", "200") or "0"),
+                   help="Max veľkosť HTTP cache v MB, nad ňou LRU vyhadzovanie (0 = cache vypnutá).")
 
     # študenti
     p.add_argument("--students-file", help="Cesta k súboru s GitHub loginmi (1 login/riadok; '@' sa ignoruje).")
@@ -139,8 +221,25 @@ class Config:
     student_match: str  # 'author' | 'repo' | 'either'
     skip_if_evaluated: bool
     eval_re: re.Pattern
-
+    repo_filter: RepoFilter | None = None   # skompilované filtre, nastaví load_config
+    homeworks: List[Homework] = field(default_factory=list)   # --homeworks; prázdne = jedna úloha do clone_root
+    clone_workers: int = 4
+    shared_store: bool = False
+    fetch_sha: bool = False
+    blobless: bool = False
+    sparse: List[str] = field(default_factory=list)
+    graphql: bool = False
+    http_cache_dir: Path = Path("./.gh_http_cache")
+    http_cache_mb: int = 200
+
+    state_db: Path = Path("./pv247_state.sqlite3")
+    profile: Path | None = None
+    resume: bool = False
+    watch: float = 0.0          # interval pollu v sekundách, 0 = jeden beh
+    webhook_port: int = 0
+    # staré JSON cache – importujú sa do state_db pri jej vytvorení
     cache_file: Path = Path("./last_tested_sha.json")
+    eval_cache_file: Path = Path("./eval_cache.json")
     github_api: str = "https://api.github.com"
     token: str = ""
 
@@ -183,39 +282,506 @@ def load_config(ns: argparse.Namespace) -> Config:
         workers=ns.workers,
         timeout=ns.timeout,
         dry_run=ns.dry_run or (os.getenv("PV247_DRYRUN", "0") == "1"),
+        resume=ns.resume,
         debug=ns.debug or (os.getenv("PV247_DEBUG", "0") == "1"),
         org=ns.org,
         label=ns.label,
         title_contains=ns.title_contains,
         clone_root=Path(ns.clone_root),
+        homeworks=load_homeworks(Path(ns.homeworks)) if ns.homeworks else [],
         students=students,
         student_match=ns.student_match,
         skip_if_evaluated=ns.skip_if_evaluated or (os.getenv("PV247_SKIP_IF_EVALUATED", "0") == "1"),
         eval_re=re.compile(ns.eval_regex, re.I),
+        clone_workers=max(1, ns.clone_workers),
+        shared_store=ns.shared_store or (os.getenv("PV247_SHARED_STORE", "0") == "1"),
+        fetch_sha=ns.fetch_sha or ns.blobless or bool(ns.sparse),
+        blobless=ns.blobless,
+        sparse=ns.sparse or [],
+        graphql=ns.graphql or (os.getenv("PV247_GRAPHQL", "0") == "1"),
+        state_db=Path(ns.state_db),
+        profile=Path(ns.profile) if ns.profile else None,
+        watch=ns.watch,
+        webhook_port=ns.webhook,
+        http_cache_dir=Path(ns.http_cache_dir),
+        http_cache_mb=ns.http_cache_mb,
+        github_api=os.getenv("PV247_GITHUB_API", "https://api.github.com").rstrip("/"),
         token=token
     )
-    cfg.clone_root.mkdir(parents=True, exist_ok=True)
+    cfg.repo_filter = RepoFilter.from_config(cfg)
+    for root in [hw.clone_root for hw in cfg.homeworks] or [cfg.clone_root]:
+        root.mkdir(parents=True, exist_ok=True)
     return cfg
 
+# ------------------ Manifest úloh (--homeworks) ------------------
+
+@dataclass
+class Homework:
+    number: str
+    rx: re.Pattern
+    clone_root: Path
+    solution: str | None = None
+
+def load_homeworks(path: Path) -> List[Homework]:
+    """{"7": {"regex": …, "solution": …, "clone_root": …}, …} → úlohy v poradí manifestu."""
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        homeworks = [Homework(number=str(number), rx=re.compile(hw["regex"], re.I),
+                              clone_root=path.parent / hw.get("clone_root", f"hw-{number}/cloned_repos"),
+                              solution=hw.get("solution"))
+                     for number, hw in manifest.items()]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, re.error) as e:
+        print(f"❌ Manifest úloh {path}: {e!r} (očakávam {{číslo: {{regex, solution, clone_root}}}})")
+        sys.exit(1)
+    if not homeworks:
+        print(f"❌ Manifest úloh {path} je prázdny.")
+        sys.exit(1)
+    return homeworks
+
+def homework_for(cfg: Config, repo_name: str) -> Homework | None:
+    """Prvá úloha z manifestu, ktorej regex sedí na názov repa."""
+    return next((hw for hw in cfg.homeworks if hw.rx.search(repo_name)), None)
+
+def clone_root_for(cfg: Config, repo_name: str) -> Path:
+    hw = homework_for(cfg, repo_name)
+    return hw.clone_root if hw else cfg.clone_root
+
+# ------------------ Profilovanie (--profile) ------------------
+
+class Profiler:
+    """Spany (trvanie HTTP requestov, git príkazov, stage), počítadlá a rate-limit budget.
+
+    Zbiera sa do pamäte; na konci behu `dump` zapíše Chrome trace (chrome://tracing,
+    https://ui.perfetto.dev) a `table` vráti p50/p95 súhrn podľa názvu spanu.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.t0 = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self.durations: Dict[str, List[float]] = {}
+        self.counters: Dict[str, float] = {}
+        self.budget: Dict[str, int] = {}   # resource -> najnižší videný X-RateLimit-Remaining
+        self.threads: Dict[int, str] = {}
+
+    def _us(self, t: float) -> float:
+        return round((t - self.t0) * 1e6, 1)
+
+    def record(self, name: str, cat: str, start: float, end: float, **args) -> None:
+        tid = threading.get_ident()
+        with self.lock:
+            self.threads.setdefault(tid, threading.current_thread().name)
+            self.durations.setdefault(name, []).append(end - start)
+            self.events.append({"name": name, "cat": cat, "ph": "X", "ts": self._us(start),
+                                "dur": self._us(end) - self._us(start), "pid": 1, "tid": tid,
+                                **({"args": args} if args else {})})
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def rate_limit(self, resource: str, remaining: int) -> None:
+        with self.lock:
+            self.budget[resource] = min(remaining, self.budget.get(resource, remaining))
+            self.events.append({"name": f"rate limit {resource}", "ph": "C", "ts": self._us(time.perf_counter()),
+                                "pid": 1, "args": {"remaining": remaining}})
+
+    def dump(self) -> None:
+        with self.lock:
+            meta = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                    for tid, name in self.threads.items()]
+            trace = {"traceEvents": meta + self.events, "displayTimeUnit": "ms",
+                     "otherData": {"counters": self.counters, "rate_limit_min_remaining": self.budget}}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(trace))
+        os.replace(tmp, self.path)
+
+    def table(self) -> str:
+        def pct(xs: List[float], q: float) -> float:
+            return xs[min(len(xs) - 1, int(q * len(xs)))] * 1000
+
+        rows = [f"  {'span':<28} {'počet':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'spolu s':>9}"]
+        with self.lock:
+            for name, xs in sorted(self.durations.items(), key=lambda kv: -sum(kv[1])):
+                xs = sorted(xs)
+                rows.append(f"  {name:<28} {len(xs):>6} {pct(xs, 0.5):>9.1f} {pct(xs, 0.95):>9.1f} "
+                            f"{xs[-1] * 1000:>9.1f} {sum(xs):>9.2f}")
+            for name, v in sorted(self.counters.items()):
+                rows.append(f"  {name:<28} {v:>6.0f}" if "bytes" not in name else
+                            f"  {name:<28} {v / 1e6:>6.2f} MB")
+            for resource, remaining in sorted(self.budget.items()):
+                rows.append(f"  rate limit {resource:<17} min. zostatok {remaining}")
+        return "\n".join(rows)
+
+PROFILER: Profiler | None = None   # nastaví main() pri --profile
+
+class span:
+    """`with span("git clone", "git"):` – zapíše trvanie do PROFILER (bez --profile nerobí nič)."""
+
+    def __init__(self, name: str, cat: str, **args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self) -> span:
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if PROFILER:
+            PROFILER.record(self.name, self.cat, self.start, time.perf_counter(), **self.args)
+
+def traced(name: str, cat: str, items: Iterable[Any]) -> Iterable[Any]:
+    """Iterátor, ktorý meria čas každého next() (napr. čakanie na ďalšiu stránku searchu)."""
+    it = iter(items)
+    while True:
+        with span(name, cat):
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+        yield item
+
+def profile_count(name: str, n: float = 1) -> None:
+    if PROFILER:
+        PROFILER.count(name, n)
+
+def endpoint_kind(url: str) -> str:
+    """Názov GitHub endpointu pre štatistiky ('search', 'pr detail', 'comments', …)."""
+    if "/search/" in url: return "search"
+    if url.endswith("/graphql"): return "graphql"
+    if url.endswith("/comments"): return "comments"
+    if url.endswith("/reviews"): return "reviews"
+    if re.search(r"/pulls/\d+$", url): return "pr detail"
+    return "other"
+
+# ------------------ HTTP cache (ETag / Last-Modified) ------------------
+
+class HttpCache:
+    """Perzistentná cache GET odpovedí pre podmienené requesty.
+
+    Záznam = JSON súbor s ETag/Last-Modified a telom odpovede, kľúč = sha256(URL + params).
+    index.json drží veľkosť a čas posledného použitia; nad `max_bytes` sa vyhadzuje
+    najdlhšie nepoužitý záznam (LRU). Bezpečné pre viac vlákien. Index sa ukladá
+    atomicky každých INDEX_SAVE_EVERY zápisov; po páde (SIGKILL) sa pri otvorení
+    zosúladí s diskom, aby ho LRU limit pokrýval celý.
+    """
+
+    INDEX_SAVE_EVERY = 100
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0      # 304 → telo z disku
+        self.misses = 0    # plná odpoveď 200
+        self.unsaved = 0   # zápisy od posledného uloženia indexu
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index: Dict[str, Dict[str, float]] = load_cache(self.root / "index.json")
+        self._reconcile()
+        self.total = sum(e.get("size", 0) for e in self.index.values())
+        with self.lock:
+            self._evict()
+
+    def _reconcile(self) -> None:
+        """Súbory mimo indexu (zápisy po poslednom uložení, *.tmp) zmaže, záznamy bez súboru vyhodí."""
+        present = set()
+        for sub in self.root.iterdir():
+            if not sub.is_dir():
+                continue
+            for f in sub.iterdir():
+                if f.suffix == ".json" and f.stem in self.index:
+                    present.add(f.stem)
+                else:
+                    f.unlink(missing_ok=True)
+        for key in set(self.index) - present:
+            del self.index[key]
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any]) -> str:
+        raw = url + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        with self.lock:
+            if key not in self.index:
+                return None
+        try:
+            return json.loads(self._path(key).read_text())
+        except Exception:
+            self._drop(key)
+            return None
+
+    def hit(self, key: str) -> None:
+        with self.lock:
+            self.hits += 1
+            if key in self.index:
+                self.index[key]["atime"] = time.time()
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        raw = json.dumps(entry)
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(raw)
+        os.replace(tmp, path)
+        with self.lock:
+            self.misses += 1
+            self.total += len(raw) - self.index.get(key, {}).get("size", 0)
+            self.index[key] = {"size": len(raw), "atime": time.time()}
+            self._evict()
+            self.unsaved += 1
+            if self.unsaved >= self.INDEX_SAVE_EVERY:
+                self._save()
+
+    def _drop(self, key: str) -> None:
+        with self.lock:
+            self.total -= self.index.pop(key, {}).get("size", 0)
+        self._path(key).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        # volá sa pod self.lock
+        if self.total <= self.max_bytes:
+            return
+        for key in sorted(self.index, key=lambda k: self.index[k]["atime"]):
+            if self.total <= self.max_bytes:
+                break
+            self.total -= self.index.pop(key)["size"]
+            self._path(key).unlink(missing_ok=True)
+
+    def _save(self) -> None:
+        # volá sa pod self.lock
+        save_cache(self.root / "index.json", self.index)
+        self.unsaved = 0
+
+    def close(self) -> None:
+        with self.lock:
+            self._save()
+
+    def summary(self) -> str:
+        return f"{self.hits} hit (304), {self.misses} miss, {self.total / 1e6:.1f} MB na disku"
+
+# ------------------ Rate-limit scheduler ------------------
+
+RATE_LIMIT_ATTEMPTS = 8          # koľkokrát zopakovať request po 429/secondary limite
+SECONDARY_LIMIT_PAUSE = 60.0     # GitHub odporúča min. minútu, ak neposlal Retry-After
+
+def rate_limit_resource(url: str) -> str:
+    """Do ktorého rate-limit bucketu GitHubu request patrí (search má vlastný, 30/min)."""
+    if "/search/" in url: return "search"
+    if url.endswith("/graphql"): return "graphql"
+    return "core"
+
+class RateLimiter:
+    """Zdieľaný plánovač všetkých GitHub requestov.
+
+    - Adaptívna súbežnosť (AIMD): kým je rozpočtu dosť, povolený počet súbežných requestov
+      rastie až po `max_concurrency`; pri throttlingu sa polovičí.
+    - Token bucket per resource (core/search/graphql): keď zostatok klesne pod ~10 %,
+      zvyšok sa rovnomerne rozloží do X-RateLimit-Reset namiesto vyčerpania naraz.
+    - 429 / secondary limit / vyčerpaný limit → globálna pauza (Retry-After, reset,
+      inak SECONDARY_LIMIT_PAUSE); gh_get request po pauze zopakuje.
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1):
+        self.cond = threading.Condition()
+        self.max = max(max_concurrency, min_concurrency)
+        self.min = min_concurrency
+        self.limit = max(self.min, self.max // 2)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.buckets: Dict[str, Dict[str, float]] = {}
+        self.throttled = 0
+
+    def _take_token(self, resource: str, now: float) -> float:
+        """Vráti 0 a spotrebuje token, alebo počet sekúnd, koľko počkať."""
+        b = self.buckets.get(resource)
+        if not b:
+            return 0.0
+        if now >= b["reset"]:
+            b["remaining"] = b["limit"]
+        low = max(b["limit"] * 0.1, 2 * self.max)
+        if b["remaining"] > low:
+            b["remaining"] -= 1
+            return 0.0
+        to_reset = max(b["reset"] - now, 1.0)
+        if b["remaining"] <= 0:
+            return to_reset
+        rate = b["remaining"] / to_reset
+        b["tokens"] = min(1.0, b["tokens"] + (now - b["stamp"]) * rate)
+        b["stamp"] = now
+        if b["tokens"] >= 1.0:
+            b["tokens"] -= 1.0
+            b["remaining"] -= 1
+            return 0.0
+        return (1.0 - b["tokens"]) / rate
+
+    def acquire(self, resource: str) -> None:
+        with self.cond:
+            while True:
+                now = time.time()
+                wait = self.paused_until - now
+                if wait <= 0 and self.in_flight < self.limit:
+                    wait = self._take_token(resource, now)
+                    if wait <= 0:
+                        self.in_flight += 1
+                        return
+                if wait > 0:
+                    self.cond.wait(timeout=wait)
+                else:
+                    self.cond.wait()
+
+    def release(self, resource: str, r: requests.Response | None) -> float:
+        """Uvoľni slot a zapracuj hlavičky odpovede. Vráti > 0, ak bol request throttlovaný."""
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+            if r is None:
+                return 0.0
+            now = time.time()
+            h = r.headers
+            b = self.buckets.get(resource)
+            if h.get("X-RateLimit-Remaining") is not None:
+                b = self.buckets.setdefault(resource, {"tokens": 1.0, "stamp": now})
+                b["remaining"] = int(h["X-RateLimit-Remaining"])
+                b["limit"] = int(h.get("X-RateLimit-Limit") or 1)
+                b["reset"] = float(h.get("X-RateLimit-Reset") or now + 60)
+
+            wait = 0.0
+            if r.status_code in (403, 429):
+                if h.get("Retry-After"):
+                    wait = float(h["Retry-After"])
+                elif b and h.get("X-RateLimit-Remaining") == "0":
+                    wait = b["reset"] - now + 1
+                elif r.status_code == 429 or "secondary rate limit" in r.text.lower():
+                    wait = SECONDARY_LIMIT_PAUSE
+            if wait > 0:
+                self.pause(wait, resource)
+                self.limit = max(self.min, self.limit // 2)
+            elif not b or b["remaining"] > b["limit"] * 0.5:
+                self.limit = min(self.max, self.limit + 1)
+            elif b["remaining"] < b["limit"] * 0.1:
+                self.limit = max(self.min, self.limit - 1)
+            return wait
+
+    def pause(self, seconds: float, resource: str) -> None:
+        with self.cond:
+            self.throttled += 1
+            until = time.time() + max(seconds, 1.0)
+            if until > self.paused_until:
+                self.paused_until = until
+                print(f"⏸️  GitHub rate limit ({resource}) – pauza {seconds:.0f} s")
+            self.cond.notify_all()
+
+    def summary(self) -> str:
+        budget = ", ".join(f"{k} {int(b['remaining'])}/{int(b['limit'])}" for k, b in sorted(self.buckets.items()))
+        return (f"zostatok {budget or '?'}; throttling {self.throttled}×; "
+                f"súbežnosť {self.limit}/{self.max}")
+
 # ------------------ GitHub klient ------------------
 
-def build_session(cfg: Config) -> requests.Session:
-    """HTTP session s retries a tokenom."""
+if TYPE_CHECKING:
+    class GitHubSession(requests.Session):
+        """requests.Session, ktorá nesie aj stav zdieľaný všetkými gh_get volaniami."""
+        http_cache: HttpCache | None
+        limiter: RateLimiter | None
+
+def build_session(cfg: Config) -> GitHubSession:
+    """HTTP session s retries (5xx), tokenom, rate-limit plánovačom a voliteľnou ETag cache."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
     s = requests.Session()
+    s.http_cache = None
     s.headers.update({"Authorization": f"token {cfg.token}", "Accept": "application/vnd.github+json"})
+    # 429/403 limity rieši RateLimiter (rešpektuje Retry-After/reset), urllib3 len 5xx
     retry = Retry(total=5, backoff_factor=0.5,
-                  status_forcelist=(429, 500, 502, 503, 504),
+                  status_forcelist=(500, 502, 503, 504),
                   allowed_methods=frozenset(["GET"]))
     adapter = HTTPAdapter(max_retries=retry, pool_connections=cfg.workers, pool_maxsize=cfg.workers)
     s.mount("https://", adapter)
+    s.limiter = RateLimiter(cfg.workers)
+    if cfg.http_cache_mb > 0:
+        s.http_cache = HttpCache(cfg.http_cache_dir, cfg.http_cache_mb * 1_000_000)
     return s
 
+def gh_request(session: requests.Session, method: str, url: str, **kwargs) -> requests.Response:
+    """Jeden GitHub request cez zdieľaný RateLimiter; throttlované requesty po pauze zopakuje."""
+    limiter: RateLimiter | None = getattr(session, "limiter", None)
+    if not limiter:
+        return session.request(method, url, **kwargs)
+    resource = rate_limit_resource(url)
+    kind = endpoint_kind(url)
+    for _ in range(RATE_LIMIT_ATTEMPTS):
+        with span(f"wait {resource}", "rate-limit"):
+            limiter.acquire(resource)
+        try:
+            with span(f"{method} {kind}", "http") as sp:
+                r = session.request(method, url, **kwargs)
+                sp.args.update(status=r.status_code, bytes=len(r.content))
+        except Exception:
+            limiter.release(resource, None)
+            raise
+        if PROFILER:
+            PROFILER.count("http bytes", len(r.content))
+            if r.headers.get("X-RateLimit-Remaining") is not None:
+                PROFILER.rate_limit(resource, int(r.headers["X-RateLimit-Remaining"]))
+        if not limiter.release(resource, r):
+            break
+        profile_count("http retries (throttled)")
+    return r
+
 def gh_get(session: requests.Session, url: str, timeout: float, **params) -> Any:
-    r = session.get(url, params=params, timeout=timeout)
+    cache: HttpCache | None = getattr(session, "http_cache", None)
+    key, entry, headers = None, None, {}
+    if cache:
+        key = cache.key(url, params)
+        entry = cache.get(key)
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        elif entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    r = gh_request(session, "GET", url, params=params, timeout=timeout, headers=headers)
+    if r.status_code == 304 and entry is not None:
+        cache.hit(key)
+        profile_count("http cache hits (304)")
+        return entry["body"]
     if r.status_code >= 400:
         print(f"\n❌ GitHub API {r.status_code}: {r.url}\n{r.text}\n")
         r.raise_for_status()
-    return r.json()
+    data = r.json()
+    if cache and (r.headers.get("ETag") or r.headers.get("Last-Modified")):
+        cache.put(key, {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified"),
+                        "body": data})
+    return data
+
+def gh_graphql(session: requests.Session, cfg: Config, query: str, **variables) -> Dict[str, Any]:
+    """POST na /graphql; GraphQL chyby (HTTP 200 + 'errors') zmení na výnimku.
+
+    RATE_LIMITED chyba (GraphQL ju vracia s HTTP 200) sa rieši pauzou do resetu a opakovaním.
+    """
+    url = f"{cfg.github_api}/graphql"
+    for _ in range(RATE_LIMIT_ATTEMPTS):
+        r = gh_request(session, "POST", url, json={"query": query, "variables": variables},
+                       timeout=cfg.timeout)
+        if r.status_code >= 400:
+            print(f"\n❌ GitHub GraphQL {r.status_code}: {r.url}\n{r.text}\n")
+            r.raise_for_status()
+        payload = r.json()
+        errors = payload.get("errors") or []
+        limiter: RateLimiter | None = getattr(session, "limiter", None)
+        if limiter and any(e.get("type") == "RATE_LIMITED" for e in errors):
+            reset = float(r.headers.get("X-RateLimit-Reset") or 0)
+            limiter.pause(max(reset - time.time(), SECONDARY_LIMIT_PAUSE), "graphql")
+            continue
+        break
+    if errors:
+        msgs = "; ".join(e.get("message", "?") for e in errors)
+        raise RuntimeError(f"GitHub GraphQL chyba: {msgs}")
+    return payload["data"]
 
 # ------------------ Vyhľadávanie a filtre ------------------
 
@@ -223,97 +789,212 @@ def repo_full_name(repo_api_url: str) -> str:
     """'https://api.github.com/repos/FI-PV247/x' -> 'FI-PV247/x'."""
     return "/".join(repo_api_url.rstrip("/").split("/")[-2:])
 
+# dátum alebo UTC čas (--watch polluje od času posledného pollu)
+SINCE_RE = re.compile(r"\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}:\d{2}Z)?")
+
 def build_search_query(cfg: Config) -> str:
     parts = [f"org:{cfg.org}", "is:pr", "is:open", f"label:{cfg.label}", "in:title", cfg.title_contains]
-    if cfg.since and re.fullmatch(r"\d{4}-\d{2}-\d{2}", cfg.since):
+    if cfg.since and SINCE_RE.fullmatch(cfg.since):
         parts.append(f"{'created' if cfg.created else 'updated'}:>={cfg.since}")
     return " ".join(parts)
 
-def search_issues_all_pages(session: requests.Session, cfg: Config, q: str, per_page=100) -> List[Dict[str, Any]]:
-    page = 1
-    total_items: List[Dict[str, Any]] = []
+# GitHub search vráti z jedného dotazu max 1000 výsledkov; väčší rozsah dátumov sa delí
+SEARCH_CAP = 1000
+SEARCH_MIN_WINDOW = timedelta(minutes=1)
+SEARCH_EPOCH = datetime(2008, 1, 1, tzinfo=timezone.utc)
+
+def item_key(it: Dict[str, Any]) -> str:
+    """'FI-PV247/repo#7' – identita PR naprieč search oknami, cache a stage."""
+    return f"{repo_full_name(it['repository_url'])}#{it['number']}"
+
+def search_bounds(cfg: Config) -> Tuple[datetime, datetime]:
+    lo = SEARCH_EPOCH
+    if cfg.since and SINCE_RE.fullmatch(cfg.since):
+        lo = datetime.fromisoformat(cfg.since.replace("Z", "+00:00"))
+        lo = lo if lo.tzinfo else lo.replace(tzinfo=timezone.utc)
+    # horná hranica zaokrúhlená na polnoc (UTC) o ≥ 1 deň: celý deň rovnaké okná bisekcie,
+    # teda rovnaké dotazy a 304 z HTTP cache; rezerva 1 deň kryje posun hodín voči GitHubu
+    hi = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return lo, hi
+
+def window_query(cfg: Config, q: str, lo: datetime, hi: datetime) -> str:
+    """Nahradí `updated:>=…`/`created:>=…` v dotaze uzavretým rozsahom lo..hi."""
+    field = "created" if cfg.created else "updated"
+    fmt = "%Y-%m-%dT%H:%M:%S+00:00"
+    base = re.sub(r"\s(created|updated):>=\S+", "", q)
+    return f"{base} {field}:{lo.strftime(fmt)}..{hi.strftime(fmt)}"
+
+def split_window(lo: datetime, hi: datetime) -> List[Tuple[datetime, datetime]]:
+    """Rozpoľ okno; novšia polovica ide prvá (rovnaké poradie ako sort=updated desc)."""
+    mid = lo + (hi - lo) / 2
+    return [(mid + timedelta(seconds=1), hi), (lo, mid)]
+
+def iter_search_pages(session: requests.Session, cfg: Config, q: str, per_page=100) -> Iterable[List[Dict[str, Any]]]:
+    """Stránky výsledkov search API, hneď ako prídu (rešpektuje cfg.limit).
+
+    Ak dotaz matchne viac ako SEARCH_CAP PR, rozsah dátumov sa rekurzívne delí, kým
+    každé okno nie je pod limitom. Z total_count prvej strany okna vieme počet strán,
+    takže ostatné strany sa ťahajú paralelne. PR, ktoré sa medzi oknami/stranami
+    posunuli (updated_at), sa deduplikujú podľa repo#number.
+    """
     if cfg.debug:
         print(f"🔍 Query: {q}")
-    while True:
-        payload = gh_get(session, f"{cfg.github_api}/search/issues",
-                         cfg.timeout, q=q, per_page=per_page, page=page,
-                         sort="updated", order="desc")
-        items = payload.get("items", [])
-        if page == 1:
-            total = payload.get("total_count", len(items))
-            print(f"🔎 Search matched ≈ {total} PR (GitHub vráti max ~1000).")
-        total_items.extend(items)
-        if len(items) < per_page: break
-        if cfg.limit and len(total_items) >= cfg.limit: break
-        page += 1
-    if cfg.limit:
-        total_items = total_items[:cfg.limit]
-    return total_items
-
-def filter_students(items: List[Dict[str, Any]], cfg: Config) -> List[Dict[str, Any]]:
-    """Filter podľa zoznamu študentov (autor PR, resp. suffix v názve repa)."""
-    if not cfg.students:
-        return items
-    before = len(items)
+    url = f"{cfg.github_api}/search/issues"
+
+    def fetch(query: str, page: int) -> Dict[str, Any]:
+        return gh_get(session, url, cfg.timeout, q=query, per_page=per_page, page=page,
+                      sort="updated", order="desc")
+
+    seen: set[str] = set()
+    yielded = 0
+
+    def fresh(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        out = []
+        for it in items:
+            key = item_key(it)
+            if key not in seen:
+                seen.add(key)
+                out.append(it)
+        if cfg.limit:
+            out = out[:cfg.limit - yielded]
+        return out
+
+    ex = ThreadPoolExecutor(max_workers=cfg.workers, initializer=poll_output_of())
+    try:
+        first = fetch(q, 1)
+        total = first.get("total_count", len(first.get("items", [])))
+        print(f"🔎 Search matched ≈ {total} PR"
+              + (" – delím rozsah dátumov na okná pod 1000." if total > SEARCH_CAP else "."))
+        # fronta okien: (dotaz, lo, hi, 1. strana – payload alebo future)
+        lo, hi = search_bounds(cfg)
+        windows: List[Tuple[str, datetime, datetime, Any]] = [(q, lo, hi, first)]
+        while windows:
+            wq, lo, hi, payload = windows.pop(0)
+            if not isinstance(payload, dict):
+                payload = payload.result()
+            total = payload.get("total_count", 0)
+            if total > SEARCH_CAP and hi - lo > SEARCH_MIN_WINDOW:
+                if cfg.debug:
+                    print(f"  …okno {lo:%Y-%m-%d %H:%M}..{hi:%Y-%m-%d %H:%M} má {total} PR → delím")
+                halves = [(window_query(cfg, q, a, b), a, b) for a, b in split_window(lo, hi)]
+                windows[:0] = [(hq, a, b, ex.submit(fetch, hq, 1)) for hq, a, b in halves]
+                # 1. strana je platná aj tak – pošli ju ďalej hneď, polovice ju deduplikujú
+                items = fresh(payload.get("items", []))
+                yielded += len(items)
+                yield items
+                if cfg.limit and yielded >= cfg.limit:
+                    return
+                continue
+            if total > SEARCH_CAP:
+                print(f"⚠️  Okno {lo}..{hi} má stále {total} PR, GitHub vráti len prvých {SEARCH_CAP}.")
+            pages = (min(total, SEARCH_CAP) + per_page - 1) // per_page
+            rest = [ex.submit(fetch, wq, page) for page in range(2, pages + 1)]
+            for chunk in [payload] + rest:
+                data = chunk if isinstance(chunk, dict) else chunk.result()
+                items = fresh(data.get("items", []))
+                yielded += len(items)
+                yield items
+                if cfg.limit and yielded >= cfg.limit:
+                    return
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
 
-    def repo_name(it) -> str:
-        return repo_full_name(it["repository_url"]).split("/")[1]
-
-    def ends_with_login(name: str) -> bool:
+def search_issues_all_pages(session: requests.Session, cfg: Config, q: str, per_page=100) -> List[Dict[str, Any]]:
+    return [it for items in iter_search_pages(session, cfg, q, per_page) for it in items]
+
+class RepoFilter:
+    """Všetky filtre (študenti → contains → regex → úlohy → exclude) skompilované raz v load_config.
+
+    Jeden prechod cez položky: názov repa sa vyráta raz, regexy sú predkompilované
+    a login v názve repa sa hľadá cez množinu suffixov za každou '-' (O(dĺžka názvu)
+    namiesto O(počet študentov)). `drops` počíta, koľko PR vyradil ktorý filter.
+    """
+
+    def __init__(self, students: set[str], student_match: str, contains: List[str],
+                 regex: str | None, exclude: str | None, homeworks: Iterable[re.Pattern] = ()):
+        self.students = frozenset(students)
+        self.by_author = student_match in ("author", "either")
+        self.by_repo = student_match in ("repo", "either")
+        self.contains = [c.lower() for c in contains]
+        self.rx = re.compile(regex, re.I) if regex else None
+        self.ex = re.compile(exclude, re.I) if exclude else None
+        self.homeworks = list(homeworks)
+        self.reset()
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> RepoFilter:
+        return cls(cfg.students, cfg.student_match, cfg.contains, cfg.regex, cfg.exclude,
+                   [hw.rx for hw in cfg.homeworks])
+
+    def reset(self) -> None:
+        self.drops = {"students": 0, "contains": 0, "regex": 0, "homework": 0, "exclude": 0}
+
+    def __bool__(self) -> bool:
+        return bool(self.students or self.contains or self.rx or self.homeworks or self.ex)
+
+    def repo_has_login(self, lower: str) -> bool:
+        """Končí názov repa na '-<login>'? Login môže sám obsahovať '-', preto každý suffix."""
+        i = lower.find("-")
+        while i != -1:
+            if lower[i + 1:] in self.students:
+                return True
+            i = lower.find("-", i + 1)
+        return False
+
+    def reason(self, it: Dict[str, Any]) -> str | None:
+        """Názov filtra, ktorý PR vyradí, alebo None ak prejde."""
+        name = it["repository_url"].rstrip("/").rsplit("/", 1)[-1]
         lower = name.lower()
-        # posledný segment za '-'
-        suffix = lower.rsplit("-", 1)[-1]
-        if suffix in cfg.students:
-            return True
-        return any(lower.endswith("-" + u) for u in cfg.students)
-
-    kept = []
-    for it in items:
-        author = ((it.get("user") or {}).get("login") or "").lower()
-        name = repo_name(it)
-        by_author = author in cfg.students
-        by_repo = ends_with_login(name)
-        ok = (cfg.student_match == "author" and by_author) or \
-             (cfg.student_match == "repo" and by_repo) or \
-             (cfg.student_match == "either" and (by_author or by_repo))
-        if ok:
-            kept.append(it)
-
-    print(f"👥 STUDENTS filter (match={cfg.student_match}) → zostáva: {len(kept)} PR (−{before - len(kept)})")
-    return kept
-
-def filter_contains_regex(items: List[Dict[str, Any]], cfg: Config) -> List[Dict[str, Any]]:
-    """Substring + include-regex + exclude-regex filtre nad názvom repa."""
-    def repo_name(it) -> str:
-        return repo_full_name(it["repository_url"]).split("/")[1]
-
-    if cfg.contains:
-        before = len(items)
-        lowers = [s.lower() for s in cfg.contains]
-        items = [it for it in items if any(s in repo_name(it).lower() for s in lowers)]
-        print(f"🔎 REPO_CONTAINS={cfg.contains} → zostáva: {len(items)} PR (−{before - len(items)})")
-
-    if cfg.regex:
-        before = len(items)
-        rx = re.compile(cfg.regex, re.I)
-        items = [it for it in items if rx.search(repo_name(it))]
-        print(f"🧹 REPO_REGEX → zostáva: {len(items)} PR (−{before - len(items)})")
-
-    if cfg.exclude:
-        before = len(items)
-        ex = re.compile(cfg.exclude, re.I)
-        items = [it for it in items if not ex.search(repo_name(it))]
-        print(f"🚫 EXCLUDE_REGEX vyradil: {before - len(items)} PR (zostáva {len(items)})")
-
-    return items
+        if self.students:
+            author = ((it.get("user") or {}).get("login") or "").lower()
+            if not ((self.by_author and author in self.students) or (self.by_repo and self.repo_has_login(lower))):
+                return "students"
+        if self.contains and not any(c in lower for c in self.contains):
+            return "contains"
+        if self.rx and not self.rx.search(name):
+            return "regex"
+        if self.homeworks and not any(rx.search(name) for rx in self.homeworks):
+            return "homework"
+        if self.ex and self.ex.search(name):
+            return "exclude"
+        return None
+
+    def __call__(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not self:
+            return items
+        kept = []
+        for it in items:
+            why = self.reason(it)
+            if why is None:
+                kept.append(it)
+            else:
+                self.drops[why] += 1
+        return kept
+
+    def summary(self) -> str:
+        return ", ".join(f"{k} −{v}" for k, v in self.drops.items() if v) or "nič nevyradili"
 
 # ---------- Detekcia "už hodnotené" ----------
 
-def list_issue_comments(session: requests.Session, cfg: Config, repo_full: str, number: int) -> Iterable[Dict[str, Any]]:
+def list_issue_comments(session: requests.Session, cfg: Config, repo_full: str, number: int,
+                        total: int | None = None, since: str | None = None) -> Iterable[Dict[str, Any]]:
+    """Issue komentáre PR.
+
+    Ak poznáme ich počet (`comments` zo search itemu), ideme od najnovších – od poslednej
+    strany po prvú – lebo hodnotenie býva na konci vlákna. So `since` vráti len komentáre
+    zmenené po danom čase (GitHub API ich vracia chronologicky).
+    """
+    url = f"{cfg.github_api}/repos/{repo_full}/issues/{number}/comments"
+    if total is not None and not since:
+        for page in range((total + 99) // 100, 0, -1):
+            chunk = gh_get(session, url, cfg.timeout, per_page=100, page=page)
+            if not isinstance(chunk, list): break
+            yield from reversed(chunk)
+        return
     page = 1
+    extra = {"since": since} if since else {}
     while True:
-        chunk = gh_get(session, f"{cfg.github_api}/repos/{repo_full}/issues/{number}/comments",
-                       cfg.timeout, per_page=100, page=page)
+        chunk = gh_get(session, url, cfg.timeout, per_page=100, page=page, **extra)
         if not isinstance(chunk, list): break
         for c in chunk: yield c
         if len(chunk) < 100: break
@@ -329,15 +1010,22 @@ def list_pr_reviews(session: requests.Session, cfg: Config, repo_full: str, numb
         if len(chunk) < 100: break
         page += 1
 
-def pr_has_evaluation_marker(session: requests.Session, cfg: Config, repo_full: str, number: int) -> bool:
+def pr_has_evaluation_marker(session: requests.Session, cfg: Config, repo_full: str, number: int,
+                             comments_total: int | None = None, since: str | None = None) -> bool:
     # issue comments
-    for c in list_issue_comments(session, cfg, repo_full, number):
+    for c in list_issue_comments(session, cfg, repo_full, number, total=comments_total, since=since):
         if cfg.eval_re.search(c.get("body") or ""): return True
     # review summary comments
     for r in list_pr_reviews(session, cfg, repo_full, number):
         if cfg.eval_re.search(r.get("body") or ""): return True
     return False
 
+def check_evaluated(session: requests.Session, cfg: Config, it: Dict[str, Any], since: str | None = None) -> bool:
+    """REST eval-scan jedného PR; so `since` (updated_at posledného verdiktu) len novšie komentáre."""
+    full = repo_full_name(it["repository_url"])
+    return pr_has_evaluation_marker(session, cfg, full, it["number"],
+                                    comments_total=it.get("comments"), since=since)
+
 # ------------------ Fetch PR detaily + klonovanie ------------------
 
 def fetch_pr_detail(session: requests.Session, cfg: Config, it: Dict[str, Any]) -> Dict[str, Any]:
@@ -355,38 +1043,271 @@ def fetch_pr_detail(session: requests.Session, cfg: Config, it: Dict[str, Any])
         "default_branch": pr["base"]["repo"]["default_branch"],
     }
 
+# Chyby git/ssh, pri ktorých má zmysel skúsiť to znova (sieť, preťažený GitHub SSH;
+# "did not send all necessary objects" vie vzniknúť pri súbežných fetchoch do --shared-store)
+TRANSIENT_GIT_ERRORS = re.compile(
+    r"connection (reset|timed out|closed)|operation timed out|kex_exchange_identification|"
+    r"ssh_exchange_identification|remote end hung up|early eof|could not resolve host|"
+    r"temporary failure|rpc failed|did not send all necessary objects", re.I)
+GIT_ATTEMPTS = 3
+SHARED_STORE_DIR = ".shared-objects.git"   # bodka → run_repos.sh (for repo in */) ho obíde
+
+def git_run(cmd: str, log: List[str], cwd: Path | None = None) -> None:
+    """Spusti git príkaz, výstup zapíš do `log`; prechodné sieťové chyby opakuj."""
+    sub = next((w for w in cmd.split()[1:] if not w.startswith("-") and "=" not in w), "?")
+    for attempt in range(1, GIT_ATTEMPTS + 1):
+        log.append(f"  → {cmd}")
+        with span(f"git {sub}", "git", cwd=str(cwd or ""), attempt=attempt) as sp:
+            res = subprocess.run(cmd, shell=True, cwd=cwd, text=True,
+                                 stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            sp.args["rc"] = res.returncode
+        if res.returncode == 0:
+            return
+        profile_count("git retries" if attempt < GIT_ATTEMPTS else "git failures")
+        tail = res.stdout.strip().splitlines()[-1:] or [f"exit {res.returncode}"]
+        log.append(f"    ✗ {tail[0]}")
+        if attempt == GIT_ATTEMPTS or not TRANSIENT_GIT_ERRORS.search(res.stdout):
+            raise RuntimeError(f"`{cmd}` zlyhal: {tail[0]}")
+        time.sleep(2 ** attempt)
+
+def clone_source(cfg: Config, pr: Dict[str, Any]) -> str:
+    if pr["ssh_url"]:
+        return pr["ssh_url"]
+    if pr["https_url"]:
+        return pr["https_url"].replace("https://", f"https://{cfg.token}@")
+    raise RuntimeError("Repo zdroj pre head branch nie je dostupný (deleted fork?).")
+
 def ensure_checkout(cfg: Config, pr: Dict[str, Any]) -> str:
-    """Naklonuj repo (ak netreba, len fetch/checkout na PR vetvu)."""
+    """Naklonuj repo (ak netreba, len fetch/checkout na PR vetvu).
+
+    Výstup git príkazov sa zbiera a vypíše naraz po dokončení PR, aby sa pri paralelnom
+    klonovaní neprekladali riadky rôznych repo. Prechodné sieťové chyby sa opakujú.
+    """
     repo_name = pr["repo"].split("/")[1]
-    dest = cfg.clone_root / repo_name
+    dest = clone_root_for(cfg, repo_name) / repo_name
     ref = pr["head_ref"]
+    log: List[str] = [f"📦 {pr['repo']} PR#{pr['number']}"]
+
+    try:
+        # klasický klon z predošlých behov nechávame tak, ako je
+        if cfg.shared_store and not (dest / ".git").is_dir():
+            checkout_shared(cfg, pr, dest, log)
+            return str(dest)
+
+        if cfg.fetch_sha:
+            checkout_sha(cfg, pr, dest, log)
+            return str(dest)
+
+        if not dest.exists():
+            git_run(f"git clone --no-tags --depth 1 {clone_source(cfg, pr)} {dest}", log)
+        git_run(f"git fetch origin {ref} --depth 1", log, cwd=dest)
+        git_run(f"git checkout -B {ref} origin/{ref}", log, cwd=dest)
+    finally:
+        print("\n".join(log))
+    return str(dest)
 
-    def run(cmd: str, cwd: Path | None = None, ok: bool = True) -> int:
-        print("→", cmd)
+def checkout_sha(cfg: Config, pr: Dict[str, Any], dest: Path, log: List[str]) -> None:
+    """Stiahni presne head_sha jedným fetchom (namiesto clone + fetch vetvy).
+
+    Fetch podľa SHA nezávisí od toho, kam medzitým ukazuje vetva, takže checkout vždy
+    sedí s SHA, ktoré si zapíšeme do cache. Voliteľne bez blobov (--blobless) a len
+    vybrané adresáre (--sparse); chýbajúce bloby si git dotiahne len pre sparse cestu.
+    """
+    if not (dest / ".git").is_dir():
+        git_run(f"git init --quiet {dest}", log)
+    # aj pri každom ďalšom behu: po zlyhanom prvom fetchi, resp. zmene ssh/https, musí origin sedieť
+    source = clone_source(cfg, pr)
+    git_run(f"git remote set-url origin {source} || git remote add origin {source}", log, cwd=dest)
+    if cfg.sparse:
+        git_run(f"git sparse-checkout set --cone {' '.join(cfg.sparse)}", log, cwd=dest)
+    blob_filter = " --filter=blob:none" if cfg.blobless else ""
+    git_run(f"git fetch --no-tags --depth 1{blob_filter} origin {pr['head_sha']}", log, cwd=dest)
+    git_run(f"git checkout --quiet -B {pr['head_ref']} {pr['head_sha']}", log, cwd=dest)
+    if not cfg.sparse and sparse_enabled(dest):
+        # klon z behu s --sparse; až po checkoute, aby sa bloby ťahali len pre nové SHA
+        git_run("git sparse-checkout disable", log, cwd=dest)
+
+def sparse_enabled(dest: Path) -> bool:
+    res = subprocess.run(["git", "config", "--get", "core.sparseCheckout"], cwd=dest, text=True,
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return res.stdout.strip() == "true"
+
+def git_objects_size(dest: Path) -> int:
+    """Veľkosť .git/objects v bajtoch (0, ak repo ešte neexistuje alebo je to worktree)."""
+    objects = dest / ".git" / "objects"
+    if not objects.is_dir():
+        return 0
+    return sum(f.stat().st_size for f in objects.rglob("*") if f.is_file())
+
+# ---------- Zdieľaný object store (--shared-store) ----------
+
+_store_lock = threading.Lock()
+_store_seeded: Dict[Path, threading.Event] = {}
+
+def checkout_shared(cfg: Config, pr: Dict[str, Any], dest: Path, log: List[str]) -> None:
+    """Checkout PR ako `git worktree` nad jedným bare repom pre celú úlohu.
+
+    Všetky študentské repá sú forky tej istej šablóny, takže jej história sa stiahne
+    a uloží len raz; každé repo je v store samostatný remote (meno = názov repa)
+    a na disku len pracovný strom. Prvý fetch do store beží sám (seed), ostatné
+    až po ňom – inak by prvá paralelná vlna sťahovala šablónu N-krát.
+    """
+    repo_name = pr["repo"].split("/")[1]
+    # store je per úloha – repá jednej úlohy zdieľajú históriu šablóny
+    store = (clone_root_for(cfg, repo_name) / SHARED_STORE_DIR).resolve()
+    git = f"git --git-dir={store}"
+    target = f"refs/remotes/{repo_name}/{pr['head_ref']}"
+    source = pr["head_sha"] if cfg.fetch_sha else f"refs/heads/{pr['head_ref']}"
+    fetch = (f"{git} -c gc.auto=0 fetch --no-tags --no-write-fetch-head {repo_name} "
+             f"+{source}:{target}")
+
+    with _store_lock:
+        seeding = store not in _store_seeded
+        if seeding:
+            _store_seeded[store] = threading.Event()
+            if not store.exists():
+                git_run(f"git init --quiet --bare {store}", log)
+            git_run(f"{git} worktree prune", log)
+        if f'[remote "{repo_name}"]' not in (store / "config").read_text():
+            git_run(f"{git} remote add {repo_name} {clone_source(cfg, pr)}", log)
+    seeded = _store_seeded[store]
+
+    if seeding:
         try:
-            subprocess.run(cmd, shell=True, check=True, cwd=cwd,
-                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-            return 0
-        except subprocess.CalledProcessError as e:
-            if ok: return e.returncode
-            raise
+            git_run(fetch, log)
+        finally:
+            seeded.set()
+    else:
+        seeded.wait()
+        git_run(fetch, log)
 
-    if not dest.exists():
-        if pr["ssh_url"]:
-            run(f"git clone --no-tags --depth 1 {pr['ssh_url']} {dest}", ok=True)
-        elif pr["https_url"]:
-            https_with_token = pr["https_url"].replace("https://", f"https://{cfg.token}@")
-            run(f"git clone --no-tags --depth 1 {https_with_token} {dest}", ok=True)
-        else:
-            raise RuntimeError("Repo zdroj pre head branch nie je dostupný (deleted fork?).")
-
-    run(f"git fetch origin {ref} --depth 1", cwd=dest, ok=True)
-    run(f"git checkout -B {ref} origin/{ref}", cwd=dest, ok=True)
-    return str(dest)
+    # worktree add mení store (worktrees/, refs) → sériovo
+    branch = f"pr/{repo_name}"
+    if dest.exists():
+        git_run(f"git checkout -B {branch} {target}", log, cwd=dest)
+    else:
+        with _store_lock:
+            git_run(f"{git} worktree add --force -B {branch} {dest.resolve()} {target}", log)
+
+# ------------------ GraphQL režim (--graphql) ------------------
+
+# Jeden dotaz vráti to, čo REST skladá zo search + /pulls/{n} + comments + reviews.
+# Posledných 100 komentárov/review stačí skoro vždy; ak ich je viac a v načítaných
+# nie je hodnotenie, PR sa dokontroluje cez REST (pr_has_evaluation_marker).
+GRAPHQL_SEARCH_QUERY = """
+query($q: String!, $first: Int!, $after: String) {
+  search(query: $q, type: ISSUE, first: $first, after: $after) {
+    issueCount
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on PullRequest {
+        number
+        url
+        updatedAt
+        author { login }
+        repository { nameWithOwner }
+        headRefName
+        headRefOid
+        headRepository { sshUrl url }
+        baseRepository { defaultBranchRef { name } }
+        comments(last: 100) { totalCount nodes { body } }
+        reviews(last: 100) { totalCount nodes { body } }
+      }
+    }
+  }
+}
+"""
+
+def graphql_node_to_item(cfg: Config, node: Dict[str, Any]) -> Dict[str, Any]:
+    """GraphQL PR uzol -> dict v tvare REST search itemu (pre filtre) + '_pr' detail a '_eval' verdikt.
+
+    '_pr' má rovnaký tvar ako výstup fetch_pr_detail. '_eval' je True/False, alebo None,
+    ak sme nevideli všetky komentáre/review a treba ich doskenovať cez REST.
+    """
+    full = node["repository"]["nameWithOwner"]
+    head_repo = node.get("headRepository")
+    base_branch = ((node.get("baseRepository") or {}).get("defaultBranchRef") or {}).get("name")
+    comments = node.get("comments") or {"totalCount": 0, "nodes": []}
+    reviews = node.get("reviews") or {"totalCount": 0, "nodes": []}
+
+    bodies = [c.get("body") or "" for c in comments["nodes"]] + [r.get("body") or "" for r in reviews["nodes"]]
+    if any(cfg.eval_re.search(b) for b in bodies):
+        has_eval: bool | None = True
+    elif comments["totalCount"] > len(comments["nodes"]) or reviews["totalCount"] > len(reviews["nodes"]):
+        has_eval = None
+    else:
+        has_eval = False
+
+    return {
+        "repository_url": f"{cfg.github_api}/repos/{full}",
+        "number": node["number"],
+        "html_url": node["url"],
+        "user": {"login": (node.get("author") or {}).get("login")},
+        "updated_at": node.get("updatedAt"),
+        "comments": comments["totalCount"],
+        "_pr": {
+            "repo": full,
+            "number": node["number"],
+            "url": node["url"],
+            "head_sha": node["headRefOid"],
+            "head_ref": node["headRefName"],
+            "ssh_url": head_repo["sshUrl"] if head_repo else None,
+            "https_url": f"{head_repo['url']}.git" if head_repo else None,
+            "default_branch": base_branch,
+        },
+        "_eval": has_eval,
+    }
+
+def iter_search_pages_graphql(session: requests.Session, cfg: Config, q: str,
+                              per_page=50) -> Iterable[List[Dict[str, Any]]]:
+    """Ekvivalent iter_search_pages cez GraphQL – itemy už nesú detail PR aj eval verdikt.
+
+    Nad SEARCH_CAP delí rozsah dátumov rovnako ako REST verzia; stránkovanie kurzorom
+    je sekvenčné, takže okná sa prechádzajú za sebou.
+    """
+    if cfg.debug:
+        print(f"🔍 GraphQL query: {q} sort:updated-desc")
+    seen: set[str] = set()
+    yielded = 0
+    lo, hi = search_bounds(cfg)
+    windows: List[Tuple[str, datetime, datetime]] = [(q, lo, hi)]
+    first = True
+    while windows:
+        wq, lo, hi = windows.pop(0)
+        after = None
+        while True:
+            data = gh_graphql(session, cfg, GRAPHQL_SEARCH_QUERY, q=f"{wq} sort:updated-desc",
+                              first=per_page, after=after)
+            search = data["search"]
+            if first:
+                print(f"🔎 Search (GraphQL) matched ≈ {search['issueCount']} PR"
+                      + (" – delím rozsah dátumov na okná pod 1000." if search["issueCount"] > SEARCH_CAP else "."))
+                first = False
+            split = after is None and search["issueCount"] > SEARCH_CAP and hi - lo > SEARCH_MIN_WINDOW
+            items = []
+            for n in search["nodes"]:
+                if n and n.get("number"):
+                    it = graphql_node_to_item(cfg, n)
+                    if item_key(it) not in seen:
+                        seen.add(item_key(it))
+                        items.append(it)
+            if cfg.limit:
+                items = items[:cfg.limit - yielded]
+            yielded += len(items)
+            yield items
+            if cfg.limit and yielded >= cfg.limit: return
+            if split:
+                windows[:0] = [(window_query(cfg, q, a, b), a, b) for a, b in split_window(lo, hi)]
+                break
+            if not search["pageInfo"]["hasNextPage"]: break
+            after = search["pageInfo"]["endCursor"]
+
+def search_prs_graphql(session: requests.Session, cfg: Config, q: str, per_page=50) -> List[Dict[str, Any]]:
+    return [it for items in iter_search_pages_graphql(session, cfg, q, per_page) for it in items]
 
 # ------------------ Cache ------------------
 
-def load_cache(path: Path) -> Dict[str, str]:
+def load_cache(path: Path) -> Dict[str, Any]:
     if path.exists():
         try:
             return json.loads(path.read_text() or "{}")
@@ -394,23 +1315,470 @@ def load_cache(path: Path) -> Dict[str, str]:
             return {}
     return {}
 
-def save_cache(path: Path, data: Dict[str, str]) -> None:
-    path.write_text(json.dumps(data, indent=2))
+def save_cache(path: Path, data: Dict[str, Any]) -> None:
+    # atomicky: pri páde/Ctrl-C počas zápisu zostane celý starý alebo celý nový súbor
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+# ------------------ Stav synchronizácie (SQLite) ------------------
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prs (
+    key             TEXT PRIMARY KEY,   -- 'FI-PV247/repo#7'
+    repo            TEXT NOT NULL,
+    number          INTEGER NOT NULL,
+    url             TEXT,
+    author          TEXT,
+    updated_at      TEXT,               -- posledné updated_at zo searchu
+    comments        INTEGER,
+    changed_at      REAL,               -- kedy sme naposledy videli iné updated_at
+    last_seen       REAL,
+    -- eval verdikt + updated_at/comments, voči ktorým platí
+    evaluated       INTEGER,
+    eval_updated_at TEXT,
+    eval_comments   INTEGER,
+    last_checked    REAL,
+    -- PR detail + updated_at, voči ktorému platí
+    head_sha        TEXT,
+    head_ref        TEXT,
+    ssh_url         TEXT,
+    https_url       TEXT,
+    default_branch  TEXT,
+    detail_updated_at TEXT,
+    -- checkout
+    tested_sha      TEXT,
+    clone_path      TEXT,
+    last_cloned     REAL,
+    -- build (zapisuje review_farm.py build --state-db)
+    built_sha       TEXT,
+    build_status    TEXT,
+    build_key       TEXT,
+    built_at        REAL
+);
+CREATE INDEX IF NOT EXISTS prs_changed ON prs(changed_at);
+CREATE INDEX IF NOT EXISTS prs_evaluated ON prs(evaluated);
+CREATE INDEX IF NOT EXISTS prs_clone_path ON prs(clone_path);   -- review_farm.py build --state-db
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    started  REAL NOT NULL,
+    finished REAL                       -- NULL = beh spadol/prerušený → --resume
+);
+-- append-only žurnál hotových krokov behu (search/eval/detail/checkout/search-done)
+CREATE TABLE IF NOT EXISTS journal (
+    seq     INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id  INTEGER NOT NULL,
+    kind    TEXT NOT NULL,
+    key     TEXT,
+    payload TEXT,
+    at      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS journal_run ON journal(run_id, kind);
+"""
+
+# stĺpce pridané po prvej verzii schémy → ALTER TABLE v starších DB
+STATE_ADDED_COLUMNS = {"built_sha": "TEXT", "build_status": "TEXT", "build_key": "TEXT", "built_at": "REAL"}
+
+STATE_QUERIES = {
+    "changed": ("PR zmenené (nové updated_at) počas posledného behu",
+                "SELECT key, url, updated_at, head_sha, tested_sha, clone_path FROM prs "
+                "WHERE changed_at >= (SELECT MAX(started) FROM runs) ORDER BY updated_at DESC"),
+    "unevaluated": ("PR bez hodnotenia (videné v poslednom behu)",
+                    "SELECT key, url, author, updated_at, clone_path FROM prs "
+                    "WHERE evaluated IS NOT 1 AND last_seen >= (SELECT MAX(started) FROM runs) "
+                    "ORDER BY repo"),
+    "untested": ("PR, ktorých aktuálny head ešte nie je naklonovaný",
+                 "SELECT key, url, head_sha, tested_sha FROM prs "
+                 "WHERE head_sha IS NOT NULL AND tested_sha IS NOT head_sha ORDER BY repo"),
+    "unbuilt": ("PR, ktorých naklonovaný head ešte nemá výsledok buildu (review_farm.py)",
+                "SELECT key, url, tested_sha, built_sha, build_status, clone_path FROM prs "
+                "WHERE tested_sha IS NOT NULL AND built_sha IS NOT tested_sha ORDER BY repo"),
+    "build-failed": ("PR, ktorých build aktuálneho headu zlyhal",
+                     "SELECT key, url, built_sha, build_status, clone_path FROM prs "
+                     "WHERE built_sha = tested_sha AND build_status IS NOT 'ok' ORDER BY repo"),
+}
+
+class StateStore:
+    """Perzistentný stav PR v SQLite (namiesto last_tested_sha.json + eval_cache.json).
+
+    Každý stage si pamätá, voči akému updated_at jeho výsledok platí (eval verdikt,
+    PR detail), takže nezmenený PR pri ďalšom behu nepotrebuje ani eval-scan, ani
+    /pulls/{n}. Zápisy sú malé transakcie hneď po každom PR; pripojenie zdieľajú
+    workery všetkých stage pod zámkom.
+
+    Spolu so stavom sa v tej istej transakcii pripíše záznam do žurnálu behu;
+    synchronous=FULL = každý commit je fsyncnutý, takže po páde/Ctrl-C ostane
+    všetko hotové a `--resume` pokračuje presne odtiaľ.
+    """
+
+    def __init__(self, path: Path, legacy_sha: Path | None = None, legacy_eval: Path | None = None):
+        fresh = not path.exists()
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(STATE_SCHEMA)
+        have = {r["name"] for r in self.db.execute("PRAGMA table_info(prs)")}
+        with self.db:
+            for column, kind in STATE_ADDED_COLUMNS.items():
+                if column not in have:
+                    self.db.execute(f"ALTER TABLE prs ADD COLUMN {column} {kind}")
+        self.run_id: int | None = None
+        self.resumed = False
+        if fresh:
+            self._migrate_json(legacy_sha, legacy_eval)
+
+    def _migrate_json(self, legacy_sha: Path | None, legacy_eval: Path | None) -> None:
+        """Jednorazový import starých JSON cache (ak existujú)."""
+        rows: Dict[str, Dict[str, Any]] = {}
+        for key, sha in (load_cache(legacy_sha) if legacy_sha else {}).items():
+            rows.setdefault(key, {})["tested_sha"] = sha
+        for key, v in (load_cache(legacy_eval) if legacy_eval else {}).items():
+            rows.setdefault(key, {}).update(evaluated=int(bool(v.get("evaluated"))),
+                                            eval_updated_at=v.get("updated_at"), eval_comments=v.get("comments"))
+        if not rows:
+            return
+        with self.db:
+            for key, v in rows.items():
+                repo, number = key.rsplit("#", 1)
+                self.db.execute(
+                    "INSERT INTO prs(key, repo, number, tested_sha, evaluated, eval_updated_at, eval_comments) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, repo, int(number), v.get("tested_sha"), v.get("evaluated"),
+                     v.get("eval_updated_at"), v.get("eval_comments")))
+        print(f"🗃️  Importoval som {len(rows)} PR zo starých JSON cache do SQLite.")
+
+    def _row(self, key: str) -> sqlite3.Row | None:
+        with self.lock:
+            return self.db.execute("SELECT * FROM prs WHERE key = ?", (key,)).fetchone()
+
+    # --- behy + žurnál ---
+
+    def begin_run(self, resume: bool = False) -> bool:
+        """Začne nový beh; s `resume` prevezme posledný nedokončený. Vráti True, ak sa pokračuje."""
+        with self.lock, self.db:
+            row = self.db.execute("SELECT id FROM runs WHERE finished IS NULL ORDER BY id DESC LIMIT 1").fetchone() \
+                if resume else None
+            if row:
+                self.run_id, self.resumed = row["id"], True
+            else:
+                self.run_id = self.db.execute("INSERT INTO runs(started) VALUES (?)", (time.time(),)).lastrowid
+        return self.resumed
+
+    def finish_run(self) -> None:
+        """Uzavrie beh (len po úspešnom dobehnutí); žurnály starších behov už netreba."""
+        if self.run_id is None:
+            return
+        with self.lock, self.db:
+            self.db.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), self.run_id))
+            self.db.execute("DELETE FROM journal WHERE run_id != ?", (self.run_id,))
+
+    def _journal(self, kind: str, key: str | None = None, payload: Any = None) -> None:
+        # volať pod self.lock vnútri transakcie, nech je zápis stavu aj žurnálu atomický
+        self.db.execute("INSERT INTO journal(run_id, kind, key, payload, at) VALUES (?, ?, ?, ?, ?)",
+                        (self.run_id, kind, key, None if payload is None else json.dumps(payload), time.time()))
+
+    def journal(self, kind: str) -> List[Any]:
+        """Payloady záznamov `kind` z aktuálneho behu (v poradí zápisu)."""
+        with self.lock:
+            rows = self.db.execute("SELECT payload FROM journal WHERE run_id = ? AND kind = ? ORDER BY seq",
+                                   (self.run_id, kind)).fetchall()
+        return [None if r["payload"] is None else json.loads(r["payload"]) for r in rows]
+
+    def mark(self, kind: str) -> None:
+        with self.lock, self.db:
+            self._journal(kind)
+
+    # --- search ---
+
+    def record_search(self, items: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        with self.lock, self.db:
+            self.db.executemany(
+                "INSERT INTO prs(key, repo, number, url, author, updated_at, comments, changed_at, last_seen) "
+                "VALUES (:key, :repo, :number, :url, :author, :updated_at, :comments, :now, :now) "
+                "ON CONFLICT(key) DO UPDATE SET url = excluded.url, author = excluded.author, "
+                "  changed_at = CASE WHEN prs.updated_at IS excluded.updated_at THEN prs.changed_at ELSE :now END, "
+                "  updated_at = excluded.updated_at, comments = excluded.comments, last_seen = :now",
+                [{"key": item_key(it), "repo": repo_full_name(it["repository_url"]), "number": it["number"],
+                  "url": it.get("html_url"), "author": (it.get("user") or {}).get("login"),
+                  "updated_at": it.get("updated_at"), "comments": it.get("comments"), "now": now}
+                 for it in items])
+            for it in items:
+                self._journal("search", item_key(it), it)
+
+    # --- eval ---
+
+    def eval_verdict(self, it: Dict[str, Any]) -> bool | None:
+        """Uložený verdikt, ak sa PR odvtedy nezmenil (updated_at + počet komentárov); inak None.
+
+        Nájdené hodnotenie berieme ako trvalé – nový push ho z vlákna nezmaže.
+        """
+        row = self._row(item_key(it))
+        if not row or row["evaluated"] is None:
+            return None
+        if row["evaluated"]:
+            return True
+        if row["eval_updated_at"] == it.get("updated_at") and row["eval_comments"] == it.get("comments"):
+            return False
+        return None
+
+    def eval_since(self, it: Dict[str, Any]) -> str | None:
+        """updated_at posledného negatívneho verdiktu – stačí skenovať komentáre od neho."""
+        row = self._row(item_key(it))
+        return row["eval_updated_at"] if row and row["evaluated"] == 0 else None
+
+    def record_eval(self, it: Dict[str, Any], has_eval: bool) -> None:
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE prs SET evaluated = ?, eval_updated_at = ?, eval_comments = ?, last_checked = ? "
+                "WHERE key = ?",
+                (int(has_eval), it.get("updated_at"), it.get("comments"), time.time(), item_key(it)))
+            self._journal("eval", item_key(it), has_eval)
+
+    # --- PR detail ---
+
+    def cached_detail(self, it: Dict[str, Any]) -> Dict[str, Any] | None:
+        """PR detail z minulého behu, ak sa PR odvtedy nezmenil (push mení updated_at)."""
+        row = self._row(item_key(it))
+        if not row or not row["head_sha"] or not it.get("updated_at") \
+                or row["detail_updated_at"] != it.get("updated_at"):
+            return None
+        return {"repo": row["repo"], "number": row["number"], "url": row["url"] or it["html_url"],
+                "head_sha": row["head_sha"], "head_ref": row["head_ref"], "ssh_url": row["ssh_url"],
+                "https_url": row["https_url"], "default_branch": row["default_branch"]}
+
+    def record_detail(self, it: Dict[str, Any], pr: Dict[str, Any]) -> None:
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE prs SET head_sha = ?, head_ref = ?, ssh_url = ?, https_url = ?, default_branch = ?, "
+                "detail_updated_at = ? WHERE key = ?",
+                (pr["head_sha"], pr["head_ref"], pr["ssh_url"], pr["https_url"], pr["default_branch"],
+                 it.get("updated_at"), item_key(it)))
+            self._journal("detail", item_key(it), pr)
+
+    # --- checkout ---
+
+    def tested_sha(self, key: str) -> str | None:
+        row = self._row(key)
+        return row["tested_sha"] if row else None
+
+    def record_checkout(self, entry: Dict[str, Any]) -> None:
+        """`entry` = PR detail + `path` (+ `fetched_bytes`), ako ide do zhrnutia."""
+        key = f"{entry['repo']}#{entry['number']}"
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE prs SET tested_sha = ?, clone_path = ?, last_cloned = ? WHERE key = ?",
+                (entry["head_sha"], str(Path(entry["path"]).resolve()), time.time(), key))
+            self._journal("checkout", key, entry)
+
+    def query(self, name: str) -> List[sqlite3.Row]:
+        with self.lock:
+            return self.db.execute(STATE_QUERIES[name][1]).fetchall()
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
+
+def print_state_query(path: Path, name: str) -> None:
+    """Offline výpis zo state DB (bez GitHub API a tokenu)."""
+    if not path.exists():
+        print(f"❌ State DB {path} neexistuje – spusti najprv bežný beh.")
+        sys.exit(1)
+    store = StateStore(path)
+    rows = store.query(name)
+    store.close()
+    print(f"🗃️  {STATE_QUERIES[name][0]}: {len(rows)}")
+    for r in rows:
+        print("  - " + "  ".join(f"{k}={r[k]}" for k in r.keys() if r[k] is not None))
+
+# ------------------ Streaming pipeline ------------------
+
+_DONE = object()  # koniec prúdu vo fronte medzi stage
+
+class Stage:
+    """Pool vlákien medzi dvoma ohraničenými frontami.
+
+    Každý prvok z `inbox` prejde cez `fn`, ktorá vráti 0..n výstupov pre `outbox`
+    (0 = prvok vypadol). Koniec prúdu značí _DONE; posledný worker ho pošle ďalej.
+    Plná `outbox` brzdí predchádzajúcu stage (backpressure). Po nastavení `cancel`
+    prvky už len pretečú bez spracovania, kým nepríde _DONE.
+    """
+
+    def __init__(self, name: str, fn, workers: int, inbox: queue.Queue, outbox: queue.Queue | None = None,
+                 cancel: threading.Event | None = None):
+        self.name = name
+        self.fn = fn
+        self.inbox = inbox
+        self.outbox = outbox
+        self.cancel = cancel
+        self.lock = threading.Lock()
+        self.alive = workers
+        self.done = 0
+        self.init_thread = poll_output_of()
+        self.threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+                        for i in range(workers)]
+
+    def start(self) -> Stage:
+        for t in self.threads:
+            t.start()
+        return self
+
+    def join(self) -> None:
+        for t in self.threads:
+            t.join()
+
+    def _work(self) -> None:
+        self.init_thread()
+        try:
+            while True:
+                item = self.inbox.get()
+                if item is _DONE:
+                    self.inbox.put(_DONE)  # nech ho uvidia aj ostatné workery
+                    break
+                if self.cancel is not None and self.cancel.is_set():
+                    continue
+                try:
+                    with span(f"stage {self.name}", "stage"):
+                        outs = self.fn(item)
+                    for out in outs:
+                        if self.outbox is not None:
+                            self.outbox.put(out)
+                except Exception as e:
+                    print(f"⚠️  {self.name} zlyhal: {e}")
+                with self.lock:
+                    self.done += 1
+                    done = self.done
+                if done % 10 == 0:
+                    print(f"  …{self.name} progress [{done}]")
+        finally:
+            # aj keď worker nečakane padne, ďalšia stage musí dostať _DONE, inak by beh visel
+            with self.lock:
+                self.alive -= 1
+                last = self.alive == 0
+            if last and self.outbox is not None:
+                self.outbox.put(_DONE)
+
+@dataclass
+class RunState:
+    """Zdieľaný stav jedného behu; workery stage doň zapisujú pod `lock`, perzistentný stav ide do `store`."""
+    store: StateStore
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    cancel: threading.Event = field(default_factory=threading.Event)   # search padol → stage len dotečú
+    found: int = 0
+    kept: int = 0
+    eval_hits: int = 0
+    evaluated: int = 0
+    detail_hits: int = 0
+    resumed: set = field(default_factory=set)   # kľúče PR naklonovaných pred prerušením
+    names: set = field(default_factory=set)
+    details: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    skipped: List[Dict[str, Any]] = field(default_factory=list)
+
+def stage_eval(session: requests.Session, cfg: Config, state: RunState, it: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Prepustí PR bez hodnotenia. Poradie: GraphQL verdikt → state DB → REST scan."""
+    has_eval = it.get("_eval")
+    if has_eval is None:
+        has_eval = state.store.eval_verdict(it)
+        if has_eval is not None:
+            with state.lock:
+                state.eval_hits += 1
+    if has_eval is None:
+        try:
+            has_eval = check_evaluated(session, cfg, it, state.store.eval_since(it))
+        except Exception:
+            return [it]  # pri chybe radšej nepreskoč (a neukladaj verdikt)
+    state.store.record_eval(it, has_eval)
+    with state.lock:
+        state.evaluated += has_eval
+    return [] if has_eval else [it]
+
+def stage_detail(session: requests.Session, cfg: Config, state: RunState, it: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """PR detail: z GraphQL itemu, zo state DB (PR sa nezmenil), inak /pulls/{n}."""
+    pr = it.get("_pr") or state.store.cached_detail(it)
+    if pr is not None and "_pr" not in it:
+        with state.lock:
+            state.detail_hits += 1
+    if pr is None:
+        pr = fetch_pr_detail(session, cfg, it)
+    state.store.record_detail(it, pr)
+    with state.lock:
+        state.details.append(pr)
+    return [pr]
+
+def stage_checkout(cfg: Config, state: RunState, pr: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Klonuje len nové/zmenené PR (podľa HEAD SHA v state DB); stav sa zapíše hneď po každom PR."""
+    key = f"{pr['repo']}#{pr['number']}"
+    if state.store.tested_sha(key) == pr["head_sha"]:
+        if key not in state.resumed:
+            with state.lock:
+                state.skipped.append(pr)
+        return []
+    repo_name = pr["repo"].split("/")[1]
+    before = git_objects_size(clone_root_for(cfg, repo_name) / repo_name)
+    dest = ensure_checkout(cfg, pr)
+    fetched = git_objects_size(Path(dest)) - before
+    profile_count("git fetched bytes", max(fetched, 0))
+    entry = {**pr, "path": dest, "fetched_bytes": max(fetched, 0)}
+    state.store.record_checkout(entry)
+    with state.lock:
+        state.changed.append(entry)
+    return []
 
 # ------------------ Hlavná logika ------------------
 
 def main() -> None:
+    t_main = time.perf_counter()
     ns = parse_args()
+    if ns.query:
+        print_state_query(Path(ns.state_db), ns.query)
+        return
     cfg = load_config(ns)
+    global PROFILER
+    if cfg.profile:
+        PROFILER = Profiler(cfg.profile)
     session = build_session(cfg)
-
+    store = StateStore(cfg.state_db, legacy_sha=cfg.cache_file, legacy_eval=cfg.eval_cache_file)
+    if cfg.debug or cfg.profile:
+        print(f"🐞 Štart: import modulu {(T_IMPORTED - T_START) * 1000:.0f} ms, "
+              f"init (argumenty, session, state DB) {(time.perf_counter() - t_main) * 1000:.0f} ms")
+    if store.begin_run(resume=cfg.resume):
+        print("↩️  --resume: pokračujem v prerušenom behu podľa žurnálu.")
+    elif cfg.resume:
+        print("ℹ️  --resume: nie je čo obnoviť (posledný beh dobehol), začínam nový.")
+    try:
+        with span("run", "run"):
+            if cfg.watch:
+                watch(cfg, session, store)
+            else:
+                run(cfg, session, store)
+        store.finish_run()
+        store.close()
+    except KeyboardInterrupt:
+        # DB nezatváram – workery môžu byť uprostred transakcie; nedokončená sa zahodí
+        print("\n⛔ Prerušené. Hotové PR sú zapísané – pokračuj s --resume.")
+        raise SystemExit(130)
+    finally:
+        if session.http_cache:
+            session.http_cache.close()
+            print(f"\n🗄️  HTTP cache: {session.http_cache.summary()}")
+        print(f"⏱️  Rate limit: {session.limiter.summary()}")
+        if PROFILER:
+            PROFILER.dump()
+            print(f"\n📊 Profil (trace: {PROFILER.path} → chrome://tracing / ui.perfetto.dev):")
+            print(PROFILER.table())
+
+def run(cfg: Config, session: GitHubSession, store: StateStore) -> RunState:
     # Info
-    if cfg.since and not re.fullmatch(r"\d{4}-\d{2}-\d{2}", cfg.since):
-        print(f"⚠️  Ignorujem --since='{cfg.since}' – očakávam YYYY-MM-DD.")
+    if cfg.since and not SINCE_RE.fullmatch(cfg.since):
+        print(f"⚠️  Ignorujem --since='{cfg.since}' – očakávam YYYY-MM-DD alebo YYYY-MM-DDTHH:MM:SSZ.")
     print(f"📅 Filter: {'created' if cfg.created else 'updated'} >= {cfg.since}" if cfg.since else "📅 Filter: bez dátumu")
     if cfg.contains:   print(f"🔎 REPO_CONTAINS: {cfg.contains}")
     if cfg.regex:      print(f"🔤 REPO_REGEX: {cfg.regex}")
     if cfg.exclude:    print(f"🚫 EXCLUDE_REGEX: {cfg.exclude}")
+    if cfg.homeworks:  print(f"📚 HOMEWORKS: {', '.join(hw.number for hw in cfg.homeworks)} (jeden search pre všetky)")
     if cfg.students:   print(f"👥 STUDENTS: {len(cfg.students)} používateľov (match={cfg.student_match})")
     if cfg.skip_if_evaluated: print(f"🧾 SKIP_IF_EVALUATED: on (regex={cfg.eval_re.pattern})")
     if cfg.limit:      print(f"⛏️  MAX_RESULTS: {cfg.limit}")
@@ -418,98 +1786,287 @@ def main() -> None:
     if cfg.debug:      print("🐞 DEBUG: zapnutý (ukážem query a vzorku názvov repo)")
     print("")
 
-    # 1) vyhľadanie PR
+    # Stage bežia súbežne a spája ich ohraničená fronta: každá stránka searchu hneď tečie
+    # cez filtre → eval-scan → detail → checkout, bez čakania na dokončenie celej stage.
+    state = RunState(store=store)
+    cfg.repo_filter.reset()   # filter je zdieľaný medzi pollmi --watch, počty sú za beh
+    if store.resumed:
+        state.changed = store.journal("checkout")
+        state.resumed = {f"{pr['repo']}#{pr['number']}" for pr in state.changed}
+    cap = max(2 * cfg.workers, 16)
+    q_eval, q_detail, q_checkout = queue.Queue(cap), queue.Queue(cap), queue.Queue(cap)
+    stages = []
+    if cfg.skip_if_evaluated:
+        print(f"🔎 Kontrolujem hodnotiace komentáre (max workers={cfg.workers}, súbežnosť riadi rate limiter)...")
+        stages.append(Stage("eval-scan", partial(stage_eval, session, cfg, state), cfg.workers, q_eval, q_detail,
+                            state.cancel))
+    print(f"⏬ Naťahujem detaily PR paralelne (workers={cfg.workers})...")
+    stages.append(Stage("PR detail", partial(stage_detail, session, cfg, state), cfg.workers, q_detail,
+                        None if cfg.dry_run else q_checkout, state.cancel))
+    if not cfg.dry_run:
+        stages.append(Stage("checkout", partial(stage_checkout, cfg, state), cfg.clone_workers, q_checkout,
+                            cancel=state.cancel))
+    for st in stages:
+        st.start()
+
+    # 1) vyhľadanie PR + 2) filtre: študenti -> contains/regex/exclude, po stránkach
     q = build_search_query(cfg)
-    items = search_issues_all_pages(session, cfg, q)
-
-    # 2) filtre: študenti -> contains/regex/exclude
-    items = filter_students(items, cfg)
-    items = filter_contains_regex(items, cfg)
-    if not items:
-        print("ℹ️ Po filtroch nezostalo nič.")
-        return
-
-    # 3) voliteľne preskoč PR s hodnotením
+    pages = iter_search_pages_graphql(session, cfg, q) if cfg.graphql else iter_search_pages(session, cfg, q)
+    first = q_eval if cfg.skip_if_evaluated else q_detail
+    seen: set = set()
+
+    def feed(items: List[Dict[str, Any]]) -> None:
+        state.kept += len(items)
+        for it in items:
+            seen.add(item_key(it))
+            state.names.add(repo_full_name(it["repository_url"]).split("/")[1])
+            first.put(it)
+
+    # pri --resume najprv PR zo žurnálu (hotové kroky preskočí state DB); search sa
+    # opakuje len ak v prerušenom behu nedobehol
+    if store.resumed:
+        replay = store.journal("search")
+        state.found += len(replay)
+        feed(replay)
+        print(f"↩️  Zo žurnálu: {len(replay)} PR, z toho {len(state.resumed)} už naklonovaných.")
+    try:
+        if not (store.resumed and store.journal("search-done")):
+            for page in traced("stage search (page)", "stage", pages):
+                with span("stage filters", "stage"):
+                    items = cfg.repo_filter(page)
+                state.found += len(page)
+                items = [it for it in items if item_key(it) not in seen]
+                store.record_search(items)
+                feed(items)
+            store.mark("search-done")
+    except BaseException as e:
+        # bez _DONE by workery stage navždy čakali na fronte (v --watch by sa hromadili po polloch)
+        state.cancel.set()
+        first.put(_DONE)
+        if isinstance(e, Exception):
+            for st in stages:
+                st.join()
+        raise
+    first.put(_DONE)
+    print(f"🧹 Filtre (študenti/contains/regex/exclude) → zostáva: {state.kept} PR "
+          f"(−{state.found - state.kept}: {cfg.repo_filter.summary()})")
+    for st in stages:
+        st.join()
+
+    print(f"🗃️  State DB: {state.detail_hits} PR detailov bez API volania"
+          + (f", {state.eval_hits} eval verdiktov" if cfg.skip_if_evaluated else ""))
     if cfg.skip_if_evaluated:
-        before = len(items)
-        kept: List[Dict[str, Any]] = []
-        print(f"🔎 Kontrolujem hodnotiace komentáre (max workers={min(cfg.workers,6)})...")
-        with ThreadPoolExecutor(max_workers=min(cfg.workers, 6)) as ex:
-            futures = {}
-            for it in items:
-                full = repo_full_name(it["repository_url"])
-                futures[ex.submit(pr_has_evaluation_marker, session, cfg, full, it["number"])] = it
-            done = 0
-            total = len(futures)
-            for fut in as_completed(futures):
-                done += 1
-                try:
-                    has_eval = fut.result()
-                except Exception:
-                    has_eval = False  # pri chybe radšej nepreskoč
-                if not has_eval:
-                    kept.append(futures[fut])
-                if done % 10 == 0 or done == total:
-                    print(f"  …eval-scan progress [{done}/{total}]")
-        items = kept
-        print(f"🧾 SKIP_IF_EVALUATED → zostáva: {len(items)} PR (−{before - len(items)})")
-        if not items:
-            print("ℹ️ Všetky zachytené PR už majú hodnotenie.")
-            return
+        print(f"🧾 SKIP_IF_EVALUATED → zostáva: {state.kept - state.evaluated} PR (−{state.evaluated})")
+    if not state.kept:
+        print("ℹ️ Po filtroch nezostalo nič.")
+        return state
+    if cfg.skip_if_evaluated and state.evaluated == state.kept:
+        print("ℹ️ Všetky zachytené PR už majú hodnotenie.")
+        return state
 
-    # 4) Debug vzorka názvov rep
-    if cfg.debug and items:
-        names = sorted({repo_full_name(it["repository_url"]).split('/')[1] for it in items})
+    # Debug vzorka názvov rep
+    if cfg.debug:
         print("\n🧭 SAMPLE repo names (first ~30 unique):")
-        for n in names[:30]:
+        for n in sorted(state.names)[:30]:
             print("  ·", n)
         print("")
 
-    # 5) načítaj detaily PR paralelne (kvôli HEAD SHA, vetve, clone URL)
-    out: List[Dict[str, Any]] = []
-    print(f"⏬ Naťahujem detaily PR paralelne (workers={cfg.workers})...")
-    with ThreadPoolExecutor(max_workers=cfg.workers) as ex:
-        futures = {ex.submit(fetch_pr_detail, session, cfg, it): i for i, it in enumerate(items, 1)}
-        total = len(futures)
-        done = 0
-        for fut in as_completed(futures):
-            done += 1
-            try:
-                out.append(fut.result())
-            except Exception as e:
-                print(f"⚠️  PR detail zlyhal: {e}")
-            if done % 5 == 0 or done == total:
-                print(f"  …progress [{done}/{total}]")
-
     if cfg.dry_run:
         print("\n===== ZOZNAM PR (dry-run) =====")
-        for p in out:
+        for p in state.details:
             print(f"- {p['repo']} PR#{p['number']} {p['url']}")
-        return
+        return state
 
-    # 6) klonovanie len pre nové/zmenené PR
-    cache = load_cache(cfg.cache_file)
-    changed, skipped = [], []
-    for p in out:
-        key = f"{p['repo']}#{p['number']}"
-        if cache.get(key) == p["head_sha"]:
-            skipped.append(p); continue
-        dest = ensure_checkout(cfg, p)
-        changed.append({**p, "path": dest})
-        cache[key] = p["head_sha"]
-
-    save_cache(cfg.cache_file, cache)
-
-    # 7) report
+    # report
     print("\n===== ZHRNUTIE =====")
-    if changed:
+    if state.changed:
         print("🔄 Aktualizované/nové PR:")
-        for c in changed:
-            print(f"  - {c['repo']} PR#{c['number']} ({c['head_ref']} @ {c['head_sha'][:7]}) → {c['path']}")
+        for c in state.changed:
+            size = f", ⬇ {c['fetched_bytes'] / 1e6:.2f} MB" if c["fetched_bytes"] else ""
+            print(f"  - {c['repo']} PR#{c['number']} ({c['head_ref']} @ {c['head_sha'][:7]}{size}) → {c['path']}")
+        total = sum(c["fetched_bytes"] for c in state.changed)
+        if total:
+            print(f"⬇️  Stiahnuté git objekty: {total / 1e6:.1f} MB")
     else:
         print("✅ Nič sa nezmenilo od posledného behu (podľa commit SHA).")
-    if skipped:
-        print(f"\n⏭️ Preskočené (bez zmeny SHA): {len(skipped)}")
+    if state.skipped:
+        print(f"\n⏭️ Preskočené (bez zmeny SHA): {len(state.skipped)}")
+    if cfg.homeworks:
+        print_homework_summary(cfg, state)
+    return state
+
+def print_homework_summary(cfg: Config, state: RunState) -> None:
+    """Počty nových/nezmenených PR po úlohách (--homeworks), s clone rootom a riešením."""
+    counts: Dict[str, List[int]] = {hw.number: [0, 0] for hw in cfg.homeworks}
+    for i, prs in enumerate((state.changed, state.skipped)):
+        for pr in prs:
+            hw = homework_for(cfg, pr["repo"].split("/")[1])
+            if hw:
+                counts[hw.number][i] += 1
+    print("\n📚 Po úlohách:")
+    for hw in cfg.homeworks:
+        changed, skipped = counts[hw.number]
+        if changed or skipped:
+            print(f"  - {hw.number}: {changed} nových/zmenených, {skipped} bez zmeny → {hw.clone_root}"
+                  + (f"\n      riešenie: {hw.solution}" if hw.solution and changed else ""))
+
+# ------------------ Watch režim (--watch) ------------------
+
+# search index zaostáva za pushom → poll sa prekrýva s predošlým o WATCH_LAG; prekryv je lacný,
+# nezmenené PR odfiltruje state DB. Kurzor sa posúva len po krokoch WATCH_LAG, takže medzi
+# posunmi ide stále ten istý dotaz a GitHub odpovedá 304 (z HTTP cache, mimo rate limitu).
+WATCH_LAG = timedelta(minutes=10)
+WATCH_FOLLOWUPS = (5, 20, 60)   # po webhooku ešte pár pollov, kým sa push objaví v searchi
+WATCH_MAX_BACKOFF = 600.0       # po chybách pollu (výpadok siete/API) sa interval zdvojuje až sem
+
+_poll_out = threading.local()   # .buf = výstup pollu, do ktorého píše toto vlákno (None = terminál)
+
+class PollStdout:
+    """sys.stdout počas --watch: vlákna pollu píšu do jeho bufferu, ostatné (webhook, …) na terminál.
+
+    Vlákna, ktoré poll spúšťa (Stage, search pool), si buffer preberajú cez poll_output_of().
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        buf = getattr(_poll_out, "buf", None)
+        return (self.stream if buf is None else buf).write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self.stream, name)
+
+def poll_output_of() -> Any:
+    """Inicializátor pre vlákna spustené z aktuálneho vlákna: prevezmú jeho výstup pollu."""
+    return partial(setattr, _poll_out, "buf", getattr(_poll_out, "buf", None))
+
+class WebhookReceiver:
+    """Lokálny príjemca GitHub webhookov (napr. `gh webhook forward`); každá udalosť zobudí poll."""
+
+    def __init__(self, port: int, secret: str | None):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.wake = threading.Event()
+        self.lock = threading.Lock()
+        self.events: List[str] = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if secret:
+                    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+                    if not hmac.compare_digest(expected, self.headers.get("X-Hub-Signature-256", "")):
+                        self.send_response(401)
+                        self.end_headers()
+                        return
+                receiver.notify(self.headers.get("X-GitHub-Event", "?"), body)
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def notify(self, event: str, body: bytes) -> None:
+        if event == "ping":
+            return
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            payload = {}
+        repo = (payload.get("repository") or {}).get("full_name", "")
+        number = (payload.get("pull_request") or payload.get("issue") or {}).get("number")
+        with self.lock:
+            self.events.append(" ".join(x for x in (event, payload.get("action"), repo + (f"#{number}" if number else "")) if x))
+        self.wake.set()
+
+    def drain(self) -> List[str]:
+        with self.lock:
+            events, self.events = self.events, []
+        self.wake.clear()
+        return events
+
+    def close(self) -> None:
+        self.server.shutdown()
+
+def watch(cfg: Config, session: GitHubSession, store: StateStore) -> None:
+    """Prvý beh podľa --since, potom inkrementálne polly s tou istou session, spojeniami a state DB."""
+    receiver = WebhookReceiver(cfg.webhook_port, os.getenv("PV247_WEBHOOK_SECRET")) if cfg.webhook_port else None
+    wake = receiver.wake if receiver else threading.Event()
+    cursor: datetime | None = None
+    followups: List[float] = []
+    polls = errors = 0
+    polling = True
+    stdout, sys.stdout = sys.stdout, PollStdout(sys.stdout)
+    try:
+        while True:
+            polling = True
+            started = datetime.now(timezone.utc)
+            t = time.perf_counter()
+            out = _poll_out.buf = io.StringIO() if cursor is not None else None
+            try:
+                if cursor is None:
+                    run(cfg, session, store)
+                    cursor = started - WATCH_LAG
+                    print(f"\n👀 --watch: poll každých {cfg.watch:g} s"
+                          + (f", webhooky na http://127.0.0.1:{cfg.webhook_port}/" if receiver else "")
+                          + ". Ctrl-C = koniec.")
+                else:
+                    # výpis pollu len ak sa niečo naklonovalo (alebo varovanie / --debug)
+                    polls += 1
+                    state = run(replace(cfg, since=cursor.strftime("%Y-%m-%dT%H:%M:%SZ")), session, store)
+                    _poll_out.buf = None
+                    text = out.getvalue()
+                    if state.changed or cfg.debug or "⚠️" in text or "❌" in text:
+                        print(f"\n🔁 Poll {polls} ({started:%H:%M:%S} UTC, {time.perf_counter() - t:.1f} s):")
+                        print(text.rstrip())
+                    if started - WATCH_LAG - cursor >= WATCH_LAG:
+                        cursor = started - WATCH_LAG
+                errors = 0
+            except Exception as e:
+                # výpadok API/siete nesmie zhodiť démona; ďalší pokus s exponenciálnym odstupom
+                errors += 1
+                _poll_out.buf = None
+                if out and out.getvalue():
+                    print(out.getvalue().rstrip())
+                print(f"\n❌ Poll zlyhal ({started:%H:%M:%S} UTC): {type(e).__name__}: {e}")
+            # každý poll (aj zlyhaný) je v state DB samostatný beh → žurnál nerastie počas celého --watch;
+            # Ctrl-C uprostred pollu sem nepríde, ten beh ostáva otvorený pre --resume
+            store.finish_run()
+            store.begin_run()
+            store.resumed = False   # žurnál sa prehráva len v prvom behu
+
+            # čakaj na ďalší poll: interval, follow-up po webhooku alebo nový webhook
+            polling = False
+            delay = min(cfg.watch * 2 ** errors, WATCH_MAX_BACKOFF) if errors else cfg.watch
+            if errors:
+                print(f"⏳ Ďalší pokus o {delay:g} s (chyba {errors}× za sebou).")
+            now = time.monotonic()
+            followups = [f for f in followups if f > now]
+            timeout = min([delay] + [f - now for f in followups])
+            if wake.wait(timeout) and receiver:
+                events = receiver.drain()
+                print(f"🪝 {', '.join(events)} → poll")
+                now = time.monotonic()
+                followups = [now + d for d in WATCH_FOLLOWUPS]
+    except KeyboardInterrupt:
+        if polling:
+            raise   # uprostred behu → ako bežné prerušenie (--resume)
+        print("\n👋 --watch ukončený.")
+    finally:
+        _poll_out.buf = None
+        sys.stdout = stdout
+        if receiver:
+            receiver.close()
+
+T_IMPORTED = time.perf_counter()
 
 if __name__ == "__main__":
     main()